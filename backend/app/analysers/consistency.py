@@ -0,0 +1,231 @@
+import re
+from functools import lru_cache
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+from scipy import sparse
+
+from app.parsers.records import FunctionRecord
+
+# Below this share of name/parameter tokens mentioned in the docstring,
+# a documented function is flagged as `low_overlap`.
+LOW_OVERLAP = 0.2
+# Docstrings at most this many content tokens long that only restate
+# the function name are flagged as `restates_name`.
+RESTATE_MAX_TOKENS = 3
+
+IDENTIFIER_PART = re.compile(r"[A-Z]?[a-z]+|[A-Z]+(?![a-z])|\d+")
+WORD = re.compile(r"[A-Za-z][A-Za-z0-9_]*")
+
+# Verbs that carry no meaning a docstring is expected to repeat.
+GENERIC_NAME_TOKENS = frozenset(
+    "get set is has do make run handle process init new create build "
+    "to from on as test main helper util".split()
+)
+STOPWORDS = frozenset(
+    "a an the of to for in on at by with and or not no is are be been this that "
+    "it its if else when then than from as into returns return param params "
+    "args arguments parameters raises yields type rtype none true false".split()
+)
+
+BOILERPLATE = re.compile(
+    r"^\W*(todo|fixme|tbd|xxx|docstring|description|summary|"
+    r"insert (description|docstring|summary) here|auto-?generated( method stub)?|"
+    r"(function|method|class) (description|docstring))\W*$",
+    re.IGNORECASE,
+)
+
+DOC_PARAM_PATTERNS = (
+    re.compile(r":param\s+(?:[\w\[\], .]+\s+)?(\w+)\s*:"),    # Sphinx
+    re.compile(r"@param\s+(\w+)"),                            # Javadoc
+    re.compile(r"^\s*(\w+)\s*:\s*\S", re.MULTILINE),            # NumPy "name : type"
+)
+GOOGLE_SECTION = re.compile(r"^\s*(Args|Arguments|Parameters)\s*:\s*$", re.MULTILINE)
+GOOGLE_PARAM = re.compile(r"^\s+\*{0,2}(\w+)\s*(\([^)]*\))?\s*:")
+NUMPY_SECTION = re.compile(r"^\s*Parameters\s*\n\s*-{3,}\s*$", re.MULTILINE)
+
+
+def _stem(token: str) -> str:
+    if len(token) > 3 and token.endswith("s") and not token.endswith("ss"):
+        return token[:-1]
+    return token
+
+
+# Words repeat heavily across a codebase, so splitting is memoised.
+@lru_cache(maxsize=1 << 16)
+def identifier_tokens(name: str) -> Tuple[str, ...]:
+    """snake_case / camelCase parts, lowercased; single letters carry no meaning."""
+
+    return tuple(_stem(part.lower()) for part in IDENTIFIER_PART.findall(name) if len(part) > 1)
+
+
+@lru_cache(maxsize=1 << 16)
+def _content_tokens(word: str) -> Tuple[str, ...]:
+    return tuple(part for part in identifier_tokens(word) if part not in STOPWORDS)
+
+
+def doc_tokens(text: str) -> List[str]:
+    tokens: List[str] = []
+    for word in WORD.findall(text):
+        tokens.extend(_content_tokens(word))
+    return tokens
+
+
+def documented_params(doc: str) -> Optional[List[str]]:
+    """
+    Parameter names a docstring claims to document, or None when it has
+    no recognisable parameter section at all.
+    """
+
+    names: List[str] = []
+    found = False
+
+    for pattern in DOC_PARAM_PATTERNS[:2]:
+        matched = pattern.findall(doc)
+        if matched:
+            found = True
+            names.extend(matched)
+
+    section = GOOGLE_SECTION.search(doc)
+    if section:
+        found = True
+        for line in doc[section.end():].splitlines()[1:]:
+            if not line.strip():
+                break
+            match = GOOGLE_PARAM.match(line)
+            if match:
+                names.append(match.group(1))
+            elif not line.startswith((" ", "\t")):
+                break
+
+    section = NUMPY_SECTION.search(doc)
+    if section:
+        found = True
+        block = re.split(r"\n\s*\n\s*\w+\s*\n\s*-{3,}", doc[section.end():], maxsplit=1)[0]
+        names.extend(DOC_PARAM_PATTERNS[2].findall(block))
+
+    return names if found else None
+
+
+Encoded = Tuple[np.ndarray, np.ndarray]
+
+
+def _encode(vocabulary: Dict[str, int], rows: Sequence[Sequence[str]]) -> Encoded:
+    """CSR (indices, indptr) of token ids, growing `vocabulary` as needed."""
+
+    lengths = np.fromiter((len(row) for row in rows), dtype=np.int64, count=len(rows))
+    indices = np.fromiter(
+        (vocabulary.setdefault(token, len(vocabulary)) for row in rows for token in row),
+        dtype=np.int64,
+        count=int(lengths.sum()),
+    )
+    return indices, np.concatenate(([0], np.cumsum(lengths)))
+
+
+def _binary(encoded: Encoded, width: int) -> sparse.csr_matrix:
+    """Token-presence matrix: one row per item, 1 where a token occurs."""
+
+    indices, indptr = encoded
+    matrix = sparse.csr_matrix(
+        (np.ones(len(indices), dtype=np.float32), indices, indptr),
+        shape=(len(indptr) - 1, max(width, 1)),
+    )
+    matrix.sum_duplicates()
+    matrix.data[:] = 1
+    return matrix
+
+
+def _row_sums(matrix: sparse.csr_matrix) -> np.ndarray:
+    return np.asarray(matrix.sum(axis=1), dtype=np.float64).ravel()
+
+
+def score_functions(functions: Sequence[FunctionRecord]) -> List[Optional[Tuple[float, Tuple[str, ...]]]]:
+    """
+    Scores how well each documented function's docstring matches its
+    name and parameters, for all functions at once.
+
+    Returns, aligned with `functions`, None for undocumented functions
+    and otherwise (overlap score in [0, 1], flags). Flags are
+    `boilerplate`, `restates_name`, `low_overlap`, `stale_params`
+    (documents parameters the function does not have) and
+    `missing_params` (has a parameter section that omits some).
+    """
+
+    documented = [i for i, f in enumerate(functions) if f.docstring]
+    results: List[Optional[Tuple[float, Tuple[str, ...]]]] = [None] * len(functions)
+    if not documented:
+        return results
+
+    docs = [functions[i].docstring for i in documented]
+
+    # Tokenisation is per string; everything after it is matrix algebra
+    # over every documented function in the batch.
+    words: Dict[str, int] = {}
+    encoded = [
+        _encode(words, [
+            [t for t in identifier_tokens(functions[i].name) if t not in GENERIC_NAME_TOKENS]
+            for i in documented
+        ]),
+        _encode(words, [
+            [t for p in functions[i].params for t in identifier_tokens(p)]
+            for i in documented
+        ]),
+        _encode(words, [doc_tokens(doc) for doc in docs]),
+    ]
+    names, params, text = (_binary(e, len(words)) for e in encoded)
+
+    name_count, param_count = _row_sums(names), _row_sums(params)
+    name_hits = _row_sums(names.multiply(text))
+    param_hits = _row_sums(params.multiply(text))
+    doc_count = _row_sums(text)
+
+    wanted = name_count + param_count
+    score = np.divide(
+        name_hits + param_hits,
+        wanted,
+        out=np.ones_like(wanted),
+        where=wanted > 0,
+    )
+
+    # Documented vs actual parameter names, compared case-insensitively.
+    param_names: Dict[str, int] = {}
+    claimed = [documented_params(doc) for doc in docs]
+    has_section = np.fromiter((c is not None for c in claimed), dtype=bool, count=len(docs))
+    encoded = [
+        _encode(param_names, [[p.lower() for p in functions[i].params] for i in documented]),
+        _encode(param_names, [[p.lower() for p in (c or ())] for c in claimed]),
+    ]
+    actual, listed = (_binary(e, len(param_names)) for e in encoded)
+    shared = _row_sums(actual.multiply(listed))
+
+    boilerplate = np.fromiter(
+        (doc_count[k] == 0 or BOILERPLATE.match(doc) is not None for k, doc in enumerate(docs)),
+        dtype=bool,
+        count=len(docs),
+    )
+    restates = (
+        ~boilerplate
+        & (name_count > 0)
+        & (doc_count <= RESTATE_MAX_TOKENS)
+        & (_row_sums(text.multiply(names)) == doc_count)
+    )
+    low = ~boilerplate & ~restates & (wanted > 0) & (score < LOW_OVERLAP)
+    stale = _row_sums(listed) > shared
+    missing = has_section & (_row_sums(actual) > shared)
+
+    flag_columns = (
+        ("boilerplate", boilerplate),
+        ("restates_name", restates),
+        ("low_overlap", low),
+        ("stale_params", stale),
+        ("missing_params", missing),
+    )
+    rounded = np.round(score, 3).tolist()
+
+    # Results outlive the batch and few flag combinations occur, so each
+    # combination is kept once.
+    combinations: Dict[Tuple[str, ...], Tuple[str, ...]] = {}
+    for k, i in enumerate(documented):
+        flags = tuple(name for name, column in flag_columns if column[k])
+        results[i] = (rounded[k], combinations.setdefault(flags, flags))
+    return results
@@ -1,14 +1,10 @@
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.metrics.pairwise import cosine_similarity
-import re
-from typing import Dict, Any, List
+from typing import List
+from app.analysers.records import CommentAnalysis, CommentItem
+from app.analysers.similarity import normalize, duplicate_pairs
+from app.parsers.records import ParsedSource
 
 
-def normalize(text: str) -> str:
-    return re.sub(r"\W+", " ", text.lower()).strip()
-
-
-def analyze_java_comments(parsed: Dict[str, Any]) -> Dict[str, Any]:
+def analyze_java_comments(parsed: ParsedSource, bounded: bool = False) -> CommentAnalysis:
     """
     Performs full comment analysis for Java:
     - scope approximation
@@ -16,27 +12,25 @@ def analyze_java_comments(parsed: Dict[str, Any]) -> Dict[str, Any]:
     - redundancy detection
     - over-commenting detection
     - rule-based conclusions
+
+    `bounded` caps redundancy detection, see `duplicate_pairs`.
     """
 
-    comments: List[str] = parsed.get("comments", [])
-    methods = parsed.get("methods", [])
-    classes = parsed.get("classes", [])
+    comments: List[str] = parsed.comments
+    items: List[CommentItem] = [
+        ("doc" if text.startswith("/**") else "inline", None, line, text)
+        for text, line in zip(comments, parsed.comment_lines)
+    ]
 
     total_comments = len(comments)
-    total_methods = len(methods) or 1
+    total_methods = len(parsed.functions) or 1
 
     comments_per_method = total_comments / total_methods
 
-    duplicated_pairs = []
-
-    if len(comments) > 1:
-        tfidf = TfidfVectorizer().fit_transform(map(normalize, comments))
-        sim = cosine_similarity(tfidf)
-
-        for i in range(len(sim)):
-            for j in range(i + 1, len(sim)):
-                if sim[i][j] > 0.85:
-                    duplicated_pairs.append((comments[i], comments[j]))
+    duplicated_pairs = [
+        (comments[i], comments[j])
+        for i, j in duplicate_pairs([normalize(c) for c in comments], bounded=bounded)
+    ]
 
     redundant_count = len(duplicated_pairs)
 
@@ -57,10 +51,12 @@ def analyze_java_comments(parsed: Dict[str, Any]) -> Dict[str, Any]:
     else:
         conclusion = "Java comments appear concise and well-placed."
 
-    return {
-        "total_comments": total_comments,
-        "comments_per_method": round(comments_per_method, 2),
-        "redundant_comments": duplicated_pairs,
-        "over_commented": over_commented,
-        "conclusion": conclusion
-    }
+    return CommentAnalysis(
+        total_comments,
+        comments_per_method,
+        "comments_per_method",
+        duplicated_pairs,
+        over_commented,
+        conclusion,
+        items=items,
+    )
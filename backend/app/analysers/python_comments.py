@@ -1,14 +1,10 @@
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.metrics.pairwise import cosine_similarity
-import re
-from typing import Dict, Any, List
+from typing import List
+from app.analysers.records import CommentAnalysis, CommentItem
+from app.analysers.similarity import normalize, duplicate_pairs
+from app.parsers.records import ParsedSource
 
 
-def normalize(text: str) -> str:
-    return re.sub(r"\W+", " ", text.lower()).strip()
-
-
-def analyze_python_comments(parsed: Dict[str, Any]) -> Dict[str, Any]:
+def analyze_python_comments(parsed: ParsedSource, bounded: bool = False) -> CommentAnalysis:
     """
     Performs full comment analysis for Python:
     - scope classification
@@ -16,56 +12,42 @@ def analyze_python_comments(parsed: Dict[str, Any]) -> Dict[str, Any]:
     - redundancy detection
     - over-commenting detection
     - rule-based conclusions
+
+    `bounded` caps redundancy detection, see `duplicate_pairs`.
     """
 
-    scoped_comments: List[Dict[str, Any]] = []
-
-    for d in parsed.get("docstrings", []):
-        scoped_comments.append({
-            "scope": "file",
-            "text": d["text"]
-        })
-
-    for f in parsed.get("functions", []):
-        if f.get("docstring"):
-            scoped_comments.append({
-                "scope": "function",
-                "owner": f["name"],
-                "text": f["docstring"]
-            })
-
-    for c in parsed.get("classes", []):
-        if c.get("docstring"):
-            scoped_comments.append({
-                "scope": "class",
-                "owner": c["name"],
-                "text": c["docstring"]
-            })
-
-    for inline in parsed.get("inline_comments", []):
-        scoped_comments.append({
-            "scope": "inline",
-            "text": inline
-        })
-
-    total_comments = len(scoped_comments)
-    total_functions = len(parsed.get("functions", [])) or 1
+    items: List[CommentItem] = []
+    scope_counts = [0, 0, 0, 0]
 
-    comments_per_function = total_comments / total_functions
+    if parsed.file_docstring:
+        items.append(("file", None, 1, parsed.file_docstring))
+        scope_counts[0] += 1
+
+    for f in parsed.functions:
+        if f.docstring:
+            items.append(("function", f.name, f.start_line, f.docstring))
+            scope_counts[2] += 1
 
-    texts = [normalize(c["text"]) for c in scoped_comments]
-    duplicated_pairs = []
+    for c in parsed.classes:
+        if c.docstring:
+            items.append(("class", c.name, c.start_line, c.docstring))
+            scope_counts[1] += 1
 
-    if len(texts) > 1:
-        tfidf = TfidfVectorizer().fit_transform(texts)
-        sim = cosine_similarity(tfidf)
+    for text, line in zip(parsed.comments, parsed.comment_lines):
+        items.append(("inline", None, line, text))
+    scope_counts[3] = len(parsed.comments)
 
-        for i in range(len(sim)):
-            for j in range(i + 1, len(sim)):
-                if sim[i][j] > 0.85:
-                    duplicated_pairs.append(
-                        (scoped_comments[i]["text"], scoped_comments[j]["text"])
-                    )
+    texts = [item[3] for item in items]
+
+    total_comments = len(texts)
+    total_functions = len(parsed.functions) or 1
+
+    comments_per_function = total_comments / total_functions
+
+    duplicated_pairs = [
+        (texts[i], texts[j])
+        for i, j in duplicate_pairs([normalize(t) for t in texts], bounded=bounded)
+    ]
 
     redundant_count = len(duplicated_pairs)
 
@@ -86,16 +68,13 @@ def analyze_python_comments(parsed: Dict[str, Any]) -> Dict[str, Any]:
     else:
         conclusion = "Comments are concise and appear meaningful."
 
-    return {
-        "total_comments": total_comments,
-        "comments_by_scope": {
-            "file": sum(1 for c in scoped_comments if c["scope"] == "file"),
-            "class": sum(1 for c in scoped_comments if c["scope"] == "class"),
-            "function": sum(1 for c in scoped_comments if c["scope"] == "function"),
-            "inline": sum(1 for c in scoped_comments if c["scope"] == "inline"),
-        },
-        "comments_per_function": round(comments_per_function, 2),
-        "redundant_comments": duplicated_pairs,
-        "over_commented": over_commented,
-        "conclusion": conclusion
-    }
+    return CommentAnalysis(
+        total_comments,
+        comments_per_function,
+        "comments_per_function",
+        duplicated_pairs,
+        over_commented,
+        conclusion,
+        scope_counts=tuple(scope_counts),
+        items=items,
+    )
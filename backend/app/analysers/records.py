@@ -0,0 +1,230 @@
+import sys
+import zlib
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import msgpack
+
+from app.parsers.records import FunctionRecord
+
+SCOPES = ("file", "class", "function", "inline")
+
+CommentItem = Tuple[str, Optional[str], Optional[int], str]
+Consistency = Tuple[float, Tuple[str, ...]]
+# Per-function and per-comment rows, kept out of stored entries.
+DETAIL_KEYS = ("functions", "comments")
+FUNCTION_FIELDS = ("name", "start_line", "end_line", "documented", "consistency", "flags")
+COMMENT_FIELDS = ("scope", "owner", "line", "text")
+# Packed per file while the run goes on, so speed matters more than
+# ratio. zlib rather than zstd: python-zstandard's one-shot output keeps
+# its worst-case allocation, larger than the input for small blobs.
+DETAILS_ZLIB_LEVEL = 1
+
+
+class CommentAnalysis:
+    """
+    Comment metrics for one file. `scope_counts` follows SCOPES and is
+    None for languages without scope classification (Java), whose density
+    is reported per method instead of per function. `items` holds every
+    comment as (scope, owner, line, text) until its file's details are
+    packed.
+    """
+
+    __slots__ = (
+        "total_comments", "scope_counts", "density", "density_key",
+        "redundant_comments", "over_commented", "conclusion", "items",
+    )
+
+    def __init__(
+        self,
+        total_comments: int,
+        density: float,
+        density_key: str,
+        redundant_comments: List[Tuple[str, str]],
+        over_commented: bool,
+        conclusion: str,
+        scope_counts: Optional[Tuple[int, int, int, int]] = None,
+        items: Optional[List[CommentItem]] = None,
+    ):
+        self.total_comments = total_comments
+        self.scope_counts = scope_counts
+        self.density = round(density, 2)
+        self.density_key = density_key
+        self.redundant_comments = redundant_comments
+        self.over_commented = over_commented
+        self.conclusion = sys.intern(conclusion)
+        self.items = items or []
+
+    def to_dict(self) -> Dict[str, Any]:
+        result: Dict[str, Any] = {"total_comments": self.total_comments}
+        if self.scope_counts is not None:
+            result["comments_by_scope"] = dict(zip(SCOPES, self.scope_counts))
+        result[self.density_key] = self.density
+        result["redundant_comments"] = self.redundant_comments
+        result["over_commented"] = self.over_commented
+        result["conclusion"] = self.conclusion
+        return result
+
+
+class FileAnalysis:
+    """
+    One analysed file; `to_dict` gives the stored/API JSON entry, which
+    holds metrics only. `details` gives the per-function and per-comment
+    rows, stored apart from the entry for export. `functions` are the
+    parser's records, shared rather than copied, and are only needed
+    until consistency is scored: `pack_details` then keeps the rows as
+    one compact blob and releases the records and comment texts.
+    """
+
+    __slots__ = (
+        "path", "hash", "language", "comments", "functions", "consistency",
+        "total_functions", "documented_functions", "packed_details",
+    )
+
+    def __init__(self, path: str, hash: str, language: str, comments: CommentAnalysis,
+                 functions: Optional[List[FunctionRecord]] = None):
+        self.path = path
+        self.hash = hash
+        self.language = sys.intern(language)
+        self.comments = comments
+        self.functions = functions or []
+        self.total_functions = len(self.functions)
+        self.documented_functions = sum(1 for f in self.functions if f.docstring)
+        # Aligned with `functions`, filled in per batch by the consistency
+        # analyser: None (undocumented) or (score, flags).
+        self.consistency: List[Optional[Consistency]] = [None] * len(self.functions)
+        self.packed_details: Optional[bytes] = None
+
+    @property
+    def file(self) -> str:
+        return self.path.rsplit("/", 1)[-1]
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "file": self.file,
+            "path": self.path,
+            "hash": self.hash,
+            "language": self.language,
+            "analysis": {
+                "comments": self.comments.to_dict(),
+                "functions": {
+                    "total": self.total_functions,
+                    "documented": self.documented_functions,
+                    "scored": [[score, list(flags)] for score, flags in filter(None, self.consistency)],
+                },
+            },
+        }
+
+    def _detail_rows(self) -> Tuple[List[list], List[list]]:
+        """Function and comment rows as lists, in FUNCTION_FIELDS/COMMENT_FIELDS order."""
+
+        functions = [
+            [f.name, f.start_line, f.end_line, bool(f.docstring),
+             scored[0] if scored else None, list(scored[1]) if scored else []]
+            for f, scored in zip(self.functions, self.consistency)
+        ]
+        return functions, [list(item) for item in self.comments.items]
+
+    def pack_details(self):
+        """
+        Packs the detail rows once consistency is scored, and drops the
+        parser records and comment texts, so a large run does not keep
+        every docstring and comment alive until it ends.
+        """
+
+        packed = msgpack.packb(self._detail_rows(), use_bin_type=True)
+        self.packed_details = zlib.compress(packed, DETAILS_ZLIB_LEVEL)
+        self.functions = ()
+        self.comments.items = ()
+
+    def details(self) -> Dict[str, Any]:
+        if self.packed_details is not None:
+            packed = zlib.decompress(self.packed_details)
+            functions, comments = msgpack.unpackb(packed, raw=False)
+        else:
+            functions, comments = self._detail_rows()
+        return {
+            "path": self.path,
+            "language": self.language,
+            "functions": [dict(zip(FUNCTION_FIELDS, row)) for row in functions],
+            "comments": [dict(zip(COMMENT_FIELDS, row)) for row in comments],
+        }
+
+
+def function_metrics(rows: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """The entry's `analysis.functions` metrics, from function detail rows."""
+
+    # Rows from analyser versions before 5 carry no consistency score.
+    return {
+        "total": len(rows),
+        "documented": sum(1 for row in rows if row.get("documented")),
+        "scored": [[row["consistency"], row["flags"]] for row in rows if row.get("consistency") is not None],
+    }
+
+
+class StoredFileAnalysis:
+    """
+    A file entry carried over from a stored result without re-analysis.
+    Exposes what RepoSummary reads from a FileAnalysis. The entry may
+    carry its detail rows at top level (see `with_details`, and entries
+    stored before details were kept apart); `to_dict` and `details`
+    split them again.
+    """
+
+    __slots__ = ("path", "hash", "language", "comments", "consistency", "function_metrics", "entry")
+
+    def __init__(self, entry: Dict[str, Any]):
+        analysis = entry["analysis"]
+        stored = analysis["comments"]
+        density_key = "comments_per_function" if "comments_per_function" in stored else "comments_per_method"
+        scopes = stored.get("comments_by_scope")
+
+        self.path = entry["path"]
+        self.hash = entry["hash"]
+        self.language = sys.intern(entry["language"])
+        self.comments = CommentAnalysis(
+            stored["total_comments"],
+            stored[density_key],
+            density_key,
+            [tuple(pair) for pair in stored["redundant_comments"]],
+            stored["over_commented"],
+            stored["conclusion"],
+            scope_counts=tuple(scopes[scope] for scope in SCOPES) if scopes else None,
+        )
+        self.function_metrics = analysis.get("functions") or function_metrics(entry.get("functions", []))
+        self.consistency: List[Optional[Consistency]] = [
+            (score, tuple(flags)) for score, flags in self.function_metrics["scored"]
+        ]
+        self.entry = entry
+
+    def to_dict(self) -> Dict[str, Any]:
+        stored = {key: value for key, value in self.entry.items() if key not in DETAIL_KEYS}
+        stored["analysis"] = {**self.entry["analysis"], "functions": self.function_metrics}
+        return stored
+
+    def details(self) -> Dict[str, Any]:
+        return {
+            "path": self.path,
+            "language": self.language,
+            "functions": self.entry.get("functions", []),
+            "comments": self.entry.get("comments", []),
+        }
+
+
+def with_details(entries: Iterable[Dict[str, Any]], details: Iterable[Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+    """
+    Stored entries by path, each with its detail rows merged back in, as
+    `previous` for a re-analysis that carries unchanged files over.
+    """
+
+    rows = {detail["path"]: detail for detail in details}
+    merged = {}
+    for entry in entries:
+        detail = rows.get(entry["path"])
+        merged[entry["path"]] = {**entry, **{key: detail[key] for key in DETAIL_KEYS}} if detail else entry
+    return merged
+
+
+def as_dicts(results: Iterable[Any]) -> List[Dict[str, Any]]:
+    """JSON-compatible form of a result list; plain dicts pass through."""
+
+    return [r.to_dict() if hasattr(r, "to_dict") else r for r in results]
@@ -0,0 +1,144 @@
+import math
+import re
+from collections import Counter
+from itertools import islice
+from typing import Dict, Iterator, List, Tuple
+
+import numpy as np
+from scipy import sparse
+
+# Same tokenisation and weighting as sklearn's TfidfVectorizer defaults
+# (lowercase, 2+ word characters, smooth idf, l2 norm), so results match
+# the per-file fit_transform + cosine_similarity this replaces.
+TOKEN_PATTERN = re.compile(r"(?u)\b\w\w+\b")
+SIMILARITY_THRESHOLD = 0.85
+
+# Below this many distinct comments, pure Python beats building sparse
+# matrices; most real files fall here.
+SMALL_COMMENT_COUNT = 24
+
+# Bounds for files too large to read whole, where the pair count and the
+# similarity matrix would otherwise grow quadratically with the file.
+BOUNDED_MAX_PAIRS = 1000
+BOUNDED_MAX_DOCS = 2000
+
+
+def normalize(text: str) -> str:
+    return re.sub(r"\W+", " ", text.lower()).strip()
+
+
+def _idf(docs: List[Counter], weights: List[int], total: int) -> Dict[str, float]:
+    df: Dict[str, int] = {}
+    for doc, weight in zip(docs, weights):
+        for token in doc:
+            df[token] = df.get(token, 0) + weight
+    return {token: math.log((1 + total) / (1 + count)) + 1 for token, count in df.items()}
+
+
+def _small_pairs(docs: List[Counter], idf: Dict[str, float], threshold: float) -> List[Tuple[int, int]]:
+    vectors = []
+    for doc in docs:
+        weighted = {token: count * idf[token] for token, count in doc.items()}
+        norm = math.sqrt(sum(v * v for v in weighted.values()))
+        vectors.append({token: v / norm for token, v in weighted.items()})
+
+    pairs = []
+    for a in range(len(vectors)):
+        va = vectors[a]
+        for b in range(a + 1, len(vectors)):
+            vb = vectors[b]
+            if len(vb) < len(va):
+                dot = sum(v * va[t] for t, v in vb.items() if t in va)
+            else:
+                dot = sum(v * vb[t] for t, v in va.items() if t in vb)
+            if dot > threshold:
+                pairs.append((a, b))
+    return pairs
+
+
+def _sparse_pairs(docs: List[Counter], idf: Dict[str, float], threshold: float) -> List[Tuple[int, int]]:
+    columns: Dict[str, int] = {}
+    indptr, indices, data = [0], [], []
+
+    for doc in docs:
+        for token, count in doc.items():
+            indices.append(columns.setdefault(token, len(columns)))
+            data.append(count * idf[token])
+        indptr.append(len(indices))
+
+    matrix = sparse.csr_matrix(
+        (np.asarray(data), np.asarray(indices), np.asarray(indptr)),
+        shape=(len(docs), len(columns)),
+    )
+    norms = np.sqrt(np.asarray(matrix.multiply(matrix).sum(axis=1)).ravel())
+    matrix = sparse.diags(1 / norms) @ matrix
+
+    similarity = sparse.triu(matrix @ matrix.T, k=1).tocoo()
+    hits = similarity.data > threshold
+    return list(zip(similarity.row[hits].tolist(), similarity.col[hits].tolist()))
+
+
+def duplicate_pairs(
+    texts: List[str],
+    threshold: float = SIMILARITY_THRESHOLD,
+    bounded: bool = False,
+) -> List[Tuple[int, int]]:
+    """
+    Index pairs (i < j, in row-major order) of texts whose TF-IDF cosine
+    similarity exceeds `threshold`.
+
+    Texts with identical token counts are grouped first: they are always
+    duplicates of each other and only one representative per group is
+    vectorised. Small inputs are compared in pure Python, larger ones with
+    one sparse matrix product; neither fits a vectorizer per call.
+
+    `bounded` returns at most BOUNDED_MAX_PAIRS pairs and only looks for
+    near-duplicates among the first BOUNDED_MAX_DOCS distinct texts;
+    exact duplicates are still found throughout.
+    """
+
+    if len(texts) < 2:
+        return []
+
+    groups: Dict[Tuple, List[int]] = {}
+    docs: List[Counter] = []
+    for index, text in enumerate(texts):
+        tokens = Counter(TOKEN_PATTERN.findall(text.lower()))
+        if not tokens:
+            continue
+        group = groups.setdefault(tuple(sorted(tokens.items())), [])
+        if not group:
+            docs.append(tokens)
+        group.append(index)
+
+    members = list(groups.values())
+    idf = _idf(docs, [len(m) for m in members], len(texts))
+
+    compared = docs[:BOUNDED_MAX_DOCS] if bounded else docs
+    if len(compared) < 2:
+        similar = []
+    elif len(compared) <= SMALL_COMMENT_COUNT:
+        similar = _small_pairs(compared, idf, threshold)
+    else:
+        similar = _sparse_pairs(compared, idf, threshold)
+
+    pairs = _expand(members, similar)
+    if bounded:
+        pairs = list(islice(pairs, BOUNDED_MAX_PAIRS))
+    else:
+        pairs = list(pairs)
+
+    pairs.sort()
+    return pairs
+
+
+def _expand(members: List[List[int]], similar: List[Tuple[int, int]]) -> Iterator[Tuple[int, int]]:
+    for group in members:
+        for a in range(len(group)):
+            for b in range(a + 1, len(group)):
+                yield group[a], group[b]
+
+    for a, b in similar:
+        for i in members[a]:
+            for j in members[b]:
+                yield (i, j) if i < j else (j, i)
@@ -1,4 +1,5 @@
 from passlib.context import CryptContext
+from app.core.tracing import span
 
 pwd_context = CryptContext(
     schemes=["argon2"],
@@ -8,7 +9,9 @@ pwd_context = CryptContext(
 def hash_password(password: str) -> str:
     if not isinstance(password, str):
         raise ValueError("Password must be a string")
-    return pwd_context.hash(password)
+    with span("argon2"):
+        return pwd_context.hash(password)
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
-    return pwd_context.verify(plain_password, hashed_password)
+    with span("argon2"):
+        return pwd_context.verify(plain_password, hashed_password)
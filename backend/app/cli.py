@@ -0,0 +1,287 @@
+"""
+Offline entry point: analyses repositories without the web server,
+auth or the database.
+
+Usage (from the backend directory):
+    python -m app.cli scan /path/to/repo https://github.com/org/repo.git --output scan.jsonl
+    python -m app.cli scan --targets-file repos.txt --format parquet --output scan/ --jobs 8
+
+Re-running the same command resumes: targets already in the output are
+skipped.
+
+One very large tree can instead be split into shards and spread over
+worker processes that share a SQLite queue file. They must all run on
+the same machine (SQLite is not safe over network filesystems):
+    python -m app.cli shard /srv/monorepo --queue /var/tmp/q.db --shards 64 --output mono.json
+    python -m app.cli worker --queue /var/tmp/q.db          # extra workers
+
+Comment-quality trend over a local repository's history, one JSON line
+per commit:
+    python -m app.cli history /path/to/repo --max-commits 500 --step 5 -o trend.jsonl
+
+Quick estimate of comment metrics, with confidence intervals, from a
+stratified sample of a large tree (until the target precision is met or
+the time budget runs out):
+    python -m app.cli estimate /srv/monorepo --precision 0.05 --time-budget 60 -o estimate.json
+
+Stored analyses (this one needs DATABASE_URL) export to Parquet:
+    python -m app.cli export --granularity functions --since 2024-01-01 -o functions.parquet
+
+Stand-in for GitHub when testing push pre-analysis: posts a signed push
+event for a local clone's HEAD as if it had been pushed to the
+registered repository:
+    python -m app.cli push-hook /path/to/clone --repo-url https://github.com/org/repo \
+        --secret <webhook secret> --url http://localhost:8000/webhooks/github
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import sys
+import time
+import urllib.error
+import urllib.request
+import uuid
+from datetime import datetime
+
+from app.services.analysis_service import ANALYSER_VERSION
+from app.services.batch import FORMATS, open_sink, read_targets, scan_targets
+from app.services.history import analyze_history
+from app.services.sampling import sample_codebase
+from app.services.sharding import ShardQueue, run_worker, submit_codebase, wait_for
+
+
+def scan(args) -> int:
+    targets = read_targets(args.targets, args.targets_file)
+    if not targets:
+        print("no targets given", file=sys.stderr)
+        return 2
+
+    sink = open_sink(args.output, args.format)
+    pending = [t for t in targets if not sink.is_done(t)]
+    skipped = len(targets) - len(pending)
+    if skipped:
+        print(f"resuming: {skipped} of {len(targets)} targets already done", file=sys.stderr)
+
+    failed = 0
+    start = time.perf_counter()
+
+    try:
+        for n, record in enumerate(scan_targets(pending, args.jobs, args.io_workers), 1):
+            prefix = f"[{n}/{len(pending)}] {record['target']}"
+            if "error" in record:
+                failed += 1
+                print(f"{prefix}: FAILED {record['error']}", file=sys.stderr)
+                continue
+
+            sink.write(record)
+            print(f"{prefix}: {len(record['files'])} files in {record['elapsed']}s", file=sys.stderr)
+    finally:
+        sink.close()
+
+    print(
+        f"done: {len(pending) - failed} scanned, {failed} failed, {skipped} skipped"
+        f" in {time.perf_counter() - start:.1f}s",
+        file=sys.stderr,
+    )
+    return 1 if failed else 0
+
+
+def shard(args) -> int:
+    queue = ShardQueue(args.queue)
+    start = time.perf_counter()
+    job_id = submit_codebase(queue, args.root, args.shards)
+    print(f"job {job_id} submitted", file=sys.stderr)
+
+    workers = [
+        multiprocessing.Process(target=run_worker, args=(queue, True, args.io_workers))
+        for _ in range(args.local_workers)
+    ]
+    for worker in workers:
+        worker.start()
+
+    try:
+        last = None
+        for progress in wait_for(queue, job_id):
+            if progress != last:
+                print("  " + ", ".join(f"{k} {v}" for k, v in sorted(progress.items())), file=sys.stderr)
+                last = progress
+    finally:
+        for worker in workers:
+            worker.join()
+
+    errors = queue.errors(job_id)
+    for shard_no, error in errors:
+        print(f"shard {shard_no} failed: {error}", file=sys.stderr)
+    if errors:
+        return 1
+
+    files, summary = queue.collect(job_id)
+    with open(args.output, "w") as f:
+        json.dump({
+            "target": os.path.abspath(args.root),
+            "analyser_version": ANALYSER_VERSION,
+            "elapsed": round(time.perf_counter() - start, 3),
+            "summary": summary.to_dict(),
+            "files": files,
+        }, f)
+
+    print(f"done: {len(files)} files in {time.perf_counter() - start:.1f}s", file=sys.stderr)
+    return 0
+
+
+def worker(args) -> int:
+    completed = run_worker(ShardQueue(args.queue), args.exit_when_idle, args.io_workers)
+    print(f"worker done: {completed} shards", file=sys.stderr)
+    return 0
+
+
+def history(args) -> int:
+    points, stats = analyze_history(args.repo, args.ref, args.max_commits, args.step)
+
+    with open(args.output, "w") as f:
+        for point in points:
+            f.write(json.dumps(point) + "\n")
+
+    print(
+        f"done: {stats['commits']} commits, {stats['analysed_blobs']} blobs analysed,"
+        f" {stats['reused_blobs']} reused in {stats['elapsed']:.1f}s",
+        file=sys.stderr,
+    )
+    return 0
+
+
+def estimate(args) -> int:
+    results, report = sample_codebase(
+        args.root, args.precision, args.time_budget, args.confidence, args.seed, args.io_workers,
+    )
+
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+
+    sample = report["sample"]
+    print(
+        f"done: {sample['files']} of {report['population']['files']} files sampled"
+        f" in {sample['elapsed']:.1f}s, stopped on {sample['stopped']}",
+        file=sys.stderr,
+    )
+    for name, metric in report["metrics"].items():
+        if metric["estimate"] is not None:
+            low, high = metric["ci"]
+            print(f"  {name}: {metric['estimate']} [{low}, {high}]", file=sys.stderr)
+    return 0
+
+
+def export(args) -> int:
+    # Only this command needs the database.
+    from app.database.database import SessionLocal
+    from app.services.export import iter_batches, write_parquet
+
+    start = time.perf_counter()
+    with SessionLocal() as db:
+        batches = iter_batches(db, args.granularity, args.since, args.until, args.source_type)
+        rows = write_parquet(batches, args.output, args.granularity)
+
+    print(f"done: {rows} {args.granularity} rows in {time.perf_counter() - start:.1f}s", file=sys.stderr)
+    return 0
+
+
+def push_hook(args) -> int:
+    # Imported here: the webhook service pulls in the database layer.
+    from app.services.webhooks import push_payload, sign
+
+    body = json.dumps(push_payload(args.repo, args.repo_url, args.ref, args.before)).encode()
+    request = urllib.request.Request(args.url, data=body, method="POST", headers={
+        "Content-Type": "application/json",
+        "User-Agent": "GitHub-Hookshot/greencode-cli",
+        "X-GitHub-Event": args.event,
+        "X-GitHub-Delivery": str(uuid.uuid4()),
+        "X-Hub-Signature-256": sign(args.secret, body),
+    })
+
+    try:
+        with urllib.request.urlopen(request) as response:
+            status, reply = response.status, response.read().decode()
+    except urllib.error.HTTPError as exc:
+        status, reply = exc.code, exc.read().decode()
+
+    print(f"{status} {reply}", file=sys.stderr)
+    return 0 if status < 400 else 1
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m app.cli")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    p = commands.add_parser("scan", help="analyse local paths or git URLs")
+    p.add_argument("targets", nargs="*", help="local paths or git URLs")
+    p.add_argument("--targets-file", help="file with one target per line")
+    p.add_argument("--output", "-o", required=True,
+                   help="JSONL file, or directory of per-repo files for parquet")
+    p.add_argument("--format", choices=FORMATS, default="jsonl")
+    p.add_argument("--jobs", "-j", type=int, default=os.cpu_count() or 1,
+                   help="repositories analysed in parallel")
+    p.add_argument("--io-workers", type=int, default=None,
+                   help="file reader threads per repository (default ANALYSIS_IO_WORKERS)")
+    p.set_defaults(func=scan)
+
+    p = commands.add_parser("shard", help="split one tree into shards, wait and merge")
+    p.add_argument("root")
+    p.add_argument("--queue", required=True, help="SQLite queue file shared with workers on this machine")
+    p.add_argument("--shards", type=int, default=(os.cpu_count() or 1) * 4)
+    p.add_argument("--local-workers", type=int, default=os.cpu_count() or 1,
+                   help="workers started by this command (0 to rely on separately started workers)")
+    p.add_argument("--io-workers", type=int, default=None)
+    p.add_argument("--output", "-o", required=True, help="merged result as JSON")
+    p.set_defaults(func=shard)
+
+    p = commands.add_parser("worker", help="process shards from a queue")
+    p.add_argument("--queue", required=True)
+    p.add_argument("--exit-when-idle", action="store_true")
+    p.add_argument("--io-workers", type=int, default=None)
+    p.set_defaults(func=worker)
+
+    p = commands.add_parser("history", help="comment-quality trend over a repository's history")
+    p.add_argument("repo", help="local git repository (bare or not)")
+    p.add_argument("--ref", default="HEAD")
+    p.add_argument("--max-commits", type=int, default=None, help="newest commits to cover")
+    p.add_argument("--step", type=int, default=1, help="keep every N-th commit")
+    p.add_argument("--output", "-o", required=True, help="JSONL, one point per commit")
+    p.set_defaults(func=history)
+
+    p = commands.add_parser("estimate", help="estimate comment metrics from a stratified sample")
+    p.add_argument("root")
+    p.add_argument("--precision", type=float, default=None,
+                   help="target relative margin of the mean comments per file/function")
+    p.add_argument("--time-budget", type=float, default=None, help="seconds to spend at most")
+    p.add_argument("--confidence", type=float, default=None, help="default SAMPLE_CONFIDENCE")
+    p.add_argument("--seed", type=int, default=0)
+    p.add_argument("--io-workers", type=int, default=None)
+    p.add_argument("--output", "-o", required=True, help="estimate report as JSON")
+    p.set_defaults(func=estimate)
+
+    p = commands.add_parser("export", help="export stored analyses to Parquet")
+    p.add_argument("--granularity", choices=("files", "functions", "comments"), default="files")
+    p.add_argument("--since", type=datetime.fromisoformat, default=None)
+    p.add_argument("--until", type=datetime.fromisoformat, default=None)
+    p.add_argument("--source-type", default=None)
+    p.add_argument("--output", "-o", required=True)
+    p.set_defaults(func=export)
+
+    p = commands.add_parser("push-hook", help="post a GitHub-style push webhook for a local clone")
+    p.add_argument("repo", help="local git repository whose HEAD is reported as pushed")
+    p.add_argument("--repo-url", required=True, help="registered repository URL")
+    p.add_argument("--secret", required=True, help="webhook secret returned on registration")
+    p.add_argument("--url", default="http://localhost:8000/webhooks/github")
+    p.add_argument("--ref", default=None, help="pushed ref (default: the clone's current branch)")
+    p.add_argument("--before", default=None, help="previous tip (default: HEAD's parent)")
+    p.add_argument("--event", default="push", help="X-GitHub-Event header, e.g. ping")
+    p.set_defaults(func=push_hook)
+
+    args = parser.parse_args(argv)
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -17,4 +17,65 @@ class Settings:
         "BASE_ANALYSIS_PATH", "/tmp/greencode"
     )
 
+    ANALYSIS_INCLUDE: str = os.getenv("ANALYSIS_INCLUDE", "*.py,*.java")
+    # Gitignore-style patterns; the default skips dependency and build
+    # output directories. Set to "" to analyse them as well.
+    ANALYSIS_EXCLUDE: str = os.getenv(
+        "ANALYSIS_EXCLUDE",
+        "venv/,.venv/,env/,node_modules/,site-packages/,vendor/,third_party/,"
+        "build/,dist/,target/,out/,.idea/,.vscode/",
+    )
+    MAX_ANALYSIS_FILE_BYTES: int = int(
+        os.getenv("MAX_ANALYSIS_FILE_BYTES", 2 * 1024 * 1024)
+    )
+    # Larger files, up to this size, are parsed as a stream instead of
+    # being read whole; 0 skips them as before.
+    STREAMING_MAX_FILE_BYTES: int = int(
+        os.getenv("STREAMING_MAX_FILE_BYTES", 512 * 1024 * 1024)
+    )
+    # "builtin" parses with ast/javalang; "tree-sitter" with the optional
+    # tree-sitter grammars, which tolerate syntax errors.
+    PARSER_BACKEND: str = os.getenv("PARSER_BACKEND", "builtin")
+    ANALYSIS_IO_WORKERS: int = int(os.getenv("ANALYSIS_IO_WORKERS", 8))
+    # Processes in the warm analysis worker tier; 0 analyses in the
+    # request thread. Workers are replaced after ANALYSIS_WORKER_MAX_JOBS.
+    ANALYSIS_WORKERS: int = int(os.getenv("ANALYSIS_WORKERS", 0))
+    ANALYSIS_WORKER_MAX_JOBS: int = int(os.getenv("ANALYSIS_WORKER_MAX_JOBS", 100))
+    ANALYSIS_WORKER_START_METHOD: str = os.getenv("ANALYSIS_WORKER_START_METHOD", "forkserver")
+    # Admission control for analysis endpoints: at most
+    # ADMISSION_CPU_SLOTS jobs (default: ANALYSIS_WORKERS, else the CPU
+    # count) and ADMISSION_MEMORY_BYTES of estimated peak memory
+    # (default: 60% of RAM) run at once; others wait up to
+    # ADMISSION_QUEUE_SECONDS. Requests beyond ADMISSION_MAX_PENDING in
+    # total or ADMISSION_USER_MAX_PENDING per user get 429 at once.
+    ADMISSION_ENABLED: bool = os.getenv("ADMISSION_ENABLED", "true").lower() == "true"
+    ADMISSION_CPU_SLOTS: int = int(os.getenv("ADMISSION_CPU_SLOTS", 0))
+    ADMISSION_MEMORY_BYTES: int = int(os.getenv("ADMISSION_MEMORY_BYTES", 0))
+    ADMISSION_QUEUE_SECONDS: float = float(os.getenv("ADMISSION_QUEUE_SECONDS", 30))
+    ADMISSION_MAX_PENDING: int = int(os.getenv("ADMISSION_MAX_PENDING", 16))
+    ADMISSION_USER_MAX_PENDING: int = int(os.getenv("ADMISSION_USER_MAX_PENDING", 2))
+    HISTORY_MAX_COMMITS: int = int(os.getenv("HISTORY_MAX_COMMITS", 1000))
+    # Sampling mode stops once the mean comments per file and per
+    # function are known to within this relative margin.
+    SAMPLE_PRECISION: float = float(os.getenv("SAMPLE_PRECISION", 0.05))
+    SAMPLE_CONFIDENCE: float = float(os.getenv("SAMPLE_CONFIDENCE", 0.95))
+    # Push webhooks: a repository is pre-analysed once its pushes have
+    # been quiet for WEBHOOK_DEBOUNCE_SECONDS, or at most
+    # WEBHOOK_MAX_DELAY_SECONDS after the first push of a burst.
+    WEBHOOK_DEBOUNCE_SECONDS: float = float(os.getenv("WEBHOOK_DEBOUNCE_SECONDS", 10))
+    WEBHOOK_MAX_DELAY_SECONDS: float = float(os.getenv("WEBHOOK_MAX_DELAY_SECONDS", 60))
+    WEBHOOK_WORKERS: int = int(os.getenv("WEBHOOK_WORKERS", 2))
+
+    # "json" stores results as JSONB, "packed" as zstd-compressed msgpack.
+    RESULT_STORAGE_FORMAT: str = os.getenv("RESULT_STORAGE_FORMAT", "json")
+
+    # Defaults match the production Gmail relay; a local sink can be used
+    # with SMTP_SSL=false (login is skipped when no password is set).
+    SMTP_HOST: str = os.getenv("SMTP_HOST", "smtp.gmail.com")
+    SMTP_PORT: int = int(os.getenv("SMTP_PORT", 465))
+    SMTP_SSL: bool = os.getenv("SMTP_SSL", "true").lower() == "true"
+
+    TRACING_ENABLED: bool = os.getenv("TRACING_ENABLED", "false").lower() == "true"
+    TRACE_SLOW_SECONDS: float = float(os.getenv("TRACE_SLOW_SECONDS", 5))
+
 settings = Settings()
@@ -0,0 +1,75 @@
+import time
+from prometheus_client import Counter, Gauge, Histogram, generate_latest
+
+REQUEST_LATENCY = Histogram(
+    "greencode_http_request_duration_seconds",
+    "HTTP request latency by route",
+    ["method", "route", "status"],
+)
+
+STAGE_DURATION = Histogram(
+    "greencode_stage_duration_seconds",
+    "Time spent per pipeline stage (clone, walk, read, parse, analyse, consistency, db_commit, argon2, smtp)",
+    ["stage"],
+    buckets=(0.001, 0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300),
+)
+
+CACHE_REQUESTS = Counter(
+    "greencode_cache_requests_total",
+    "Cache lookups by cache name and outcome",
+    ["cache", "outcome"],
+)
+
+QUEUE_DEPTH = Gauge(
+    "greencode_queue_depth",
+    "Number of items waiting in a work queue",
+    ["queue"],
+)
+
+ADMISSION_DECISIONS = Counter(
+    "greencode_admission_decisions_total",
+    "Analysis admission outcomes (admitted, queued, overloaded, quota_exceeded)",
+    ["outcome"],
+)
+
+DB_POOL_CONNECTIONS = Gauge(
+    "greencode_db_pool_connections",
+    "SQLAlchemy connection pool state",
+    ["state"],
+)
+
+
+def record_cache(cache: str, hit: bool):
+    CACHE_REQUESTS.labels(cache, "hit" if hit else "miss").inc()
+
+
+def _collect_db_pool():
+    from app.database.database import engine
+
+    pool = engine.pool
+    for state in ("size", "checkedin", "checkedout", "overflow"):
+        read = getattr(pool, state, None)
+        if callable(read):
+            DB_POOL_CONNECTIONS.labels(state).set(read())
+
+
+def render_metrics() -> bytes:
+    _collect_db_pool()
+    return generate_latest()
+
+
+async def track_request_latency(request, call_next):
+    start = time.perf_counter()
+    status = 500
+
+    try:
+        response = await call_next(request)
+        status = response.status_code
+        return response
+    finally:
+        route = request.scope.get("route")
+        REQUEST_LATENCY.labels(
+            request.method,
+            route.path if route else "unmatched",
+            str(status),
+        ).observe(time.perf_counter() - start)
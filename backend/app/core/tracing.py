@@ -0,0 +1,119 @@
+import logging
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, List, Optional
+
+from app.core.config import settings
+from app.core.metrics import STAGE_DURATION
+
+logger = logging.getLogger(__name__)
+
+_current_trace: ContextVar[Optional["Trace"]] = ContextVar("greencode_trace", default=None)
+
+
+class Trace:
+    """
+    Span-style breakdown of one request or analysis.
+    Spans are recorded as (name, offset from trace start, duration).
+    """
+
+    __slots__ = ("name", "attributes", "start", "spans")
+
+    def __init__(self, name: str, **attributes):
+        self.name = name
+        self.attributes = attributes
+        self.start = time.perf_counter()
+        self.spans: List[tuple] = []
+
+    def record(self, name: str, started: float, duration: float):
+        self.spans.append((name, started - self.start, duration))
+
+    @property
+    def elapsed(self) -> float:
+        return time.perf_counter() - self.start
+
+    def breakdown(self) -> Dict[str, float]:
+        totals: Dict[str, float] = {}
+        for name, _, duration in self.spans:
+            totals[name] = totals.get(name, 0.0) + duration
+        return totals
+
+
+def _observe(name: str, started: float, duration: float):
+    STAGE_DURATION.labels(name).observe(duration)
+
+    trace = _current_trace.get()
+    if trace is not None:
+        trace.record(name, started, duration)
+
+
+@contextmanager
+def span(name: str):
+    """Times a single stage, e.g. clone, db_commit, argon2 or smtp."""
+
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        _observe(name, started, time.perf_counter() - started)
+
+
+class StageTimer:
+    """
+    Accumulates time for stages that repeat per file (read, parse,
+    analyse) and reports one total per stage on flush, so a 50k-file
+    analysis costs a handful of histogram observations, not 200k.
+    """
+
+    __slots__ = ("started", "totals")
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.totals: Dict[str, float] = {}
+
+    @contextmanager
+    def stage(self, name: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.totals[name] = self.totals.get(name, 0.0) + time.perf_counter() - start
+
+    def flush(self):
+        for name, duration in self.totals.items():
+            _observe(name, self.started, duration)
+        self.totals = {}
+
+
+@contextmanager
+def start_trace(name: str, **attributes):
+    """
+    Opens a trace for the current context when tracing is enabled.
+    Traces slower than TRACE_SLOW_SECONDS are logged stage by stage.
+    """
+
+    if not settings.TRACING_ENABLED or _current_trace.get() is not None:
+        yield None
+        return
+
+    trace = Trace(name, **attributes)
+    token = _current_trace.set(trace)
+
+    try:
+        yield trace
+    finally:
+        _current_trace.reset(token)
+
+        elapsed = trace.elapsed
+        if elapsed >= settings.TRACE_SLOW_SECONDS:
+            stages = ", ".join(
+                f"{stage}={duration:.3f}s"
+                for stage, duration in sorted(
+                    trace.breakdown().items(), key=lambda item: -item[1]
+                )
+            )
+            logger.info(
+                "slow trace %s %.3fs %s [%s]",
+                trace.name, elapsed, trace.attributes, stages,
+            )
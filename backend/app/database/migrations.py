@@ -0,0 +1,118 @@
+"""
+Schema changes to tables that already exist. `create_all` creates
+missing tables but never alters existing ones, so databases created
+before a column was added are brought up to date here, at startup.
+Every step checks the live schema first and is skipped once applied.
+"""
+
+from typing import List, Tuple
+
+from sqlalchemy import inspect, text
+from sqlalchemy.engine import Engine
+
+from app.database.database import Base
+
+# (table, column) added after the table was first created; the DDL
+# (type, server default, NOT NULL, foreign key) comes from the model.
+ADDED_COLUMNS: List[Tuple[str, str]] = [
+    ("code_analysis", "user_id"),
+    ("code_analysis", "commit_sha"),
+    ("code_analysis", "status"),
+    ("code_analysis", "result_id"),
+    ("code_analysis", "result_packed"),
+    ("analysis_results", "result_packed"),
+    ("code_analysis", "summary"),
+    ("analysis_results", "summary"),
+]
+
+# (table, index) that was unique and no longer is.
+RELAXED_INDEXES: List[Tuple[str, str]] = [
+    ("registered_repos", "ix_registered_repos_repo_url"),
+]
+
+# (table, index) added after the table was first created.
+ADDED_INDEXES: List[Tuple[str, str]] = [
+    ("code_analysis", "ix_code_analysis_user_created"),
+    ("code_analysis", "ix_code_analysis_source_created"),
+    ("registered_repos", "ix_registered_repos_user_repo"),
+]
+
+# (table, column) whose NOT NULL constraint was dropped.
+NULLABLE_COLUMNS: List[Tuple[str, str]] = [
+    ("code_analysis", "result"),
+    ("analysis_results", "result"),
+]
+
+# (table, column) of SQLite timestamps that listings page by: values
+# from CURRENT_TIMESTAMP lack the fractional seconds the application
+# writes, and SQLite compares them as text.
+PADDED_TIMESTAMPS: List[Tuple[str, str]] = [
+    ("code_analysis", "created_at"),
+]
+
+# (table, column) that became NOT NULL; rows without a value are given
+# the column's server default first.
+REQUIRED_COLUMNS: List[Tuple[str, str]] = [
+    ("code_analysis", "created_at"),
+]
+
+
+def _ddl_compiler(engine: Engine):
+    return engine.dialect.ddl_compiler(engine.dialect, None)
+
+
+def _column_ddl(engine: Engine, table: str, column: str) -> str:
+    model = Base.metadata.tables[table].columns[column]
+    ddl = _ddl_compiler(engine).get_column_specification(model)
+    for fk in model.foreign_keys:
+        ddl += f" REFERENCES {fk.column.table.name}({fk.column.name})"
+    return ddl
+
+
+def _model_index(table: str, name: str):
+    return next(index for index in Base.metadata.tables[table].indexes if index.name == name)
+
+
+def upgrade(engine: Engine):
+    inspector = inspect(engine)
+    existing = set(inspector.get_table_names())
+    columns = {table: {c["name"]: c for c in inspector.get_columns(table)} for table in existing}
+    indexes = {table: {i["name"]: i for i in inspector.get_indexes(table)} for table in existing}
+
+    with engine.begin() as conn:
+        for table, column in ADDED_COLUMNS:
+            if table in existing and column not in columns[table]:
+                conn.execute(text(f"ALTER TABLE {table} ADD COLUMN {_column_ddl(engine, table, column)}"))
+                for index in Base.metadata.tables[table].indexes:
+                    if [c.name for c in index.columns] == [column]:
+                        index.create(conn, checkfirst=True)
+
+        for table, name in RELAXED_INDEXES:
+            if table in existing and indexes[table].get(name, {}).get("unique"):
+                conn.execute(text(f"DROP INDEX {name}"))
+                _model_index(table, name).create(conn)
+
+        for table, name in ADDED_INDEXES:
+            if table in existing and name not in indexes[table]:
+                _model_index(table, name).create(conn)
+
+        if engine.dialect.name == "sqlite":
+            for table, column in PADDED_TIMESTAMPS:
+                if table in existing:
+                    conn.execute(text(
+                        f"UPDATE {table} SET {column} = {column} || '.000000' WHERE length({column}) = 19"
+                    ))
+
+        # SQLite cannot change a column's constraints in place; its
+        # databases are local stand-ins, recreated rather than upgraded.
+        if engine.dialect.name != "sqlite":
+            for table, column in NULLABLE_COLUMNS:
+                if table in existing and not columns[table][column]["nullable"]:
+                    conn.execute(text(f"ALTER TABLE {table} ALTER COLUMN {column} DROP NOT NULL"))
+
+            for table, column in REQUIRED_COLUMNS:
+                if table in existing and columns[table][column]["nullable"]:
+                    model = Base.metadata.tables[table].columns[column]
+                    default = _ddl_compiler(engine).get_column_default_string(model)
+                    conn.execute(text(f"UPDATE {table} SET {column} = {default} WHERE {column} IS NULL"))
+                    conn.execute(text(f"ALTER TABLE {table} ALTER COLUMN {column} SET NOT NULL"))
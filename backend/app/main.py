@@ -1,10 +1,17 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
 from app.auth.router import router as auth_router
 from app.database.database import Base, engine
-from app.routes import contact, analysis, github
+from app.database.migrations import upgrade
+from app.routes import contact, analysis, github, metrics, webhooks
+from app.core.metrics import track_request_latency
+from app.services.worker_pool import start_pool, stop_pool
+from app.services.prefetch import start_prefetch, stop_prefetch
+from app.services.admission import Rejected
 
 Base.metadata.create_all(bind=engine)
+upgrade(engine)
 
 app = FastAPI()
 
@@ -15,8 +22,29 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+app.middleware("http")(track_request_latency)
+
+
+# Analyses refused by admission control: come back after Retry-After seconds.
+@app.exception_handler(Rejected)
+def admission_rejected(request, exc: Rejected):
+    return JSONResponse(
+        status_code=429,
+        content={"detail": exc.detail},
+        headers={"Retry-After": str(exc.retry_after)},
+    )
+
+
+# Warm analysis workers are started with the app, before the first request.
+app.add_event_handler("startup", start_pool)
+app.add_event_handler("shutdown", stop_pool)
+# Push pre-analysis runs in the background of the API process.
+app.add_event_handler("startup", start_prefetch)
+app.add_event_handler("shutdown", stop_prefetch)
 
 app.include_router(auth_router)
 app.include_router(contact.router)
 app.include_router(analysis.router)
 app.include_router(github.router)
+app.include_router(metrics.router)
+app.include_router(webhooks.router)
@@ -1,14 +1,118 @@
-from sqlalchemy import Column, Integer, String, DateTime
+from datetime import datetime, timezone
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Index, JSON, LargeBinary
 from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
+from app.analysers.records import as_dicts
+from app.core.config import settings
 from app.database.database import Base
+from app.utils.result_codec import encode_result, decode_result
 
-class CodeAnalysis(Base):
+# Plain JSON on SQLite, which stands in for Postgres in local runs.
+JSONDocument = JSONB().with_variant(JSON(), "sqlite")
+
+class StoredResultMixin:
+    """
+    A result is kept either as JSONB (`result`) or, when
+    RESULT_STORAGE_FORMAT=packed, as compact binary (`result_packed`).
+    Reads through `stored_result` decode either form transparently.
+    `summary` is the small repository-level aggregate, always JSONB.
+    Per-function and per-comment rows go to a separate `details` row.
+    """
+    result = Column(JSONDocument, nullable=True)
+    result_packed = Column(LargeBinary, nullable=True)
+    summary = Column(JSONDocument, nullable=True)
+
+    def set_result(self, value, summary=None):
+        self.summary = summary
+        rows = [r.details() for r in value if hasattr(r, "details")]
+        self.details = AnalysisDetails(packed=encode_result(rows)) if rows else None
+        if settings.RESULT_STORAGE_FORMAT == "packed":
+            self.result = None
+            self.result_packed = encode_result(value)
+        else:
+            self.result = as_dicts(value)
+            self.result_packed = None
+
+    @property
+    def stored_result(self):
+        if self.result_packed is not None:
+            return decode_result(self.result_packed)
+        return self.result
+
+    @property
+    def stored_details(self):
+        return decode_result(self.details.packed) if self.details is not None else []
+
+class AnalysisDetails(Base):
+    """
+    Per-function and per-comment rows of one stored result (see
+    `FileAnalysis.details`), always packed. Kept out of the result
+    columns: only the export reads them.
+    """
+    __tablename__ = "analysis_details"
+
+    id = Column(Integer, primary_key=True, index=True)
+    analysis_id = Column(Integer, ForeignKey("code_analysis.id"), nullable=True, unique=True)
+    result_id = Column(Integer, ForeignKey("analysis_results.id"), nullable=True, unique=True)
+    packed = Column(LargeBinary, nullable=False)
+
+class AnalysisResult(StoredResultMixin, Base):
+    """
+    Content-addressed analysis result shared by every CodeAnalysis of the
+    same (repo URL, commit SHA, analyser version).
+    """
+    __tablename__ = "analysis_results"
+
+    id = Column(Integer, primary_key=True, index=True)
+    content_key = Column(String, unique=True, index=True, nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    details = relationship(AnalysisDetails, uselist=False, foreign_keys=[AnalysisDetails.result_id],
+                           cascade="all, delete-orphan")
+
+class CodeAnalysis(StoredResultMixin, Base):
+    """
+    One analysis run, owned by the user who requested it. Listings page
+    by (created_at, id), newest first, so both indexes end in that key.
+    """
     __tablename__ = "code_analysis"
+    __table_args__ = (
+        Index("ix_code_analysis_user_created", "user_id", "created_at", "id"),
+        Index("ix_code_analysis_source_created", "source_ref", "created_at", "id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=True)
     source_type = Column(String, nullable=False)
     source_ref = Column(String, nullable=False)
+    commit_sha = Column(String, nullable=True)
     language = Column(String, nullable=False)
-    result = Column(JSONB, nullable=False)
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    status = Column(String, nullable=False, default="success", server_default="success")
+    result_id = Column(Integer, ForeignKey("analysis_results.id"), nullable=True, index=True)
+    # Set by the application as well: SQLite's CURRENT_TIMESTAMP has no
+    # fractional seconds, and listings need one format to page by.
+    created_at = Column(DateTime(timezone=True), nullable=False,
+                        default=lambda: datetime.now(timezone.utc), server_default=func.now())
+
+    shared_result = relationship(AnalysisResult)
+    details = relationship(AnalysisDetails, uselist=False, foreign_keys=[AnalysisDetails.analysis_id],
+                           cascade="all, delete-orphan")
+
+    @property
+    def payload(self):
+        if self.result_id is not None:
+            return self.shared_result.stored_result
+        return self.stored_result
+
+    @property
+    def payload_summary(self):
+        if self.result_id is not None:
+            return self.shared_result.summary
+        return self.summary
+
+    @property
+    def payload_details(self):
+        if self.result_id is not None:
+            return self.shared_result.stored_details
+        return self.stored_details
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, ARRAY
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, ARRAY, JSON
 from app.database.database import Base
 from datetime import datetime
 
@@ -16,7 +16,7 @@ class User(Base):
 
     role = Column(String, nullable=True)
     experience_level = Column(String, nullable=True)
-    preferred_languages = Column(ARRAY(String), nullable=True)
+    preferred_languages = Column(ARRAY(String).with_variant(JSON(), "sqlite"), nullable=True)
 
     reset_otp_hash = Column(String, nullable=True)
     reset_otp_expires = Column(DateTime, nullable=True)
@@ -0,0 +1,26 @@
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Index
+from sqlalchemy.sql import func
+from app.database.database import Base
+
+class RegisteredRepo(Base):
+    """
+    A user's registration of a repository whose pushes are pre-analysed.
+    `repo_url` is stored normalised and may be registered by several
+    users; each registration has its own webhook secret, and a push
+    belongs to the registration whose secret signed it.
+    `last_analyzed_sha` is the newest commit with a stored result,
+    reused file by file for the next push.
+    """
+    __tablename__ = "registered_repos"
+    __table_args__ = (
+        Index("ix_registered_repos_user_repo", "user_id", "repo_url", unique=True),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
+    repo_url = Column(String, index=True, nullable=False)
+    webhook_secret = Column(String, nullable=False)
+    branch = Column(String, nullable=True)
+    last_pushed_sha = Column(String, nullable=True)
+    last_analyzed_sha = Column(String, nullable=True)
+    created_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
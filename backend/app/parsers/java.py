@@ -1,8 +1,10 @@
 import javalang
-from typing import Dict, Any, List
 
+from app.parsers.records import ClassRecord, FunctionRecord, ParsedSource
+from app.parsers.streaming import java_comments, javadoc
 
-def parse_java(code: str) -> Dict[str, Any]:
+
+def parse_java(code: str) -> ParsedSource:
     """
     Parses Java source code and extracts:
     - class declarations
@@ -10,38 +12,33 @@ def parse_java(code: str) -> Dict[str, Any]:
     - comments
     """
 
-    classes: List[Dict[str, Any]] = []
-    methods: List[Dict[str, Any]] = []
-    comments: List[str] = []
+    result = ParsedSource()
 
     try:
         tree = javalang.parse.parse(code)
 
         for path, node in tree:
             if isinstance(node, javalang.tree.ClassDeclaration):
-                classes.append({
-                    "name": node.name,
-                    "line": node.position.line if node.position else None
-                })
+                result.classes.append(ClassRecord(
+                    node.name,
+                    node.position.line if node.position else None,
+                ))
 
             elif isinstance(node, javalang.tree.MethodDeclaration):
-                methods.append({
-                    "name": node.name,
-                    "line": node.position.line if node.position else None
-                })
-
-    except (javalang.parser.JavaSyntaxError, IndexError):
+                result.functions.append(FunctionRecord(
+                    node.name,
+                    node.position.line if node.position else None,
+                    docstring=javadoc(node.documentation),
+                    params=[p.name for p in node.parameters],
+                ))
+
+    except (javalang.parser.JavaSyntaxError, javalang.tokenizer.LexerError, IndexError):
         pass
 
-    try:
-        for token in javalang.tokenizer.tokenize(code):
-            if isinstance(token, javalang.tokenizer.Comment):
-                comments.append(token.value)
-    except Exception:
-        pass
+    # javalang's tokenizer drops comments other than Javadoc, so they are
+    # scanned separately, with the same tokenizer used for streaming.
+    for text, line in java_comments(code):
+        result.comments.append(text)
+        result.comment_lines.append(line)
 
-    return {
-        "classes": classes,
-        "methods": methods,
-        "comments": comments
-    }
+    return result
@@ -1,10 +1,21 @@
 import ast
 import tokenize
 from io import BytesIO
-from typing import Dict, Any
+from typing import Tuple
 
+from app.parsers.records import ClassRecord, FunctionRecord, ParsedSource
 
-def parse_python(code: str) -> Dict[str, Any]:
+
+def _params(args: ast.arguments) -> Tuple[str, ...]:
+    names = [a.arg for a in args.posonlyargs + args.args + args.kwonlyargs]
+    if args.vararg:
+        names.append(args.vararg.arg)
+    if args.kwarg:
+        names.append(args.kwarg.arg)
+    return tuple(n for n in names if n not in ("self", "cls"))
+
+
+def parse_python(code: str) -> ParsedSource:
     """
     Parses Python source code and extracts:
     - file-level docstring
@@ -14,45 +25,35 @@ def parse_python(code: str) -> Dict[str, Any]:
     """
 
     tree = ast.parse(code)
-
-    result = {
-        "functions": [],
-        "classes": [],
-        "docstrings": [],
-        "inline_comments": []
-    }
-
-    file_doc = ast.get_docstring(tree)
-    if file_doc:
-        result["docstrings"].append({
-            "scope": "file",
-            "text": file_doc
-        })
+    result = ParsedSource()
+    result.file_docstring = ast.get_docstring(tree) or None
 
     for node in ast.walk(tree):
         if isinstance(node, ast.FunctionDef):
-            result["functions"].append({
-                "name": node.name,
-                "start_line": node.lineno,
-                "end_line": getattr(node, "end_lineno", node.lineno),
-                "docstring": ast.get_docstring(node)
-            })
+            result.functions.append(FunctionRecord(
+                node.name,
+                node.lineno,
+                getattr(node, "end_lineno", node.lineno),
+                ast.get_docstring(node),
+                _params(node.args),
+            ))
 
         elif isinstance(node, ast.ClassDef):
-            result["classes"].append({
-                "name": node.name,
-                "start_line": node.lineno,
-                "end_line": getattr(node, "end_lineno", node.lineno),
-                "docstring": ast.get_docstring(node)
-            })
+            result.classes.append(ClassRecord(
+                node.name,
+                node.lineno,
+                getattr(node, "end_lineno", node.lineno),
+                ast.get_docstring(node),
+            ))
 
     try:
         tokens = tokenize.tokenize(BytesIO(code.encode()).readline)
         for token in tokens:
             if token.type == tokenize.COMMENT:
-                result["inline_comments"].append(
+                result.comments.append(
                     token.string.lstrip("# ").strip()
                 )
+                result.comment_lines.append(token.start[0])
     except tokenize.TokenError:
         pass
 
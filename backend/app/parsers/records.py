@@ -0,0 +1,43 @@
+import sys
+from typing import List, Optional, Tuple
+
+
+class FunctionRecord:
+    """
+    A function, method or class definition. `end_line` is None where the
+    parser cannot tell; `params` excludes self/cls.
+    """
+
+    __slots__ = ("name", "start_line", "end_line", "docstring", "params")
+
+    def __init__(self, name: str, start_line: Optional[int], end_line: Optional[int] = None,
+                 docstring: Optional[str] = None, params: Tuple[str, ...] = ()):
+        self.name = sys.intern(name)
+        self.start_line = start_line
+        self.end_line = end_line
+        self.docstring = docstring
+        self.params = tuple(sys.intern(p) for p in params)
+
+    def __repr__(self):
+        return f"{type(self).__name__}({self.name!r}, {self.start_line}, {self.end_line})"
+
+
+class ClassRecord(FunctionRecord):
+    __slots__ = ()
+
+
+class ParsedSource:
+    """
+    Parser output shared by all languages. `comments` are inline/block
+    comments in source order, with their line numbers in `comment_lines`;
+    docstrings live on their owners.
+    """
+
+    __slots__ = ("functions", "classes", "file_docstring", "comments", "comment_lines")
+
+    def __init__(self):
+        self.functions: List[FunctionRecord] = []
+        self.classes: List[ClassRecord] = []
+        self.file_docstring: Optional[str] = None
+        self.comments: List[str] = []
+        self.comment_lines: List[Optional[int]] = []
@@ -0,0 +1,451 @@
+"""
+Incremental extraction for source files too large to hold in memory.
+
+Both languages are consumed from a reader a line or a chunk at a time
+and emit events as they are recognised: ("docstring", text) for the
+module docstring, ("comment", line, text), and ("function", record) /
+("class", record) once a definition's end is known. Memory is bounded
+by the largest single construct (a line, a string literal, a block
+comment), not by the file.
+"""
+
+import ast
+import codecs
+import inspect
+import re
+import tokenize
+from typing import Any, Callable, Iterator, List, Optional, Tuple
+
+from app.parsers.records import ClassRecord, FunctionRecord, ParsedSource
+
+Event = Tuple[Any, ...]
+
+CHUNK_CHARS = 1 << 20
+
+
+def _text_lines(readline: Callable[[], bytes]) -> Callable[[], str]:
+    # Same lenient decoding and newline handling as files read whole.
+    decode = codecs.getincrementaldecoder("utf-8")(errors="ignore").decode
+
+    def next_line() -> str:
+        line = decode(readline())
+        return line[:-2] + "\n" if line.endswith("\r\n") else line
+
+    return next_line
+
+
+def _text_chunks(read: Callable[[int], bytes]) -> Callable[[int], str]:
+    decode = codecs.getincrementaldecoder("utf-8")(errors="ignore").decode
+    held = ""      # a trailing "\r" may be the first half of "\r\n"
+
+    def next_chunk(size: int) -> str:
+        nonlocal held
+        while True:
+            data = read(size)
+            text = held + decode(data, final=not data)
+            held = ""
+            if data and text.endswith("\r"):
+                text, held = text[:-1], "\r"
+            text = text.replace("\r\n", "\n").replace("\r", "\n")
+            # An empty string means end of file to the tokenizer.
+            if text or not data:
+                return text
+
+    return next_chunk
+
+
+# --- Python ----------------------------------------------------------------
+
+class _Definition:
+    __slots__ = ("kind", "name", "line", "params", "docstring", "body_depth", "recorded", "strings")
+
+    def __init__(self, kind: str, line: int, recorded: bool = True):
+        self.kind = kind
+        self.name: Optional[str] = None
+        self.line = line
+        self.params: List[Tuple[int, str]] = []
+        self.docstring: Optional[str] = None
+        self.body_depth: Optional[int] = None
+        self.recorded = recorded
+        self.strings: Optional[List[str]] = None
+
+    def event(self, end_line: int) -> Event:
+        if self.kind == "class":
+            return "class", ClassRecord(self.name, self.line, end_line, self.docstring)
+        # ast order: named parameters first, then *args, then **kwargs.
+        ordered = sorted(self.params, key=lambda p: p[0])
+        params = tuple(name for _, name in ordered if name not in ("self", "cls"))
+        return "function", FunctionRecord(self.name, self.line, end_line, self.docstring, params)
+
+
+def docstring_value(strings: List[str]) -> Optional[str]:
+    """Value of a docstring statement, cleaned like ast.get_docstring."""
+
+    try:
+        value = ast.literal_eval(" ".join(strings))
+    except (ValueError, SyntaxError):
+        return None      # f-strings are not docstrings
+    return inspect.cleandoc(value) if isinstance(value, str) else None
+
+
+def python_events(readline: Callable[[], str]) -> Iterator[Event]:
+    """
+    Streams a Python module through `tokenize`. Definitions are found
+    from `def`/`class` headers and closed at the DEDENT that leaves their
+    body (or the end of the line for one-line bodies); a docstring is a
+    body's first statement when it is a plain string. `async def` bodies
+    are traversed but, as in `parse_python`, not reported.
+    """
+
+    module = _Definition("module", 1, recorded=False)
+    awaiting: Optional[_Definition] = module     # may see its docstring next
+    open_defs: List[_Definition] = []
+    header: Optional[_Definition] = None
+    header_brackets = 0
+    in_params = False
+    param_slot: Optional[int] = None             # 0 name, 1 *args, 2 **kwargs
+    header_prev = ""
+    one_line: Optional[_Definition] = None       # `def f(): return 1`
+
+    depth = 0
+    last_line = 0
+    statement_start = True
+    is_async = False
+
+    def close_deeper_than(level: int):
+        while open_defs and open_defs[-1].body_depth > level:
+            done = open_defs.pop()
+            if done.recorded:
+                yield done.event(last_line)
+
+    try:
+        for tok in tokenize.generate_tokens(readline):
+            kind, string = tok.type, tok.string
+
+            if kind == tokenize.COMMENT:
+                yield "comment", tok.start[0], string.lstrip("# ").strip()
+                continue
+            if kind == tokenize.NL:
+                continue
+            if kind == tokenize.INDENT:
+                depth += 1
+                statement_start = True
+                continue
+            if kind == tokenize.DEDENT:
+                depth -= 1
+                statement_start = True
+                yield from close_deeper_than(depth)
+                continue
+            if kind == tokenize.ENDMARKER:
+                break
+            if kind != tokenize.NEWLINE:
+                last_line = tok.end[0]
+
+            if awaiting is not None:
+                if kind == tokenize.STRING and (statement_start or awaiting.strings):
+                    awaiting.strings = (awaiting.strings or []) + [string]
+                    statement_start = False
+                    continue
+                if kind == tokenize.NEWLINE and awaiting.strings:
+                    awaiting.docstring = docstring_value(awaiting.strings)
+                    if awaiting is module and awaiting.docstring:
+                        yield "docstring", awaiting.docstring
+                awaiting.strings = None
+                awaiting = None
+
+            if kind == tokenize.NEWLINE:
+                statement_start = True
+                if one_line is not None:
+                    if one_line.recorded:
+                        yield one_line.event(last_line)
+                    one_line = None
+                elif header is not None and header_brackets == 0 and header_prev == ":":
+                    # Block body, opened by the INDENT that follows.
+                    header.body_depth = depth + 1
+                    open_defs.append(header)
+                    awaiting, header = header, None
+                continue
+
+            if header is not None:
+                if header_prev == ":" and header_brackets == 0:
+                    # Body on the header line; a docstring would be this token.
+                    one_line, header = header, None
+                    if kind == tokenize.STRING:
+                        one_line.strings = [string]
+                        awaiting = one_line
+                    statement_start = False
+                    continue
+                slot, param_slot = param_slot, None
+                if header.name is None:
+                    header.name = string
+                elif kind == tokenize.OP and string in "([{":
+                    header_brackets += 1
+                    if header_brackets == 1:
+                        # Only the first bracket pair after the name holds parameters.
+                        in_params = header.kind == "function" and header_prev == header.name
+                        param_slot = 0 if in_params else None
+                elif kind == tokenize.OP and string in ")]}":
+                    header_brackets -= 1
+                    if header_brackets == 0:
+                        in_params = False
+                elif in_params and header_brackets == 1 and string == ",":
+                    param_slot = 0
+                elif slot == 0 and string in ("*", "**"):
+                    param_slot = len(string)
+                elif slot is not None and kind == tokenize.NAME:
+                    header.params.append((slot, string))
+                header_prev = string
+                continue
+
+            if statement_start and kind == tokenize.NAME and string in ("def", "class"):
+                header = _Definition("function" if string == "def" else "class", tok.start[0],
+                                     recorded=not is_async)
+                header_brackets = 0
+                header_prev = string
+                statement_start = is_async = False
+                continue
+
+            is_async = statement_start and kind == tokenize.NAME and string == "async"
+            statement_start = is_async or (kind == tokenize.OP and string == ";")
+    except (tokenize.TokenError, IndentationError, SyntaxError):
+        # Truncated or invalid source: keep what was recognised.
+        pass
+
+    if one_line is not None and one_line.recorded:
+        yield one_line.event(last_line)
+    yield from close_deeper_than(-1)
+
+
+def parse_python_stream(readline: Callable[[], bytes]) -> ParsedSource:
+    """`parse_python` equivalent over a binary `readline`, one line at a time."""
+
+    result = ParsedSource()
+
+    for event in python_events(_text_lines(readline)):
+        _collect(result, event)
+
+    _order(result)
+    return result
+
+
+# --- Java ------------------------------------------------------------------
+
+# Alternatives are tried in order: text blocks before `open` (an opening
+# delimiter whose end is not in the buffer yet) before plain strings.
+JAVA_TOKEN = re.compile(
+    r"""
+      (?P<space>\s+)
+    | (?P<comment>//[^\n]*|/\*.*?\*/)
+    | (?P<text_block>\"\"\".*?\"\"\")
+    | (?P<open>/\*|\"\"\")
+    | (?P<string>"(?:\\.|[^"\\\n])*"|'(?:\\.|[^'\\\n])*')
+    | (?P<ident>[A-Za-z_$][\w$]*)
+    | (?P<other>.)
+    """,
+    re.VERBOSE | re.DOTALL,
+)
+
+JAVA_TYPE_KEYWORDS = {"class", "interface", "enum"}
+JAVA_NOT_TYPE = {
+    "public", "protected", "private", "static", "final", "abstract", "native",
+    "synchronized", "transient", "volatile", "strictfp", "default", "new",
+    "return", "throw", "else", "case", "assert",
+}
+JAVA_NOT_METHOD = {
+    "if", "for", "while", "switch", "catch", "synchronized", "try", "super", "this",
+}
+
+
+def java_tokens(read: Callable[[int], str]) -> Iterator[Tuple[str, str, int]]:
+    """
+    (kind, text, line) for comments, identifiers and punctuation;
+    whitespace and literals are consumed but not reported. Only whole
+    lines are tokenised, and reading continues while a block comment or
+    text block is still open, so no token is ever split across reads.
+    """
+
+    buffer = ""
+    line = 1
+    eof = False
+
+    while not eof:
+        chunk = read(CHUNK_CHARS)
+        eof = not chunk
+        buffer += chunk
+        limit = len(buffer) if eof else buffer.rfind("\n") + 1
+
+        pos = 0
+        for match in JAVA_TOKEN.finditer(buffer, 0, limit):
+            group = match.lastgroup
+            if group == "open":
+                if not eof:
+                    break
+                # Unterminated at end of file: the rest is one comment or literal.
+                if match.group() == "/*":
+                    yield "comment", buffer[match.start():], line
+                pos = limit
+                break
+
+            text = match.group()
+            if group == "comment":
+                yield "comment", text, line
+            elif group == "ident":
+                yield "ident", text, line
+            elif group == "other":
+                yield "op", text, line
+            if group in ("space", "comment", "text_block"):
+                line += text.count("\n")
+            pos = match.end()
+
+        buffer = buffer[pos:]
+
+
+def java_comments(code: str) -> Iterator[Tuple[str, int]]:
+    """(raw comment text, line) for every comment of an in-memory source."""
+
+    chunks = iter((code,))
+    for kind, text, line in java_tokens(lambda _: next(chunks, "")):
+        if kind == "comment":
+            yield text, line
+
+
+def javadoc(comment: Optional[str]) -> Optional[str]:
+    """Javadoc body without the comment delimiters and leading asterisks."""
+
+    if not comment:
+        return None
+
+    body = comment.strip()[3:-2]
+    lines = [line.strip().lstrip("*").strip() for line in body.splitlines()]
+    return "\n".join(lines).strip() or None
+
+
+class _JavaMethod:
+    __slots__ = ("name", "line", "doc", "params", "parens", "angles", "last_ident")
+
+    def __init__(self, name: str, line: int, doc: Optional[str]):
+        self.name = name
+        self.line = line
+        self.doc = doc
+        self.params: List[str] = []
+        self.parens = 1
+        self.angles = 0
+        self.last_ident: Optional[str] = None
+
+    def feed(self, kind: str, text: str) -> bool:
+        """Consumes one parameter-list token; True once the list is closed."""
+
+        if text == "(":
+            self.parens += 1
+        elif text == ")":
+            self.parens -= 1
+        elif text == "<":
+            self.angles += 1
+        elif text == ">":
+            self.angles -= 1
+        elif kind == "ident" and self.parens == 1 and self.angles == 0:
+            self.last_ident = text
+
+        # A parameter's name is the last identifier before its separator.
+        if (text == "," and self.parens == 1 and self.angles == 0) or (text == ")" and self.parens == 0):
+            if self.last_ident:
+                self.params.append(self.last_ident)
+            self.last_ident = None
+        return self.parens == 0
+
+    def record(self) -> FunctionRecord:
+        return FunctionRecord(self.name, self.line, docstring=javadoc(self.doc), params=tuple(self.params))
+
+
+def java_events(read: Callable[[int], str]) -> Iterator[Event]:
+    """
+    Streams Java source: comments as they occur, class declarations,
+    and methods declared directly in a class, interface or enum body
+    (name, Javadoc, parameter names). As with `parse_java`, constructors
+    are not reported and methods have no end line.
+    """
+
+    type_bodies: List[bool] = []     # per open brace: does it open a type body?
+    type_pending = False
+    assigning = False
+    doc: Optional[str] = None
+    previous: List[Tuple[str, str]] = []      # last two significant tokens
+    method: Optional[_JavaMethod] = None
+
+    for kind, text, line in java_tokens(read):
+        if kind == "comment":
+            yield "comment", line, text
+            if text.startswith("/**"):
+                doc = text
+            continue
+
+        if method is not None:
+            if method.feed(kind, text):
+                yield "function", method.record()
+                method = None
+            continue
+
+        in_type_body = bool(type_bodies) and type_bodies[-1]
+        after_dot = bool(previous) and previous[-1][1] == "."
+
+        if kind == "ident" and text in JAVA_TYPE_KEYWORDS and not after_dot:
+            type_pending = True
+        elif kind == "ident" and previous and previous[-1][1] == "class" and not after_dot:
+            yield "class", ClassRecord(text, line)
+
+        if text == "(" and in_type_body and not assigning and len(previous) == 2:
+            (type_kind, type_text), (name_kind, name) = previous
+            declares_type = (type_kind == "ident" and type_text not in JAVA_NOT_TYPE) or type_text in (">", "]")
+            if name_kind == "ident" and name not in JAVA_NOT_METHOD and declares_type:
+                method = _JavaMethod(name, line, doc)
+                doc = None
+                previous = []
+                continue
+
+        if text == "{":
+            type_bodies.append(type_pending)
+            type_pending = False
+            doc = None
+        elif text == "}":
+            if type_bodies:
+                type_bodies.pop()
+            doc = None
+        elif text == ";":
+            type_pending = assigning = False
+            doc = None
+        elif text == "=" and in_type_body:
+            # Field initialisers can contain calls and lambdas, not declarations.
+            assigning = True
+
+        previous = (previous + [(kind, text)])[-2:]
+
+
+def parse_java_stream(read: Callable[[int], bytes]) -> ParsedSource:
+    """`parse_java` equivalent over a binary `read`, one chunk at a time."""
+
+    result = ParsedSource()
+
+    for event in java_events(_text_chunks(read)):
+        _collect(result, event)
+
+    _order(result)
+    return result
+
+
+def _collect(result: ParsedSource, event: Event):
+    kind = event[0]
+    if kind == "comment":
+        result.comment_lines.append(event[1])
+        result.comments.append(event[2])
+    elif kind == "function":
+        result.functions.append(event[1])
+    elif kind == "class":
+        result.classes.append(event[1])
+    elif kind == "docstring":
+        result.file_docstring = event[1]
+
+
+def _order(result: ParsedSource):
+    # Definitions are emitted as they close; report them in source order.
+    result.functions.sort(key=lambda f: f.start_line or 0)
+    result.classes.sort(key=lambda c: c.start_line or 0)
@@ -0,0 +1,254 @@
+"""
+Parser backend built on tree-sitter (PARSER_BACKEND=tree-sitter).
+
+Both languages are parsed by one C engine and yield the same
+ParsedSource as `parse_python`/`parse_java`. Unlike `ast.parse` and
+javalang, tree-sitter recovers from syntax errors, so a file with a
+broken region still reports the definitions and comments around it.
+`TreeCache` keeps the last tree of each path, so a later version of the
+same file is reparsed incrementally.
+"""
+
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional, Tuple
+
+try:
+    import tree_sitter_java
+    import tree_sitter_python
+    from tree_sitter import Language, Node, Parser, Query, QueryCursor, Tree
+except ImportError:
+    raise RuntimeError("PARSER_BACKEND=tree-sitter requires tree-sitter, tree-sitter-python and tree-sitter-java")
+
+from app.parsers.records import ClassRecord, FunctionRecord, ParsedSource
+from app.parsers.streaming import docstring_value, javadoc
+
+PYTHON = Language(tree_sitter_python.language())
+JAVA = Language(tree_sitter_java.language())
+
+PYTHON_QUERY = Query(PYTHON, "(function_definition) @function (class_definition) @class (comment) @comment")
+JAVA_QUERY = Query(JAVA, """
+    (class_declaration) @class
+    (method_declaration) @function
+    (line_comment) @comment
+    (block_comment) @comment
+""")
+
+# Parameter node -> ast slot: named parameters, then *args, then **kwargs.
+PYTHON_PARAM_SLOTS = {
+    "identifier": 0,
+    "default_parameter": 0,
+    "typed_default_parameter": 0,
+    "list_splat_pattern": 1,
+    "dictionary_splat_pattern": 2,
+}
+PYTHON_DOCSTRING_NODES = ("string", "concatenated_string", "parenthesized_expression")
+JAVA_COMMENTS = ("line_comment", "block_comment")
+
+# Paths whose last tree is kept for incremental reparsing.
+TREE_CACHE_SIZE = 256
+
+
+def _text(node: Node) -> str:
+    return node.text.decode("utf-8", "replace")
+
+
+def _captures(query: Query, tree: Tree) -> Dict[str, List[Node]]:
+    """Captured nodes by capture name, each list in source order."""
+
+    captures = QueryCursor(query).captures(tree.root_node)
+    return {name: sorted(nodes, key=lambda n: n.start_byte) for name, nodes in captures.items()}
+
+
+# --- Python ----------------------------------------------------------------
+
+def _end_line(node: Node) -> int:
+    # Trailing comments belong to the block in tree-sitter but not in ast.
+    while True:
+        children = [c for c in node.children if c.type != "comment"]
+        if not children:
+            return node.end_point.row + 1
+        node = children[-1]
+
+
+def _python_docstring(body: Optional[Node]) -> Optional[str]:
+    """`ast.get_docstring` of a module or block node."""
+
+    first = next((c for c in body.named_children if c.type != "comment"), None) if body else None
+    if first is None or first.type != "expression_statement" or first.named_child_count != 1:
+        return None
+    if first.named_children[0].type not in PYTHON_DOCSTRING_NODES:
+        return None
+    return docstring_value([_text(first)])
+
+
+def _python_params(parameters: Optional[Node]) -> Tuple[str, ...]:
+    slotted = []
+    for param in parameters.named_children if parameters else ():
+        if param.type == "typed_parameter":
+            param = param.named_children[0]
+        slot = PYTHON_PARAM_SLOTS.get(param.type)
+        if slot is None:
+            continue     # separators, tuple parameters
+        name = param if param.type == "identifier" else param.child_by_field_name("name") or param.named_children[0]
+        slotted.append((slot, _text(name)))
+
+    slotted.sort(key=lambda p: p[0])
+    return tuple(name for _, name in slotted if name not in ("self", "cls"))
+
+
+def _python_source(tree: Tree) -> ParsedSource:
+    result = ParsedSource()
+    result.file_docstring = _python_docstring(tree.root_node) or None
+    captures = _captures(PYTHON_QUERY, tree)
+
+    for node in captures.get("function", ()):
+        if node.children[0].type == "async":
+            continue     # as with ast.FunctionDef, async functions are not reported
+        result.functions.append(FunctionRecord(
+            _text(node.child_by_field_name("name")),
+            node.start_point.row + 1,
+            _end_line(node),
+            _python_docstring(node.child_by_field_name("body")),
+            _python_params(node.child_by_field_name("parameters")),
+        ))
+
+    for node in captures.get("class", ()):
+        result.classes.append(ClassRecord(
+            _text(node.child_by_field_name("name")),
+            node.start_point.row + 1,
+            _end_line(node),
+            _python_docstring(node.child_by_field_name("body")),
+        ))
+
+    for node in captures.get("comment", ()):
+        result.comments.append(_text(node).lstrip("# ").strip())
+        result.comment_lines.append(node.start_point.row + 1)
+
+    return result
+
+
+# --- Java ------------------------------------------------------------------
+
+def _java_doc(node: Node) -> Optional[str]:
+    """The last Javadoc among the comments directly before `node`, as javalang attaches it."""
+
+    sibling = node.prev_sibling
+    while sibling is not None and sibling.type in JAVA_COMMENTS:
+        text = _text(sibling)
+        if text.startswith("/**"):
+            return javadoc(text)
+        sibling = sibling.prev_sibling
+    return None
+
+
+def _java_params(parameters: Optional[Node]) -> Tuple[str, ...]:
+    names = []
+    for param in parameters.named_children if parameters else ():
+        if param.type == "formal_parameter":
+            names.append(_text(param.child_by_field_name("name")))
+        elif param.type == "spread_parameter":
+            declarator = next(c for c in param.named_children if c.type == "variable_declarator")
+            names.append(_text(declarator.child_by_field_name("name")))
+    return tuple(names)
+
+
+def _java_source(tree: Tree) -> ParsedSource:
+    result = ParsedSource()
+    captures = _captures(JAVA_QUERY, tree)
+
+    for node in captures.get("class", ()):
+        keyword = next(c for c in node.children if c.type == "class")
+        result.classes.append(ClassRecord(_text(node.child_by_field_name("name")), keyword.start_point.row + 1))
+
+    for node in captures.get("function", ()):
+        # javalang positions a method at its type parameters or return type.
+        start = node.child_by_field_name("type_parameters") or node.child_by_field_name("type")
+        result.functions.append(FunctionRecord(
+            _text(node.child_by_field_name("name")),
+            start.start_point.row + 1,
+            docstring=_java_doc(node),
+            params=_java_params(node.child_by_field_name("parameters")),
+        ))
+
+    for node in captures.get("comment", ()):
+        result.comments.append(_text(node))
+        result.comment_lines.append(node.start_point.row + 1)
+
+    return result
+
+
+# --- Parsing ---------------------------------------------------------------
+
+LANGUAGES: Dict[str, Tuple[Language, Callable[[Tree], ParsedSource]]] = {
+    "python": (PYTHON, _python_source),
+    "java": (JAVA, _java_source),
+}
+
+
+def parse_python(code: str) -> ParsedSource:
+    """`parse_python` on tree-sitter; syntax errors lose only the broken region."""
+    return _python_source(Parser(PYTHON).parse(code.encode()))
+
+
+def parse_java(code: str) -> ParsedSource:
+    """`parse_java` on tree-sitter; syntax errors lose only the broken region."""
+    return _java_source(Parser(JAVA).parse(code.encode()))
+
+
+def _edit(tree: Tree, old: bytes, new: bytes):
+    """Describes the change from `old` to `new` to `tree` as one edited span."""
+
+    def common(a: bytes, b: bytes, limit: int) -> int:
+        # Length of the common prefix, by bisection over C-level compares.
+        low, high = 0, limit
+        while low < high:
+            mid = (low + high + 1) // 2
+            if a[:mid] == b[:mid]:
+                low = mid
+            else:
+                high = mid - 1
+        return low
+
+    def point(data: bytes, offset: int) -> Tuple[int, int]:
+        return data.count(b"\n", 0, offset), offset - (data.rfind(b"\n", 0, offset) + 1)
+
+    start = common(old, new, min(len(old), len(new)))
+    suffix = common(old[start:][::-1], new[start:][::-1], min(len(old), len(new)) - start)
+    old_end, new_end = len(old) - suffix, len(new) - suffix
+    tree.edit(start, old_end, new_end, point(old, start), point(old, old_end), point(new, new_end))
+
+
+class TreeCache:
+    """
+    Last source and tree of up to `size` paths. Parsing a path again
+    edits its old tree to the new text and lets tree-sitter reuse every
+    subtree outside the changed span.
+    """
+
+    def __init__(self, size: int = TREE_CACHE_SIZE):
+        self.size = size
+        self.parsed = self.reparsed = 0
+        self._parsers = {language: Parser(grammar) for language, (grammar, _) in LANGUAGES.items()}
+        self._trees: "OrderedDict[Tuple[str, str], Tuple[bytes, Tree]]" = OrderedDict()
+
+    def parse(self, language: str, path: str, code: str) -> ParsedSource:
+        extract = LANGUAGES[language][1]
+        source = code.encode()
+        key = (language, path)
+        cached = self._trees.pop(key, None)
+
+        if cached is None:
+            tree = self._parsers[language].parse(source)
+            self.parsed += 1
+        elif cached[0] == source:
+            tree = cached[1]
+        else:
+            old_source, old_tree = cached
+            _edit(old_tree, old_source, source)
+            tree = self._parsers[language].parse(source, old_tree)
+            self.reparsed += 1
+
+        self._trees[key] = (source, tree)
+        if len(self._trees) > self.size:
+            self._trees.popitem(last=False)
+        return extract(tree)
@@ -1,12 +1,29 @@
-from fastapi import APIRouter, UploadFile, File, Depends, HTTPException
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, UploadFile, File, Depends, HTTPException, Query, Request, Response
+from fastapi.responses import JSONResponse, StreamingResponse
+from starlette.concurrency import run_in_threadpool
+from sqlalchemy.orm import Session, defer
+from typing import Optional
+from datetime import datetime
 import os, uuid
+from app.database.database import SessionLocal
 from app.database.deps import get_db
 from app.models.analysis import CodeAnalysis
-from app.services.analysis_service import analyze_codebase
+from app.services.worker_pool import run_analysis
+from app.services.admission import Cost, enter
 from app.core.config import settings
 from app.auth.dependencies import get_current_user
 from app.models.user import User
+from app.core.tracing import span, start_trace
+from app.services.analysis_diff import diff_results
+from app.services.export import GRANULARITIES, iter_batches, stream_ipc
+from app.services.pagination import keyset_page
+from app.services.result_views import (
+    PROJECTIONS,
+    project_files,
+    make_etag,
+    etag_matches,
+    stream_json,
+)
 
 router = APIRouter(prefix="/analysis", tags=["Analysis"])
 
@@ -33,25 +50,261 @@ async def analyze_upload(
     base_path = os.path.join(settings.BASE_ANALYSIS_PATH, analysis_id)
     os.makedirs(base_path, exist_ok=True)
 
-    for file in files:
-        content = await file.read()
-        with open(os.path.join(base_path, file.filename), "wb") as f:
-            f.write(content)
+    with enter(current_user.id) as ticket, start_trace("analysis.upload", files=len(files)):
+        sizes = []
+        for file in files:
+            content = await file.read()
+            with open(os.path.join(base_path, file.filename), "wb") as f:
+                f.write(content)
+            sizes.append(len(content))
 
-    result = analyze_codebase(base_path)
+        # Waiting for capacity and analysing both block: keep them off the
+        # event loop, and hold no pooled connection meanwhile.
+        db.commit()
+        await run_in_threadpool(ticket.admit, Cost(len(sizes), sum(sizes), max(sizes, default=0)))
+        result, summary = await run_in_threadpool(run_analysis, base_path)
 
-    record = CodeAnalysis(
-        source_type="upload",
-        source_ref="manual",
-        language="mixed",
-        result=result,
-    )
+        record = CodeAnalysis(
+            user_id=current_user.id,
+            source_type="upload",
+            source_ref="manual",
+            language="mixed",
+            status="success",
+        )
+        record.set_result(result, summary.to_dict())
 
-    db.add(record)
-    db.commit()
-    db.refresh(record)
+        with span("db_commit"):
+            db.add(record)
+            db.commit()
+        db.refresh(record)
 
     return {
         "analysis_id": record.id,
-        "status": "success"
+        "status": record.status
+    }
+
+
+def _listing(row) -> dict:
+    return {
+        "analysis_id": row.id,
+        "source_type": row.source_type,
+        "source_ref": row.source_ref,
+        "commit_sha": row.commit_sha,
+        "language": row.language,
+        "status": row.status,
+        "created_at": row.created_at,
+    }
+
+
+_LISTING_COLUMNS = (
+    CodeAnalysis.id,
+    CodeAnalysis.source_type,
+    CodeAnalysis.source_ref,
+    CodeAnalysis.commit_sha,
+    CodeAnalysis.language,
+    CodeAnalysis.status,
+    CodeAnalysis.created_at,
+)
+
+
+def _owned(db: Session, current_user: User, *options):
+    """Analyses of the current user; everyone else's are reported as missing."""
+
+    return db.query(CodeAnalysis).options(*options).filter(CodeAnalysis.user_id == current_user.id)
+
+
+@router.get("")
+def list_analyses(
+    cursor: Optional[str] = None,
+    limit: int = Query(20, ge=1, le=100),
+    source_ref: Optional[str] = None,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    query = db.query(*_LISTING_COLUMNS).filter(CodeAnalysis.user_id == current_user.id)
+    if source_ref is not None:
+        query = query.filter(CodeAnalysis.source_ref == source_ref)
+
+    try:
+        rows, next_cursor = keyset_page(query, CodeAnalysis.created_at, CodeAnalysis.id, cursor, limit)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="invalid_cursor")
+
+    return {
+        "items": [_listing(row) for row in rows],
+        "next_cursor": next_cursor,
+        "limit": limit,
+    }
+
+@router.get("/latest")
+def latest_analysis(
+    source_ref: str,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    row = (
+        db.query(*_LISTING_COLUMNS)
+        .filter(CodeAnalysis.user_id == current_user.id, CodeAnalysis.source_ref == source_ref)
+        .order_by(CodeAnalysis.created_at.desc(), CodeAnalysis.id.desc())
+        .first()
+    )
+
+    if not row:
+        raise HTTPException(status_code=404, detail="Analysis not found")
+
+    return _listing(row)
+
+@router.get("/export")
+def export_analyses(
+    granularity: str = Query("files"),
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    source_type: Optional[str] = None,
+    current_user: User = Depends(get_current_user),
+):
+    if granularity not in GRANULARITIES:
+        raise HTTPException(
+            status_code=400,
+            detail=f"granularity must be one of: {', '.join(GRANULARITIES)}"
+        )
+
+    # Only the caller's own analyses; fleet-wide export is the CLI's.
+    user_id = current_user.id
+
+    # The stream outlives the request-scoped session, so it opens its own.
+    def body():
+        with SessionLocal() as db:
+            batches = iter_batches(db, granularity, since, until, source_type, user_id)
+            yield from stream_ipc(batches, granularity)
+
+    return StreamingResponse(
+        body(),
+        media_type="application/vnd.apache.arrow.stream",
+        headers={"Content-Disposition": f'attachment; filename="analyses-{granularity}.arrows"'},
+    )
+
+@router.get("/{analysis_id}")
+def get_analysis(
+    analysis_id: int,
+    request: Request,
+    fields: str = Query("full"),
+    path: Optional[str] = None,
+    offset: int = Query(0, ge=0),
+    limit: Optional[int] = Query(None, ge=1, le=1000),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    if fields not in PROJECTIONS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"fields must be one of: {', '.join(PROJECTIONS)}"
+        )
+
+    record = (
+        _owned(db, current_user, defer(CodeAnalysis.result), defer(CodeAnalysis.result_packed))
+        .filter(CodeAnalysis.id == analysis_id)
+        .first()
+    )
+
+    if not record:
+        raise HTTPException(status_code=404, detail="Analysis not found")
+
+    # Results never change after they are stored, so the representation
+    # is fully determined by the record, the projection parameters and
+    # the representation version folded into every ETag. Clients
+    # revalidate each time: a deploy that renders results differently
+    # must reach them, and an unchanged one costs a 304.
+    etag = make_etag(record.id, record.result_id, fields, path, offset, limit)
+    headers = {
+        "ETag": etag,
+        "Cache-Control": "private, no-cache",
+    }
+
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+
+    files = project_files(record.payload, fields, path)
+    page = files[offset:offset + limit] if limit else files[offset:]
+
+    head = {
+        "analysis_id": record.id,
+        "source_type": record.source_type,
+        "source_ref": record.source_ref,
+        "language": record.language,
+        "created_at": record.created_at.isoformat() if record.created_at else None,
+        "total_files": len(files),
+        "offset": offset,
+        "limit": limit,
+    }
+
+    return StreamingResponse(
+        stream_json(head, "files", page),
+        media_type="application/json",
+        headers=headers,
+    )
+
+@router.get("/{analysis_id}/summary")
+def get_analysis_summary(
+    analysis_id: int,
+    request: Request,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    record = (
+        _owned(db, current_user, defer(CodeAnalysis.result), defer(CodeAnalysis.result_packed))
+        .filter(CodeAnalysis.id == analysis_id)
+        .first()
+    )
+
+    if not record:
+        raise HTTPException(status_code=404, detail="Analysis not found")
+
+    etag = make_etag(record.id, record.result_id, "summary")
+    headers = {
+        "ETag": etag,
+        "Cache-Control": "private, no-cache",
+    }
+
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+
+    return JSONResponse(
+        {"analysis_id": record.id, "summary": record.payload_summary},
+        headers=headers,
+    )
+
+@router.get("/{base_id}/diff/{head_id}")
+def diff_analyses(
+    base_id: int,
+    head_id: int,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    records = {
+        record.id: record
+        for record in _owned(db, current_user).filter(CodeAnalysis.id.in_([base_id, head_id]))
+    }
+
+    if base_id not in records or head_id not in records:
+        raise HTTPException(status_code=404, detail="Analysis not found")
+
+    base, head = records[base_id], records[head_id]
+
+    if (base.source_type, base.source_ref) != (head.source_type, head.source_ref):
+        raise HTTPException(
+            status_code=400,
+            detail="Analyses are of different sources"
+        )
+
+    base_result = base.payload
+    # Records sharing one content-addressed result need only one load.
+    if base.result_id is not None and base.result_id == head.result_id:
+        head_result = base_result
+    else:
+        head_result = head.payload
+
+    return {
+        "base_id": base_id,
+        "head_id": head_id,
+        **diff_results(base_result, head_result),
     }
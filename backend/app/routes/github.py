@@ -1,26 +1,30 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
-from git import Repo, GitCommandError
+from git import GitCommandError
+from typing import Optional
 from urllib.parse import urlparse
-import uuid, os
+import uuid, os, shutil
 
+from app.analysers.records import with_details
 from app.database.deps import get_db
 from app.models.analysis import CodeAnalysis
-from app.services.analysis_service import analyze_codebase
+from app.services.worker_pool import run_analysis, run_sample
+from app.services.admission import Cost, enter
+from app.services.walker import walk_source_files
+from app.services.git_source import resolve_commit, fetch_commit, fetch_history
+from app.services.history import analyze_history
+from app.services.result_cache import content_key, get_or_compute
 from app.core.config import settings
 from app.auth.dependencies import get_current_user
 from app.models.user import User
+from app.core.tracing import span, start_trace
 
 router = APIRouter(prefix="/github", tags=["GitHub"])
 
+MAX_SAMPLE_SECONDS = 600
 
-@router.post("/analyze")
-def analyze_github(
-    repo_url: str,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
-):
 
+def validate_github_url(repo_url: str):
     parsed = urlparse(repo_url)
 
     if not parsed.scheme or not parsed.netloc:
@@ -35,31 +39,260 @@ def analyze_github(
             detail="not_github"
         )
 
-    analysis_id = str(uuid.uuid4())
-    path = os.path.join(settings.BASE_ANALYSIS_PATH, analysis_id)
 
-    try:
-        Repo.clone_from(repo_url, path)
-    except GitCommandError:
+@router.post("/analyze")
+def analyze_github(
+    repo_url: str,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+
+    validate_github_url(repo_url)
+
+    with enter(current_user.id) as ticket, start_trace("github.analyze", repo_url=repo_url):
+        with span("resolve"):
+            commit_sha = resolve_commit(repo_url)
+
+        if commit_sha is None:
+            raise HTTPException(
+                status_code=400,
+                detail="repo_not_accessible"
+            )
+
+        def compute():
+            path = os.path.join(settings.BASE_ANALYSIS_PATH, str(uuid.uuid4()))
+
+            try:
+                with span("clone"):
+                    fetch_commit(repo_url, commit_sha, path)
+            except GitCommandError:
+                raise HTTPException(
+                    status_code=400,
+                    detail="repo_not_accessible"
+                )
+
+            ticket.admit(Cost.of(walk_source_files(path)))
+            result, summary = run_analysis(path)
+            return result, summary.to_dict()
+
+        shared = get_or_compute(db, content_key(repo_url, commit_sha), compute)
+
+        record = CodeAnalysis(
+            user_id=current_user.id,
+            source_type="github",
+            source_ref=repo_url,
+            commit_sha=commit_sha,
+            language="mixed",
+            status="success",
+            result_id=shared.id,
+        )
+
+        with span("db_commit"):
+            db.add(record)
+            db.commit()
+        db.refresh(record)
+
+    return {
+        "analysis_id": record.id,
+        "status": record.status
+    }
+
+
+@router.post("/history")
+def github_history(
+    repo_url: str,
+    max_commits: int = Query(100, ge=1, le=settings.HISTORY_MAX_COMMITS),
+    step: int = Query(1, ge=1),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """
+    Comment-quality trend over the default branch's first-parent
+    history: one point per commit (every `step`-th of the last
+    `max_commits`), oldest first.
+    """
+
+    validate_github_url(repo_url)
+
+    with enter(current_user.id) as ticket, start_trace("github.history", repo_url=repo_url):
+        with span("resolve"):
+            commit_sha = resolve_commit(repo_url)
+
+        if commit_sha is None:
+            raise HTTPException(
+                status_code=400,
+                detail="repo_not_accessible"
+            )
+
+        def compute():
+            path = os.path.join(settings.BASE_ANALYSIS_PATH, str(uuid.uuid4()))
+
+            try:
+                with span("clone"):
+                    fetch_history(repo_url, commit_sha, path)
+                # Blobs are read from the object store; only a CPU slot is taken.
+                ticket.admit(Cost(0, 0, 0))
+                with span("history"):
+                    return analyze_history(path, commit_sha, max_commits, step)
+            except GitCommandError:
+                raise HTTPException(
+                    status_code=400,
+                    detail="repo_not_accessible"
+                )
+            finally:
+                # Full-history clones are large; nothing reads them afterwards.
+                shutil.rmtree(path, ignore_errors=True)
+
+        # Same store as snapshot results, keyed by the history parameters.
+        key = content_key(repo_url, f"{commit_sha}:history:{max_commits}:{step}")
+        shared = get_or_compute(db, key, compute)
+
+    return {
+        "repo_url": repo_url,
+        "commit": commit_sha,
+        "stats": shared.summary,
+        "points": shared.stored_result,
+    }
+
+
+@router.post("/estimate")
+def estimate_github(
+    repo_url: str,
+    precision: Optional[float] = Query(None, gt=0, lt=1),
+    time_budget: Optional[float] = Query(None, gt=0, le=MAX_SAMPLE_SECONDS),
+    seed: int = 0,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """
+    Quick estimate of comment metrics from a stratified sample of the
+    repository's files, with confidence intervals. `precision` is the
+    target relative margin, `time_budget` a limit in seconds. The
+    analysis is stored as "sampled" and can be escalated to a full scan
+    that reuses the sampled files.
+    """
+
+    validate_github_url(repo_url)
+
+    with enter(current_user.id) as ticket, start_trace("github.estimate", repo_url=repo_url):
+        with span("resolve"):
+            commit_sha = resolve_commit(repo_url)
+
+        if commit_sha is None:
+            raise HTTPException(
+                status_code=400,
+                detail="repo_not_accessible"
+            )
+
+        def compute():
+            path = os.path.join(settings.BASE_ANALYSIS_PATH, str(uuid.uuid4()))
+
+            try:
+                with span("clone"):
+                    fetch_commit(repo_url, commit_sha, path)
+            except GitCommandError:
+                raise HTTPException(
+                    status_code=400,
+                    detail="repo_not_accessible"
+                )
+
+            # A sample reads a small share of the files; only a CPU slot is taken.
+            ticket.admit(Cost(0, 0, 0))
+            return run_sample(path, precision=precision, time_budget=time_budget, seed=seed)
+
+        key = content_key(repo_url, f"{commit_sha}:sample:{precision}:{time_budget}:{seed}")
+        shared = get_or_compute(db, key, compute)
+
+        record = CodeAnalysis(
+            user_id=current_user.id,
+            source_type="github",
+            source_ref=repo_url,
+            commit_sha=commit_sha,
+            language="mixed",
+            status="sampled",
+            result_id=shared.id,
+        )
+
+        with span("db_commit"):
+            db.add(record)
+            db.commit()
+        db.refresh(record)
+
+    return {
+        "analysis_id": record.id,
+        "status": record.status,
+        "estimate": shared.summary,
+    }
+
+
+@router.post("/estimate/{analysis_id}/escalate")
+def escalate_estimate(
+    analysis_id: int,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """
+    Full scan of the commit a sampled analysis was taken from; files
+    already analysed in the sample are not analysed again.
+    """
+
+    sampled = db.query(CodeAnalysis).filter(
+        CodeAnalysis.id == analysis_id,
+        CodeAnalysis.user_id == current_user.id,
+    ).first()
+
+    if not sampled:
+        raise HTTPException(
+            status_code=404,
+            detail="Analysis not found"
+        )
+
+    if sampled.status != "sampled":
         raise HTTPException(
             status_code=400,
-            detail="repo_not_accessible"
+            detail="not_sampled"
         )
 
-    result = analyze_codebase(path)
+    repo_url, commit_sha = sampled.source_ref, sampled.commit_sha
+    previous = with_details(sampled.payload, sampled.payload_details)
+
+    with enter(current_user.id) as ticket, start_trace("github.escalate", repo_url=repo_url, reused=len(previous)):
+        def compute():
+            path = os.path.join(settings.BASE_ANALYSIS_PATH, str(uuid.uuid4()))
 
-    record = CodeAnalysis(
-        source_type="github",
-        source_ref=repo_url,
-        language="mixed",
-        result=result,
-    )
+            try:
+                with span("clone"):
+                    fetch_commit(repo_url, commit_sha, path)
+            except GitCommandError:
+                raise HTTPException(
+                    status_code=400,
+                    detail="repo_not_accessible"
+                )
+
+            ticket.admit(Cost.of(walk_source_files(path)))
+            result, summary = run_analysis(path, previous)
+            return result, summary.to_dict()
+
+        # Stored as the commit's full result, shared with /analyze.
+        shared = get_or_compute(db, content_key(repo_url, commit_sha), compute)
+
+        record = CodeAnalysis(
+            user_id=current_user.id,
+            source_type="github",
+            source_ref=repo_url,
+            commit_sha=commit_sha,
+            language="mixed",
+            status="success",
+            result_id=shared.id,
+        )
 
-    db.add(record)
-    db.commit()
-    db.refresh(record)
+        with span("db_commit"):
+            db.add(record)
+            db.commit()
+        db.refresh(record)
 
     return {
         "analysis_id": record.id,
-        "status": "success"
+        "status": record.status,
+        "sampled_from": sampled.id,
     }
@@ -0,0 +1,168 @@
+from fastapi import APIRouter, Depends, Header, HTTPException, Request
+from sqlalchemy.orm import Session
+from typing import Optional
+import json, secrets
+
+from app.database.deps import get_db
+from app.models.webhook import RegisteredRepo
+from app.routes.github import validate_github_url
+from app.services.result_cache import normalize_repo_url
+from app.services.prefetch import enqueue_push
+from app.services.webhooks import push_target, verify_signature
+from app.auth.dependencies import get_current_user
+from app.models.user import User
+
+router = APIRouter(prefix="/webhooks", tags=["Webhooks"])
+
+
+def _repo_view(repo: RegisteredRepo) -> dict:
+    return {
+        "id": repo.id,
+        "repo_url": repo.repo_url,
+        "branch": repo.branch,
+        "last_pushed_sha": repo.last_pushed_sha,
+        "last_analyzed_sha": repo.last_analyzed_sha,
+        "created_at": repo.created_at,
+    }
+
+
+@router.post("/repos", status_code=201)
+def register_repo(
+    repo_url: str,
+    branch: Optional[str] = None,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """
+    Registers a repository for push pre-analysis. The returned secret
+    is shown once and goes into the GitHub webhook settings (content
+    type application/json, push events, pointed at /webhooks/github).
+    `branch` defaults to the repository's default branch.
+    """
+
+    validate_github_url(repo_url)
+    normalized = normalize_repo_url(repo_url)
+
+    if db.query(RegisteredRepo.id).filter(
+        RegisteredRepo.user_id == current_user.id,
+        RegisteredRepo.repo_url == normalized,
+    ).first():
+        raise HTTPException(
+            status_code=409,
+            detail="already_registered"
+        )
+
+    repo = RegisteredRepo(
+        user_id=current_user.id,
+        repo_url=normalized,
+        webhook_secret=secrets.token_hex(32),
+        branch=branch,
+    )
+    db.add(repo)
+    db.commit()
+    db.refresh(repo)
+
+    return {**_repo_view(repo), "webhook_secret": repo.webhook_secret}
+
+
+@router.get("/repos")
+def list_repos(
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    repos = db.query(RegisteredRepo).filter(
+        RegisteredRepo.user_id == current_user.id
+    ).order_by(RegisteredRepo.id).all()
+
+    return [_repo_view(repo) for repo in repos]
+
+
+@router.delete("/repos/{repo_id}", status_code=204)
+def unregister_repo(
+    repo_id: int,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    repo = db.query(RegisteredRepo).filter(
+        RegisteredRepo.id == repo_id,
+        RegisteredRepo.user_id == current_user.id,
+    ).first()
+
+    if not repo:
+        raise HTTPException(
+            status_code=404,
+            detail="Repository not registered"
+        )
+
+    db.delete(repo)
+    db.commit()
+
+
+async def _raw_body(request: Request) -> bytes:
+    # Signatures are over the exact bytes, so the body is read unparsed.
+    return await request.body()
+
+
+@router.post("/github", status_code=202)
+def github_push(
+    body: bytes = Depends(_raw_body),
+    x_github_event: Optional[str] = Header(None),
+    x_hub_signature_256: Optional[str] = Header(None),
+    db: Session = Depends(get_db),
+):
+    """
+    Receives GitHub push events for registered repositories and queues
+    the pushed commit for pre-analysis. Bursts of pushes to one
+    repository are coalesced: only the newest commit is analysed.
+    """
+
+    try:
+        payload = json.loads(body)
+    except ValueError:
+        payload = None
+
+    if not isinstance(payload, dict):
+        raise HTTPException(
+            status_code=400,
+            detail="invalid_payload"
+        )
+
+    repository = payload.get("repository") or {}
+    url = repository.get("html_url") or repository.get("clone_url")
+    candidates = db.query(RegisteredRepo).filter(
+        RegisteredRepo.repo_url == normalize_repo_url(url)
+    ).all() if url else []
+
+    if not candidates:
+        raise HTTPException(
+            status_code=404,
+            detail="Repository not registered"
+        )
+
+    # Several users may register one URL; the push belongs to the
+    # registration whose secret signed it, i.e. whoever set up the hook.
+    repo = next((r for r in candidates if verify_signature(r.webhook_secret, body, x_hub_signature_256)), None)
+
+    if repo is None:
+        raise HTTPException(
+            status_code=401,
+            detail="invalid_signature"
+        )
+
+    if x_github_event == "ping":
+        return {"status": "pong"}
+    if x_github_event != "push":
+        return {"status": "ignored"}
+
+    target = push_target(payload)
+    if target is None or target[0] != (repo.branch or repository.get("default_branch")):
+        return {"status": "ignored"}
+
+    commit_sha = target[1]
+    repo.last_pushed_sha = commit_sha
+    db.commit()
+
+    if not enqueue_push(repo.id, commit_sha):
+        return {"status": "disabled", "commit": commit_sha}
+
+    return {"status": "queued", "commit": commit_sha}
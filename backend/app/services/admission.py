@@ -0,0 +1,284 @@
+import math
+import os
+import threading
+import time
+from collections import deque
+from typing import Deque, Dict, Hashable, Iterable, NamedTuple, Optional, Set
+
+from app.core.config import settings
+from app.core.metrics import ADMISSION_DECISIONS, QUEUE_DEPTH
+from app.services.walker import SourceFile
+
+# Peak memory of an analysis, measured on synthetic repositories: a
+# fixed overhead, the retained results (a few bytes per source byte)
+# and the parse of the largest file read whole.
+MEMORY_BASE_BYTES = 64 * 1024 * 1024
+MEMORY_PER_SOURCE_BYTE = 8
+MEMORY_PER_LARGEST_BYTE = 80
+# Starting estimate of analysis time, refined from finished jobs.
+SECONDS_PER_SOURCE_BYTE = 2e-6
+RATE_SMOOTHING = 0.2
+# New jobs wait while less than this share of physical memory is free.
+MIN_AVAILABLE_FRACTION = 0.1
+RECHECK_SECONDS = 1.0
+
+
+class Cost(NamedTuple):
+    """Size of an analysis job: source files, their bytes, the largest one."""
+
+    files: int
+    bytes: int
+    largest: int
+
+    @classmethod
+    def of(cls, sources: Iterable[SourceFile]) -> "Cost":
+        files = total = largest = 0
+        for source in sources:
+            files += 1
+            total += source.size
+            largest = max(largest, source.size)
+        return cls(files, total, largest)
+
+    def memory(self) -> int:
+        # Files above MAX_ANALYSIS_FILE_BYTES are streamed, not parsed whole.
+        whole = min(self.largest, settings.MAX_ANALYSIS_FILE_BYTES)
+        return MEMORY_BASE_BYTES + self.bytes * MEMORY_PER_SOURCE_BYTE + whole * MEMORY_PER_LARGEST_BYTE
+
+
+class Rejected(Exception):
+    """Analysis refused for now; answered with 429 and Retry-After."""
+
+    def __init__(self, detail: str, retry_after: int):
+        super().__init__(detail)
+        self.detail = detail
+        self.retry_after = retry_after
+
+
+def _physical_memory() -> Optional[int]:
+    try:
+        return os.sysconf("SC_PAGE_SIZE") * os.sysconf("SC_PHYS_PAGES")
+    except (ValueError, OSError, AttributeError):
+        return None
+
+
+def _available_memory() -> Optional[int]:
+    """MemAvailable from /proc/meminfo; None where it cannot be read."""
+
+    try:
+        with open("/proc/meminfo") as f:
+            for line in f:
+                if line.startswith("MemAvailable:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    return None
+
+
+class Ticket:
+    """
+    One analysis request's place in admission control: counted against
+    its user's quota from `enter` on, and against CPU and memory
+    capacity from `admit` until it is closed.
+    """
+
+    __slots__ = ("controller", "user", "cost", "memory", "seconds", "started")
+
+    def __init__(self, controller: "AdmissionController", user: Optional[Hashable]):
+        self.controller = controller
+        self.user = user
+        self.cost: Optional[Cost] = None
+        self.memory = 0
+        self.seconds = 0.0
+        self.started: Optional[float] = None
+
+    def admit(self, cost: Cost, wait: Optional[float] = None):
+        """
+        Blocks until the job fits. `wait` bounds the time in the queue
+        (default ADMISSION_QUEUE_SECONDS; math.inf never gives up); past
+        it, or when the queue will clearly not drain in time, raises
+        Rejected.
+        """
+
+        self.controller.admit(self, cost, settings.ADMISSION_QUEUE_SECONDS if wait is None else wait)
+
+    def close(self):
+        self.controller.release(self)
+
+    def __enter__(self) -> "Ticket":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class AdmissionController:
+    """
+    Admits analysis jobs against `cpu_slots` concurrent jobs and a
+    `memory` budget of estimated peak bytes, first come first served.
+    A job that does not fit waits in the queue; one larger than the
+    whole budget runs alone. Independently of the estimates, nothing
+    new starts while the host itself is short of free memory.
+
+    Requests are also capped on entry, before any cloning or reading:
+    at most `max_pending` in total and `user_max_pending` per user, so
+    analyses never hold every server thread.
+    """
+
+    def __init__(self, cpu_slots: int, memory: int, max_pending: int, user_max_pending: int,
+                 min_available: Optional[int] = None):
+        self.cpu_slots = max(cpu_slots, 1)
+        self.memory = memory
+        self.max_pending = max_pending
+        self.user_max_pending = user_max_pending
+        self.min_available = min_available
+        self.seconds_per_byte = SECONDS_PER_SOURCE_BYTE
+
+        self._cond = threading.Condition()
+        self._pending: Dict[Hashable, int] = {}
+        self._running: Set[Ticket] = set()
+        self._waiting: Deque[Ticket] = deque()
+        self._memory_in_flight = 0
+
+    def enter(self, user: Optional[Hashable]) -> Ticket:
+        """
+        Registers a request; internal work (user None) is not capped.
+        Raises Rejected when the user or the server is at its limit.
+        """
+
+        ticket = Ticket(self, user)
+        if user is None:
+            return ticket
+
+        with self._cond:
+            if self._pending.get(user, 0) >= self.user_max_pending:
+                ADMISSION_DECISIONS.labels("quota_exceeded").inc()
+                raise Rejected("quota_exceeded", self._retry_after(user))
+            if sum(self._pending.values()) >= self.max_pending:
+                ADMISSION_DECISIONS.labels("overloaded").inc()
+                raise Rejected("overloaded", self._retry_after())
+            self._pending[user] = self._pending.get(user, 0) + 1
+        return ticket
+
+    def admit(self, ticket: Ticket, cost: Cost, wait: float):
+        with self._cond:
+            ticket.cost = cost
+            ticket.memory = cost.memory()
+            ticket.seconds = cost.bytes * self.seconds_per_byte
+            self._waiting.append(ticket)
+            queued = False
+            deadline = None if math.isinf(wait) else time.monotonic() + wait
+
+            try:
+                while not (self._waiting[0] is ticket and self._fits(ticket)):
+                    remaining = None if deadline is None else deadline - time.monotonic()
+                    if remaining is not None and (remaining <= 0 or self._drain_seconds(ticket) > remaining):
+                        ADMISSION_DECISIONS.labels("overloaded").inc()
+                        raise Rejected("overloaded", self._retry_after(until=ticket))
+                    if not queued:
+                        ADMISSION_DECISIONS.labels("queued").inc()
+                        queued = True
+                    self._publish()
+                    # Free host memory changes without notifications.
+                    self._cond.wait(RECHECK_SECONDS if remaining is None else min(remaining, RECHECK_SECONDS))
+            except BaseException:
+                self._waiting.remove(ticket)
+                self._publish()
+                self._cond.notify_all()
+                raise
+
+            self._waiting.popleft()
+            self._running.add(ticket)
+            self._memory_in_flight += ticket.memory
+            ticket.started = time.monotonic()
+            ADMISSION_DECISIONS.labels("admitted").inc()
+            self._publish()
+            self._cond.notify_all()
+
+    def release(self, ticket: Ticket):
+        with self._cond:
+            if ticket in self._running:
+                self._running.discard(ticket)
+                self._memory_in_flight -= ticket.memory
+                elapsed = time.monotonic() - ticket.started
+                if ticket.cost.bytes:
+                    observed = elapsed / ticket.cost.bytes
+                    self.seconds_per_byte += RATE_SMOOTHING * (observed - self.seconds_per_byte)
+
+            if ticket.user is not None and ticket.user in self._pending:
+                self._pending[ticket.user] -= 1
+                if not self._pending[ticket.user]:
+                    del self._pending[ticket.user]
+                ticket.user = None
+
+            self._publish()
+            self._cond.notify_all()
+
+    def _fits(self, ticket: Ticket) -> bool:
+        if not self._running:
+            return True
+        if len(self._running) >= self.cpu_slots:
+            return False
+        if self._memory_in_flight + ticket.memory > self.memory:
+            return False
+        available = _available_memory() if self.min_available else None
+        return available is None or available - ticket.memory >= self.min_available
+
+    def _remaining(self, ticket: Ticket, now: float) -> float:
+        return max(ticket.seconds - (now - ticket.started), 0.0)
+
+    def _drain_seconds(self, until: Optional[Ticket] = None) -> float:
+        """
+        Expected wait before `until` (or a new job) can start: the work
+        still running and queued ahead of it, spread over the CPU slots.
+        """
+
+        now = time.monotonic()
+        work = sum(self._remaining(t, now) for t in self._running)
+        for queued in self._waiting:
+            if queued is until:
+                break
+            work += queued.seconds
+        return work / self.cpu_slots
+
+    def _retry_after(self, user: Optional[Hashable] = None, until: Optional[Ticket] = None) -> int:
+        """Seconds until one of `user`'s jobs ends, else until `until` (or a new job) could start."""
+
+        if user is not None:
+            now = time.monotonic()
+            own = [self._remaining(t, now) for t in self._running if t.user == user]
+            if own:
+                return max(1, math.ceil(min(own)))
+        return max(1, math.ceil(self._drain_seconds(until)))
+
+    def _publish(self):
+        QUEUE_DEPTH.labels("admission_waiting").set(len(self._waiting))
+        QUEUE_DEPTH.labels("admission_running").set(len(self._running))
+
+
+def _controller_from_settings() -> AdmissionController:
+    physical = _physical_memory()
+    memory = settings.ADMISSION_MEMORY_BYTES or int((physical or 8 * 2**30) * 0.6)
+    cpu_slots = settings.ADMISSION_CPU_SLOTS or settings.ANALYSIS_WORKERS or os.cpu_count() or 1
+    return AdmissionController(
+        cpu_slots,
+        memory,
+        settings.ADMISSION_MAX_PENDING,
+        settings.ADMISSION_USER_MAX_PENDING,
+        int(physical * MIN_AVAILABLE_FRACTION) if physical else None,
+    )
+
+
+_controller = _controller_from_settings()
+_unlimited = AdmissionController(cpu_slots=2**31, memory=2**62, max_pending=2**31, user_max_pending=2**31)
+
+
+def enter(user: Optional[Hashable]) -> Ticket:
+    """
+    Ticket for one analysis request of `user` (None for internal work).
+    Use as a context manager and call `admit` with the job's cost
+    before analysing; with ADMISSION_ENABLED=false nothing is limited.
+    """
+
+    if not settings.ADMISSION_ENABLED:
+        return Ticket(_unlimited, None)
+    return _controller.enter(user)
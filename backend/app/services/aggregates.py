@@ -0,0 +1,248 @@
+import heapq
+import math
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple
+
+if TYPE_CHECKING:
+    from app.analysers.records import FileAnalysis
+
+PERCENTILES = (0.5, 0.9, 0.99)
+TOP_K = 10
+ROLLUP_DEPTH = 1
+
+
+class QuantileSketch:
+    """
+    Log-bucketed quantile sketch (DDSketch-style): every estimate is
+    within `relative_accuracy` of the true value, memory grows with the
+    value range rather than the number of values, and sketches merge
+    by adding bucket counts.
+    """
+
+    __slots__ = ("relative_accuracy", "log_gamma", "bins", "zeros", "count", "min", "max")
+
+    def __init__(self, relative_accuracy: float = 0.01):
+        gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self.relative_accuracy = relative_accuracy
+        self.log_gamma = math.log(gamma)
+        self.bins: Dict[int, int] = {}
+        self.zeros = 0
+        self.count = 0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def add(self, value: float):
+        self.count += 1
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+
+        if value <= 0:
+            self.zeros += 1
+            return
+
+        key = math.ceil(math.log(value) / self.log_gamma)
+        self.bins[key] = self.bins.get(key, 0) + 1
+
+    def merge(self, other: "QuantileSketch"):
+        self.count += other.count
+        self.zeros += other.zeros
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        for key, count in other.bins.items():
+            self.bins[key] = self.bins.get(key, 0) + count
+
+    def quantile(self, q: float) -> Optional[float]:
+        if not self.count:
+            return None
+
+        rank = q * (self.count - 1)
+        seen = self.zeros
+        if rank < seen:
+            return max(self.min, 0.0)
+
+        gamma = math.exp(self.log_gamma)
+        for key in sorted(self.bins):
+            seen += self.bins[key]
+            if seen > rank:
+                estimate = 2 * gamma ** key / (gamma + 1)
+                return round(min(max(estimate, self.min), self.max), 4)
+
+        return self.max
+
+    def state(self) -> Dict[str, Any]:
+        return {
+            "relative_accuracy": self.relative_accuracy,
+            "bins": {str(k): v for k, v in self.bins.items()},
+            "zeros": self.zeros,
+            "count": self.count,
+            "min": self.min if self.count else None,
+            "max": self.max if self.count else None,
+        }
+
+    @classmethod
+    def from_state(cls, state: Dict[str, Any]) -> "QuantileSketch":
+        sketch = cls(state["relative_accuracy"])
+        sketch.bins = {int(k): v for k, v in state["bins"].items()}
+        sketch.zeros = state["zeros"]
+        sketch.count = state["count"]
+        if sketch.count:
+            sketch.min, sketch.max = state["min"], state["max"]
+        return sketch
+
+
+def _rollup() -> Dict[str, int]:
+    return {"files": 0, "total_comments": 0, "redundant_comments": 0, "over_commented_files": 0}
+
+
+def _add_to_rollup(rollup: Dict[str, int], comments: int, redundant: int, over_commented: bool):
+    rollup["files"] += 1
+    rollup["total_comments"] += comments
+    rollup["redundant_comments"] += redundant
+    rollup["over_commented_files"] += 1 if over_commented else 0
+
+
+def _consistency() -> Dict[str, Any]:
+    return {"documented_functions": 0, "score_sum": 0.0, "flags": {}}
+
+
+def _merge_rollups(into: Dict[str, Dict[str, int]], other: Dict[str, Dict[str, int]]):
+    for key, rollup in other.items():
+        target = into.setdefault(key, _rollup())
+        for metric, value in rollup.items():
+            target[metric] += value
+
+
+class RepoSummary:
+    """
+    Repository-level aggregates maintained as file results arrive:
+    counts, means, approximate percentiles, the top-K files by
+    redundancy, per-language / per-directory rollups and docstring
+    consistency totals.
+    """
+
+    METRICS = ("comments_per_file", "comments_per_function", "redundant_per_file")
+
+    def __init__(self, top_k: int = TOP_K):
+        self.top_k = top_k
+        self.totals = _rollup()
+        self.sums = {metric: 0.0 for metric in self.METRICS}
+        self.sketches = {metric: QuantileSketch() for metric in self.METRICS}
+        self.worst: List[Tuple[int, int, str]] = []
+        self.by_language: Dict[str, Dict[str, int]] = {}
+        self.by_directory: Dict[str, Dict[str, int]] = {}
+        self.consistency = _consistency()
+
+    def add(self, entry: "FileAnalysis"):
+        comments = entry.comments
+        path = entry.path
+
+        total = comments.total_comments
+        density = comments.density
+        redundant = len(comments.redundant_comments)
+        over_commented = comments.over_commented
+
+        _add_to_rollup(self.totals, total, redundant, over_commented)
+        _add_to_rollup(self.by_language.setdefault(entry.language, _rollup()),
+                       total, redundant, over_commented)
+
+        parts = path.split("/")[:-1][:ROLLUP_DEPTH]
+        directory = "/".join(parts) or "."
+        _add_to_rollup(self.by_directory.setdefault(directory, _rollup()),
+                       total, redundant, over_commented)
+
+        for metric, value in zip(self.METRICS, (total, density, redundant)):
+            self.sums[metric] += value
+            self.sketches[metric].add(value)
+
+        for scored in entry.consistency:
+            if scored is not None:
+                score, flags = scored
+                self.consistency["documented_functions"] += 1
+                self.consistency["score_sum"] += score
+                for flag in flags:
+                    self.consistency["flags"][flag] = self.consistency["flags"].get(flag, 0) + 1
+
+        if redundant:
+            item = (redundant, total, path)
+            if len(self.worst) < self.top_k:
+                heapq.heappush(self.worst, item)
+            elif item > self.worst[0]:
+                heapq.heapreplace(self.worst, item)
+
+    def merge(self, other: "RepoSummary"):
+        for metric, value in other.totals.items():
+            self.totals[metric] += value
+        _merge_rollups(self.by_language, other.by_language)
+        _merge_rollups(self.by_directory, other.by_directory)
+
+        for metric in self.METRICS:
+            self.sums[metric] += other.sums[metric]
+            self.sketches[metric].merge(other.sketches[metric])
+
+        self.worst = heapq.nlargest(self.top_k, self.worst + other.worst)
+        heapq.heapify(self.worst)
+
+        self.consistency["documented_functions"] += other.consistency["documented_functions"]
+        self.consistency["score_sum"] += other.consistency["score_sum"]
+        for flag, count in other.consistency["flags"].items():
+            self.consistency["flags"][flag] = self.consistency["flags"].get(flag, 0) + count
+
+    def state(self) -> Dict[str, Any]:
+        """Mergeable (JSON-serialisable) form, unlike the lossy `to_dict`."""
+
+        return {
+            "top_k": self.top_k,
+            "totals": self.totals,
+            "sums": self.sums,
+            "sketches": {metric: sketch.state() for metric, sketch in self.sketches.items()},
+            "worst": [list(item) for item in self.worst],
+            "by_language": self.by_language,
+            "by_directory": self.by_directory,
+            "consistency": self.consistency,
+        }
+
+    @classmethod
+    def from_state(cls, state: Dict[str, Any]) -> "RepoSummary":
+        summary = cls(state["top_k"])
+        summary.totals = dict(state["totals"])
+        summary.sums = dict(state["sums"])
+        summary.sketches = {
+            metric: QuantileSketch.from_state(sketch)
+            for metric, sketch in state["sketches"].items()
+        }
+        summary.worst = [tuple(item) for item in state["worst"]]
+        heapq.heapify(summary.worst)
+        summary.by_language = {k: dict(v) for k, v in state["by_language"].items()}
+        summary.by_directory = {k: dict(v) for k, v in state["by_directory"].items()}
+        consistency = state.get("consistency") or _consistency()
+        summary.consistency = {**consistency, "flags": dict(consistency["flags"])}
+        return summary
+
+    def to_dict(self) -> Dict[str, Any]:
+        files = self.totals["files"]
+        documented = self.consistency["documented_functions"]
+
+        return {
+            **self.totals,
+            "mean": {
+                metric: round(self.sums[metric] / files, 2) if files else 0
+                for metric in self.METRICS
+            },
+            "percentiles": {
+                metric: {
+                    f"p{round(q * 100)}": self.sketches[metric].quantile(q)
+                    for q in PERCENTILES
+                }
+                for metric in self.METRICS
+            },
+            "worst_files": [
+                {"path": path, "redundant_comments": redundant, "total_comments": total}
+                for redundant, total, path in sorted(self.worst, reverse=True)
+            ],
+            "by_language": self.by_language,
+            "by_directory": self.by_directory,
+            "consistency": {
+                "documented_functions": documented,
+                "mean_score": round(self.consistency["score_sum"] / documented, 3) if documented else None,
+                "flags": dict(sorted(self.consistency["flags"].items())),
+            },
+        }
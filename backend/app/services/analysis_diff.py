@@ -0,0 +1,121 @@
+from typing import Any, Dict, List, Optional
+
+
+def _key(entry: Dict[str, Any]) -> str:
+    return entry.get("path") or entry["file"]
+
+
+def _comments(entry: Dict[str, Any]) -> Dict[str, Any]:
+    return entry.get("analysis", {}).get("comments", {})
+
+
+def _density(comments: Dict[str, Any]) -> float:
+    return comments.get("comments_per_function", comments.get("comments_per_method", 0))
+
+
+def _change(before, after) -> Dict[str, Any]:
+    return {"base": before, "head": after, "delta": round(after - before, 2)}
+
+
+def _file_delta(path: str, base: Dict[str, Any], head: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    a, b = _comments(base), _comments(head)
+
+    delta = {
+        "path": path,
+        "total_comments": _change(a.get("total_comments", 0), b.get("total_comments", 0)),
+        "comments_per_function": _change(_density(a), _density(b)),
+        "redundant_comments": _change(
+            len(a.get("redundant_comments", [])),
+            len(b.get("redundant_comments", [])),
+        ),
+        "over_commented": {
+            "base": a.get("over_commented", False),
+            "head": b.get("over_commented", False),
+        },
+    }
+
+    delta["over_commented"]["flipped"] = (
+        delta["over_commented"]["base"] != delta["over_commented"]["head"]
+    )
+
+    unchanged = (
+        not delta["over_commented"]["flipped"]
+        and all(
+            delta[metric]["delta"] == 0
+            for metric in ("total_comments", "comments_per_function", "redundant_comments")
+        )
+    )
+    return None if unchanged else delta
+
+
+def _totals(entries: List[Dict[str, Any]]) -> Dict[str, Any]:
+    totals = {"files": len(entries), "total_comments": 0, "redundant_comments": 0, "over_commented_files": 0}
+    density = 0.0
+
+    for entry in entries:
+        comments = _comments(entry)
+        density += _density(comments)
+        totals["total_comments"] += comments.get("total_comments", 0)
+        totals["redundant_comments"] += len(comments.get("redundant_comments", []))
+        totals["over_commented_files"] += 1 if comments.get("over_commented") else 0
+
+    totals["comments_per_function"] = round(density / len(entries), 2) if entries else 0
+    return totals
+
+
+def diff_results(base: List[Dict[str, Any]], head: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Per-file and aggregate delta between two analyses of the same source.
+    Files are matched by path; entries with equal content hashes are
+    counted as unchanged without comparing their analyses.
+    """
+
+    base = base or []
+    head = head or []
+
+    base_by_path = {_key(entry): entry for entry in base}
+    head_by_path = {_key(entry): entry for entry in head}
+
+    added = sorted(head_by_path.keys() - base_by_path.keys())
+    removed = sorted(base_by_path.keys() - head_by_path.keys())
+
+    changed = []
+    unchanged = 0
+
+    for path in sorted(base_by_path.keys() & head_by_path.keys()):
+        before, after = base_by_path[path], head_by_path[path]
+
+        if before.get("hash") and before.get("hash") == after.get("hash"):
+            unchanged += 1
+            continue
+
+        delta = _file_delta(path, before, after)
+        if delta is None:
+            unchanged += 1
+        else:
+            changed.append(delta)
+
+    base_totals, head_totals = _totals(base), _totals(head)
+
+    return {
+        "summary": {
+            "files_added": len(added),
+            "files_removed": len(removed),
+            "files_changed": len(changed),
+            "files_unchanged": unchanged,
+            "over_commented_flips": sum(1 for d in changed if d["over_commented"]["flipped"]),
+            **{
+                metric: _change(base_totals[metric], head_totals[metric])
+                for metric in (
+                    "files",
+                    "total_comments",
+                    "comments_per_function",
+                    "redundant_comments",
+                    "over_commented_files",
+                )
+            },
+        },
+        "added": added,
+        "removed": removed,
+        "changed": changed,
+    }
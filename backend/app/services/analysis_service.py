@@ -1,46 +1,192 @@
-import os
-from app.parsers.python import parse_python
-from app.parsers.java import parse_java
+from app.core.config import settings
+from app.parsers.streaming import parse_java_stream, parse_python_stream
 from app.analysers.python_comments import analyze_python_comments
 from app.analysers.java_comments import analyze_java_comments
+from app.analysers.consistency import score_functions
+from app.analysers.records import FileAnalysis, StoredFileAnalysis
+from typing import Any, Dict, List, Optional
+from app.core.tracing import StageTimer
+from app.services.aggregates import RepoSummary
+from app.services.walker import SourceFile, walk_source_files, read_sources, stream_source
 
-EXCLUDED_DIRS = {
-    "venv", "node_modules", ".git", "__pycache__", "build", "dist"
-}
+if settings.PARSER_BACKEND == "tree-sitter":
+    from app.parsers.treesitter import TreeCache, parse_java, parse_python
+elif settings.PARSER_BACKEND == "builtin":
+    from app.parsers.python import parse_python
+    from app.parsers.java import parse_java
+else:
+    raise RuntimeError(f"unknown PARSER_BACKEND {settings.PARSER_BACKEND!r}")
 
-def analyze_codebase(path: str):
-    results = []
+# Bump whenever parser or analyser output changes, so content-addressed
+# results computed by older code are not reused.
+ANALYSER_VERSION = "7"
+if settings.PARSER_BACKEND != "builtin":
+    # The backends differ on invalid files, so their results are kept apart.
+    ANALYSER_VERSION += f"+{settings.PARSER_BACKEND}"
 
-    for root, dirs, files in os.walk(path):
-        dirs[:] = [d for d in dirs if d not in EXCLUDED_DIRS]
+# Fresh files are scored once their functions reach this many; their
+# parser records are then released (see FileAnalysis.pack_details).
+CONSISTENCY_BATCH = 4096
 
-        for file in files:
-            if not file.endswith((".py", ".java")):
-                continue
+def analyze_codebase(
+    path: str,
+    summary: Optional[RepoSummary] = None,
+    io_workers: Optional[int] = None,
+    timer: Optional[StageTimer] = None,
+    previous: Optional[Dict[str, Dict[str, Any]]] = None,
+) -> List[FileAnalysis]:
+    timer = timer or StageTimer()
 
-            file_path = os.path.join(root, file)
+    with timer.stage("walk"):
+        sources = list(walk_source_files(path))
 
-            try:
-                with open(file_path, "r", errors="ignore") as f:
-                    code = f.read()
-            except OSError:
-                continue
+    return analyze_files(sources, summary, io_workers, timer, previous)
 
+
+def analyze_source(
+    rel_path: str,
+    code: str,
+    sha: str,
+    timer: Optional[StageTimer] = None,
+    trees: Optional["TreeCache"] = None,
+) -> Optional[FileAnalysis]:
+    """
+    Parses and analyses one decoded file; None for unsupported
+    languages. Consistency is left unscored for `score_consistency`.
+    With `trees` (see `tree_cache`), an earlier version of the same
+    path is reparsed incrementally.
+    """
+
+    timer = timer or StageTimer()
+    file = rel_path.rsplit("/", 1)[-1]
+
+    if file.endswith(".py"):
+        with timer.stage("parse"):
+            parsed = trees.parse("python", rel_path, code) if trees else parse_python(code)
+        with timer.stage("analyse"):
+            comments = analyze_python_comments(parsed)
+        language = "python"
+    elif file.endswith(".java"):
+        with timer.stage("parse"):
+            parsed = trees.parse("java", rel_path, code) if trees else parse_java(code)
+        with timer.stage("analyse"):
+            comments = analyze_java_comments(parsed)
+        language = "java"
+    else:
+        return None
+
+    return FileAnalysis(rel_path, sha, language, comments, parsed.functions)
+
+
+def tree_cache() -> Optional["TreeCache"]:
+    """A TreeCache for `analyze_source` under the tree-sitter backend, else None."""
+    return TreeCache() if settings.PARSER_BACKEND == "tree-sitter" else None
+
+
+def analyze_streamed(source: SourceFile, timer: Optional[StageTimer] = None) -> Optional[FileAnalysis]:
+    """
+    `analyze_source` for a file too large to read whole: it is parsed
+    from disk a line (Python) or a chunk (Java) at a time and hashed on
+    the way through. Redundancy detection is bounded.
+    """
+
+    timer = timer or StageTimer()
+    file = source.rel_path.rsplit("/", 1)[-1]
+    if not file.endswith((".py", ".java")):
+        return None
+
+    with stream_source(source) as reader:
+        if reader is None:
+            return None
+        with timer.stage("parse"):
             if file.endswith(".py"):
-                parsed = parse_python(code)
-                comments = analyze_python_comments(parsed)
-                language = "python"
+                parsed = parse_python_stream(reader.readline)
             else:
-                parsed = parse_java(code)
-                comments = analyze_java_comments(parsed)
-                language = "java"
-
-            results.append({
-                "file": file,
-                "language": language,
-                "analysis": {
-                    "comments": comments,
-                }
-            })
+                parsed = parse_java_stream(reader.read)
+        sha = reader.hexdigest()
+
+    with timer.stage("analyse"):
+        if file.endswith(".py"):
+            comments, language = analyze_python_comments(parsed, bounded=True), "python"
+        else:
+            comments, language = analyze_java_comments(parsed, bounded=True), "java"
+
+    return FileAnalysis(source.rel_path, sha, language, comments, parsed.functions)
+
+
+def score_consistency(results: List[FileAnalysis]):
+    """
+    Docstring consistency is scored for every function of the batch in
+    one vectorised pass, then handed back to each file.
+    """
+
+    scores = iter(score_functions([f for entry in results for f in entry.functions]))
+    for entry in results:
+        entry.consistency = [next(scores) for _ in entry.functions]
+
+
+def _finish(fresh: List[FileAnalysis], timer: StageTimer):
+    with timer.stage("consistency"):
+        score_consistency(fresh)
+        for entry in fresh:
+            entry.pack_details()
+
+
+def analyze_files(
+    sources: List[SourceFile],
+    summary: Optional[RepoSummary] = None,
+    io_workers: Optional[int] = None,
+    timer: Optional[StageTimer] = None,
+    previous: Optional[Dict[str, Dict[str, Any]]] = None,
+) -> List[FileAnalysis]:
+    """
+    Analyses an already-discovered file list, e.g. one shard of a
+    larger walk. Entries come back in the order of `sources`, as compact
+    FileAnalysis records; callers convert with `as_dicts` (or let the
+    result codec do it per entry) only where JSON is needed.
+
+    `previous` maps paths to stored entries of an earlier result of the
+    same tree: files whose blob id is unchanged are carried over as
+    StoredFileAnalysis instead of being parsed again.
+    """
+
+    results: List[FileAnalysis] = []
+    # Fresh files not scored yet, and their function count.
+    fresh: List[FileAnalysis] = []
+    pending = 0
+    previous = previous or {}
+    timer = timer or StageTimer()
+    reader = read_sources(sources, io_workers)
+
+    while True:
+        with timer.stage("read"):
+            item = next(reader, None)
+        if item is None:
+            break
+
+        source, code, sha = item
+        stored = previous.get(source.rel_path)
+        if stored is not None and stored["hash"] == sha:
+            results.append(StoredFileAnalysis(stored))
+            continue
+
+        if code is None:
+            entry = analyze_streamed(source, timer)
+        else:
+            entry = analyze_source(source.rel_path, code, sha, timer)
+        if entry is not None:
+            results.append(entry)
+            fresh.append(entry)
+            pending += entry.total_functions
+            if pending >= CONSISTENCY_BATCH:
+                _finish(fresh, timer)
+                fresh, pending = [], 0
+
+    _finish(fresh, timer)
+
+    if summary is not None:
+        for entry in results:
+            summary.add(entry)
 
+    timer.flush()
     return results
@@ -0,0 +1,241 @@
+import hashlib
+import json
+import os
+import tempfile
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+from git import InvalidGitRepositoryError, NoSuchPathError, Repo
+
+from app.core.config import settings
+from app.services.aggregates import RepoSummary
+from app.services.analysis_service import ANALYSER_VERSION, analyze_codebase
+from app.services.git_source import fetch_commit, resolve_commit
+
+FORMATS = ("jsonl", "parquet")
+
+
+def is_remote(target: str) -> bool:
+    return "://" in target or target.startswith("git@")
+
+
+def read_targets(targets: Iterable[str], targets_file: Optional[str] = None) -> List[str]:
+    """
+    Targets from the command line and/or a file (one per line, `#`
+    comment lines allowed), de-duplicated in order. Local paths are
+    made absolute so resume matches them regardless of cwd.
+    """
+
+    lines = list(targets)
+    if targets_file:
+        with open(targets_file) as f:
+            lines.extend(f)
+
+    seen = {}
+    for line in lines:
+        target = line.strip()
+        if not target or target.startswith("#"):
+            continue
+        if not is_remote(target):
+            target = os.path.abspath(target)
+        seen.setdefault(target, None)
+    return list(seen)
+
+
+def _local_commit(path: str) -> Optional[str]:
+    try:
+        return Repo(path).head.commit.hexsha
+    except (InvalidGitRepositoryError, NoSuchPathError, ValueError):
+        return None
+
+
+def scan_target(target: str, io_workers: Optional[int] = None) -> Dict[str, Any]:
+    """
+    Analyses one local path or git URL. Never raises: failures come back
+    as `{"target", "error"}` so they cross the process boundary intact.
+    """
+
+    start = time.perf_counter()
+    summary = RepoSummary()
+
+    try:
+        if is_remote(target):
+            commit = resolve_commit(target)
+            if commit is None:
+                raise ValueError("repository not accessible")
+
+            os.makedirs(settings.BASE_ANALYSIS_PATH, exist_ok=True)
+            with tempfile.TemporaryDirectory(prefix="scan-", dir=settings.BASE_ANALYSIS_PATH) as path:
+                fetch_commit(target, commit, path)
+                files = analyze_codebase(path, summary, io_workers)
+        else:
+            if not os.path.isdir(target):
+                raise ValueError("not a directory")
+            commit = _local_commit(target)
+            files = analyze_codebase(target, summary, io_workers)
+    except Exception as e:
+        return {"target": target, "error": f"{type(e).__name__}: {e}"}
+
+    return {
+        "target": target,
+        "commit": commit,
+        "analyser_version": ANALYSER_VERSION,
+        "elapsed": round(time.perf_counter() - start, 3),
+        "summary": summary.to_dict(),
+        "files": files,
+    }
+
+
+def scan_targets(
+    targets: List[str],
+    jobs: int = 1,
+    io_workers: Optional[int] = None,
+) -> Iterator[Dict[str, Any]]:
+    """
+    Runs `scan_target` on a process pool, at most `jobs` repositories at
+    a time, yielding records in completion order.
+    """
+
+    remaining = iter(targets)
+
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        running = set()
+
+        def submit():
+            for target in remaining:
+                running.add(pool.submit(scan_target, target, io_workers))
+                if len(running) >= jobs:
+                    return
+
+        submit()
+        while running:
+            finished, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in finished:
+                running.discard(future)
+                yield future.result()
+            submit()
+
+
+def _to_dict(obj):
+    if hasattr(obj, "to_dict"):
+        return obj.to_dict()
+    raise TypeError(f"{type(obj).__name__} is not JSON serializable")
+
+
+class JsonlSink:
+    """
+    One line per repository. The output doubles as the checkpoint: a
+    target is done once its line is fully written, and a line cut short
+    by a crash is truncated on the next run.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.done = set()
+
+        if os.path.exists(path):
+            self._recover()
+
+        self.file = open(path, "a")
+
+    def _recover(self):
+        valid = 0
+        with open(self.path, "rb") as f:
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break
+                self.done.add(json.loads(line)["target"])
+                valid += len(line)
+
+        with open(self.path, "rb+") as f:
+            f.truncate(valid)
+
+    def is_done(self, target: str) -> bool:
+        return target in self.done
+
+    def write(self, record: Dict[str, Any]):
+        self.file.write(json.dumps(record, default=_to_dict) + "\n")
+        self.file.flush()
+        os.fsync(self.file.fileno())
+        self.done.add(record["target"])
+
+    def close(self):
+        self.file.close()
+
+
+class ParquetSink:
+    """
+    One Parquet file per repository in the output directory, one row
+    per analysed file, with the repository summary in the file metadata.
+    Parts are written to a temporary name and renamed, so a part that
+    exists is complete.
+    """
+
+    def __init__(self, path: str):
+        try:
+            import pyarrow
+            import pyarrow.parquet
+        except ImportError:
+            raise RuntimeError("Parquet output requires pyarrow")
+
+        self.pa = pyarrow
+        self.pq = pyarrow.parquet
+        self.path = path
+        os.makedirs(path, exist_ok=True)
+
+        self.schema = pyarrow.schema([
+            ("target", pyarrow.string()),
+            ("commit", pyarrow.string()),
+            ("path", pyarrow.string()),
+            ("file", pyarrow.string()),
+            ("language", pyarrow.string()),
+            ("hash", pyarrow.string()),
+            ("total_comments", pyarrow.int32()),
+            ("comments_per_function", pyarrow.float64()),
+            ("redundant_comments", pyarrow.int32()),
+            ("over_commented", pyarrow.bool_()),
+        ])
+
+    def _part(self, target: str) -> str:
+        return os.path.join(self.path, hashlib.sha1(target.encode()).hexdigest()[:16] + ".parquet")
+
+    def is_done(self, target: str) -> bool:
+        return os.path.exists(self._part(target))
+
+    def write(self, record: Dict[str, Any]):
+        rows = []
+        for entry in record["files"]:
+            comments = entry.comments
+            rows.append({
+                "target": record["target"],
+                "commit": record["commit"],
+                "path": entry.path,
+                "file": entry.file,
+                "language": entry.language,
+                "hash": entry.hash,
+                "total_comments": comments.total_comments,
+                "comments_per_function": comments.density,
+                "redundant_comments": len(comments.redundant_comments),
+                "over_commented": comments.over_commented,
+            })
+
+        table = self.pa.Table.from_pylist(rows, schema=self.schema).replace_schema_metadata({
+            "target": record["target"],
+            "commit": record["commit"] or "",
+            "analyser_version": record["analyser_version"],
+            "summary": json.dumps(record["summary"]),
+        })
+
+        part = self._part(record["target"])
+        self.pq.write_table(table, part + ".tmp", compression="zstd")
+        os.replace(part + ".tmp", part)
+
+    def close(self):
+        pass
+
+
+def open_sink(path: str, fmt: str):
+    if fmt == "parquet":
+        return ParquetSink(path)
+    return JsonlSink(path)
@@ -0,0 +1,215 @@
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, Optional
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+from sqlalchemy import inspect
+from sqlalchemy.orm import Session, defer
+
+from app.analysers.records import function_metrics
+from app.models.analysis import CodeAnalysis
+
+GRANULARITIES = ("files", "functions", "comments")
+
+# Rows per Arrow record batch; also bounds how much is buffered before
+# each write, whatever the size of individual analyses.
+BATCH_ROWS = 50_000
+# CodeAnalysis rows fetched per round trip.
+FETCH_ROWS = 100
+
+_ANALYSIS_FIELDS = [
+    ("analysis_id", pa.int64()),
+    ("source_type", pa.string()),
+    ("source_ref", pa.string()),
+    ("created_at", pa.timestamp("us", tz="UTC")),
+    ("path", pa.string()),
+    ("language", pa.string()),
+]
+
+SCHEMAS = {
+    "files": pa.schema(_ANALYSIS_FIELDS + [
+        ("file", pa.string()),
+        ("hash", pa.string()),
+        ("total_comments", pa.int32()),
+        ("comments_per_function", pa.float64()),
+        ("redundant_comments", pa.int32()),
+        ("over_commented", pa.bool_()),
+        ("functions", pa.int32()),
+        ("documented_functions", pa.int32()),
+    ]),
+    "functions": pa.schema(_ANALYSIS_FIELDS + [
+        ("name", pa.string()),
+        ("start_line", pa.int32()),
+        ("end_line", pa.int32()),
+        ("documented", pa.bool_()),
+        ("consistency", pa.float64()),
+        ("flags", pa.list_(pa.string())),
+    ]),
+    "comments": pa.schema(_ANALYSIS_FIELDS + [
+        ("scope", pa.string()),
+        ("owner", pa.string()),
+        ("line", pa.int32()),
+        ("text", pa.string()),
+        ("length", pa.int32()),
+    ]),
+}
+
+
+def _file_rows(entry: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+    comments = entry.get("analysis", {}).get("comments", {})
+    functions = entry.get("analysis", {}).get("functions") or function_metrics(entry.get("functions", []))
+    yield {
+        "file": entry.get("file"),
+        "hash": entry.get("hash"),
+        "total_comments": comments.get("total_comments", 0),
+        "comments_per_function": comments.get(
+            "comments_per_function", comments.get("comments_per_method", 0)
+        ),
+        "redundant_comments": len(comments.get("redundant_comments", [])),
+        "over_commented": bool(comments.get("over_commented")),
+        "functions": functions["total"],
+        "documented_functions": functions["documented"],
+    }
+
+
+def _function_rows(detail: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+    # Results from analyser versions before 4 carry no function list.
+    return iter(detail.get("functions", []))
+
+
+def _comment_rows(detail: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+    for comment in detail.get("comments", []):
+        yield {**comment, "length": len(comment["text"])}
+
+
+_ROWS = {"files": _file_rows, "functions": _function_rows, "comments": _comment_rows}
+
+
+def _entries(analysis: CodeAnalysis, granularity: str) -> List[Dict[str, Any]]:
+    if granularity == "files":
+        return analysis.payload or []
+    # Function and comment rows are stored apart from the entries, except
+    # in results stored before they were, whose entries carry them.
+    return analysis.payload_details or analysis.payload or []
+
+
+def iter_batches(
+    db: Session,
+    granularity: str,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    source_type: Optional[str] = None,
+    user_id: Optional[int] = None,
+    batch_rows: int = BATCH_ROWS,
+) -> Iterator[pa.RecordBatch]:
+    """
+    Flattens stored analyses, oldest first, into Arrow record batches of
+    at most `batch_rows` rows. With `user_id`, only that user's analyses
+    are exported; without it, every stored analysis is.
+    """
+
+    schema = SCHEMAS[granularity]
+    rows_for = _ROWS[granularity]
+
+    # Result columns are deferred and loaded per analysis as it is
+    # flattened, so only one payload is in memory at a time.
+    query = (
+        db.query(CodeAnalysis)
+        .options(defer(CodeAnalysis.result), defer(CodeAnalysis.result_packed))
+        .order_by(CodeAnalysis.id)
+    )
+    if since is not None:
+        query = query.filter(CodeAnalysis.created_at >= since)
+    if until is not None:
+        query = query.filter(CodeAnalysis.created_at < until)
+    if source_type is not None:
+        query = query.filter(CodeAnalysis.source_type == source_type)
+    if user_id is not None:
+        query = query.filter(CodeAnalysis.user_id == user_id)
+
+    columns: Dict[str, List[Any]] = {name: [] for name in schema.names}
+    buffered = 0
+
+    last_result_id, last_payload = None, None
+
+    for analysis in query.yield_per(FETCH_ROWS):
+        context = {
+            "analysis_id": analysis.id,
+            "source_type": analysis.source_type,
+            "source_ref": analysis.source_ref,
+            "created_at": analysis.created_at,
+        }
+
+        # Re-analyses of an unchanged commit share one result; decode it once.
+        if analysis.result_id is not None and analysis.result_id == last_result_id:
+            payload = last_payload
+        else:
+            payload = _entries(analysis, granularity)
+            last_result_id, last_payload = analysis.result_id, payload
+
+        for entry in payload:
+            context["path"] = entry.get("path") or entry.get("file")
+            context["language"] = entry.get("language")
+
+            for row in rows_for(entry):
+                for name in schema.names:
+                    columns[name].append(context[name] if name in context else row.get(name))
+                buffered += 1
+
+                if buffered >= batch_rows:
+                    yield pa.RecordBatch.from_pydict(columns, schema=schema)
+                    columns = {name: [] for name in schema.names}
+                    buffered = 0
+
+        # Loaded payloads stay on the session's identity map otherwise.
+        if "shared_result" not in inspect(analysis).unloaded and analysis.shared_result is not None:
+            db.expunge(analysis.shared_result)
+        db.expunge(analysis)
+
+    if buffered:
+        yield pa.RecordBatch.from_pydict(columns, schema=schema)
+
+
+def write_parquet(batches: Iterator[pa.RecordBatch], path: str, granularity: str) -> int:
+    """Writes batches to one Parquet file as they arrive; returns rows written."""
+
+    rows = 0
+    with pq.ParquetWriter(path, SCHEMAS[granularity], compression="zstd") as writer:
+        for batch in batches:
+            writer.write_batch(batch)
+            rows += batch.num_rows
+    return rows
+
+
+class _ChunkSink:
+    """Write-only file object that hands written bytes back to the caller."""
+
+    closed = False
+
+    def __init__(self):
+        self.chunks: List[bytes] = []
+
+    def write(self, data) -> int:
+        self.chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def take(self) -> bytes:
+        data, self.chunks = b"".join(self.chunks), []
+        return data
+
+
+def stream_ipc(batches: Iterator[pa.RecordBatch], granularity: str) -> Iterator[bytes]:
+    """Arrow IPC stream format, emitted one record batch at a time."""
+
+    sink = _ChunkSink()
+    writer = pa.ipc.new_stream(pa.PythonFile(sink, mode="w"), SCHEMAS[granularity])
+
+    for batch in batches:
+        writer.write_batch(batch)
+        yield sink.take()
+
+    writer.close()
+    yield sink.take()
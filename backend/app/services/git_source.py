@@ -0,0 +1,44 @@
+from typing import Optional
+
+from git import Git, GitCommandError, Repo
+
+
+def resolve_commit(repo_url: str, ref: str = "HEAD") -> Optional[str]:
+    """
+    Resolves `ref` on the remote without cloning, so a cached result can
+    be served before any objects are transferred.
+    """
+
+    try:
+        output = Git().ls_remote(repo_url, ref)
+    except GitCommandError:
+        return None
+
+    line = output.splitlines()[0] if output else ""
+    return line.split()[0] if line else None
+
+
+def fetch_commit(repo_url: str, commit_sha: str, path: str) -> Repo:
+    """
+    Materialises exactly `commit_sha` in `path` with a shallow fetch,
+    so the checked-out tree always matches the key it is cached under.
+    """
+
+    repo = Repo.init(path)
+    repo.create_remote("origin", repo_url)
+    repo.git.fetch("--depth", "1", "origin", commit_sha)
+    repo.git.checkout("--detach", "FETCH_HEAD")
+    return repo
+
+
+def fetch_history(repo_url: str, commit_sha: str, path: str) -> Repo:
+    """
+    Fetches `commit_sha` with its full history into a bare repository;
+    history analysis reads blobs straight from the object store, so no
+    working tree is checked out.
+    """
+
+    repo = Repo.init(path, bare=True)
+    repo.create_remote("origin", repo_url)
+    repo.git.fetch("origin", commit_sha)
+    return repo
@@ -0,0 +1,272 @@
+import re
+import time
+from fnmatch import translate
+from typing import Any, Dict, Iterable, List, MutableMapping, NamedTuple, Optional, Tuple
+
+import pathspec
+from git import Repo
+
+from app.analysers.records import FileAnalysis
+from app.core.config import settings
+from app.core.tracing import StageTimer
+from app.services.analysis_service import analyze_source, score_consistency, tree_cache
+from app.services.walker import EXCLUDED_DIRS, GENERATED_SUFFIXES, decode_source
+
+# git's well-known empty tree: diffing against it lists a whole commit.
+EMPTY_TREE = "4b825dc642cb6eb9a060e54bf8d69288fbee4904"
+REGULAR_FILE_MODES = ("100644", "100755")
+
+
+class BlobMetrics(NamedTuple):
+    """What one analysed blob contributes to a commit's aggregates."""
+
+    total_comments: int
+    density: float
+    redundant_comments: int
+    over_commented: bool
+    documented_functions: int
+    score_sum: float
+    flags: Tuple[Tuple[str, int], ...]
+
+    @classmethod
+    def of(cls, entry: FileAnalysis) -> "BlobMetrics":
+        scored = [s for s in entry.consistency if s is not None]
+        flags: Dict[str, int] = {}
+        for _, names in scored:
+            for name in names:
+                flags[name] = flags.get(name, 0) + 1
+
+        comments = entry.comments
+        return cls(
+            comments.total_comments,
+            comments.density,
+            len(comments.redundant_comments),
+            comments.over_commented,
+            len(scored),
+            sum(score for score, _ in scored),
+            tuple(sorted(flags.items())),
+        )
+
+
+# Keyed by "<blob sha>:<language>"; None marks blobs that were looked at
+# and skipped (too large, binary, generated or unparsable).
+BlobCache = MutableMapping[str, Optional[BlobMetrics]]
+
+
+class TreeTotals:
+    """
+    Aggregates of the files present at one commit, updated by adding
+    and removing per-blob metrics as the tree changes.
+    """
+
+    def __init__(self):
+        self.files = 0
+        self.total_comments = 0
+        self.redundant_comments = 0
+        self.over_commented_files = 0
+        self.density_sum = 0.0
+        self.documented_functions = 0
+        self.score_sum = 0.0
+        self.flags: Dict[str, int] = {}
+
+    def add(self, metrics: BlobMetrics, sign: int = 1):
+        self.files += sign
+        self.total_comments += sign * metrics.total_comments
+        self.redundant_comments += sign * metrics.redundant_comments
+        self.over_commented_files += sign * metrics.over_commented
+        self.density_sum += sign * metrics.density
+        self.documented_functions += sign * metrics.documented_functions
+        self.score_sum += sign * metrics.score_sum
+        for flag, count in metrics.flags:
+            self.flags[flag] = self.flags.get(flag, 0) + sign * count
+
+    def remove(self, metrics: BlobMetrics):
+        self.add(metrics, -1)
+
+    def to_dict(self) -> Dict[str, Any]:
+        files = self.files
+        documented = self.documented_functions
+
+        return {
+            "files": files,
+            "total_comments": self.total_comments,
+            "redundant_comments": self.redundant_comments,
+            "over_commented_files": self.over_commented_files,
+            "mean": {
+                "comments_per_file": round(self.total_comments / files, 2) if files else 0,
+                "comments_per_function": round(self.density_sum / files, 2) if files else 0,
+                "redundant_per_file": round(self.redundant_comments / files, 2) if files else 0,
+            },
+            "consistency": {
+                "documented_functions": documented,
+                "mean_score": round(self.score_sum / documented, 3) if documented else None,
+                "flags": {flag: n for flag, n in sorted(self.flags.items()) if n},
+            },
+        }
+
+
+def _language(path: str) -> Optional[str]:
+    if path.endswith(".py"):
+        return "python"
+    if path.endswith(".java"):
+        return "java"
+    return None
+
+
+def _path_filter(include: Optional[Iterable[str]], exclude: Optional[Iterable[str]]):
+    """Same selection as the walker, applied to paths inside a git tree."""
+
+    include = list(include or [g.strip() for g in settings.ANALYSIS_INCLUDE.split(",") if g.strip()])
+    included = re.compile("|".join(translate(pattern) for pattern in include)).match
+    if exclude is None:
+        exclude = [g.strip() for g in settings.ANALYSIS_EXCLUDE.split(",") if g.strip()]
+    exclude = list(exclude)
+    spec = pathspec.GitIgnoreSpec.from_lines(exclude) if exclude else None
+
+    def wanted(path: str) -> bool:
+        *dirs, name = path.split("/")
+        if not included(name) or name.endswith(GENERATED_SUFFIXES) or _language(name) is None:
+            return False
+        if any(part in EXCLUDED_DIRS for part in dirs):
+            return False
+        return spec is None or not spec.match_file(path)
+
+    return wanted
+
+
+def _tree_changes(repo: Repo, old: str, new: str) -> Iterable[Tuple[str, Optional[str]]]:
+    """
+    (path, new blob sha) for every file that differs between two
+    commits; the sha is None when the path no longer holds a regular file.
+    """
+
+    output = repo.git.diff_tree("-r", "-z", "--no-renames", old, new)
+    fields = output.split("\0")
+
+    for meta, path in zip(fields[0::2], fields[1::2]):
+        _, new_mode, _, new_sha, _ = meta.lstrip(":").split(" ")
+        yield path, new_sha if new_mode in REGULAR_FILE_MODES else None
+
+
+def _read_blob(repo: Repo, sha: str, max_bytes: int) -> Optional[str]:
+    binsha = bytes.fromhex(sha)
+    if repo.odb.info(binsha).size > max_bytes:
+        return None
+    return decode_source(repo.odb.stream(binsha).read())
+
+
+def select_commits(repo: Repo, ref: str, max_commits: Optional[int], step: int) -> List[Any]:
+    """
+    First-parent history of `ref`, oldest first: the newest
+    `max_commits` commits, thinned to every `step`-th one (always
+    keeping `ref` itself).
+    """
+
+    newest_first = list(repo.iter_commits(ref, first_parent=True, max_count=max_commits))
+    return newest_first[::max(step, 1)][::-1]
+
+
+def analyze_history(
+    repo_path: str,
+    ref: str = "HEAD",
+    max_commits: Optional[int] = None,
+    step: int = 1,
+    cache: Optional[BlobCache] = None,
+    include: Optional[Iterable[str]] = None,
+    exclude: Optional[Iterable[str]] = None,
+    max_bytes: Optional[int] = None,
+) -> Tuple[List[Dict[str, Any]], Dict[str, Any]]:
+    """
+    Comment-quality time series over the history of `ref` in a local
+    (possibly bare) repository.
+
+    Only the files that changed between consecutive selected commits are
+    looked at, and each unique blob is analysed once: unchanged files
+    keep their contribution to the running totals, and a blob seen
+    before (a revert, a file copied or moved) is served from `cache`.
+    Pass a persistent mapping as `cache` to reuse blobs across runs.
+    Blobs that do not parse (Python 2, syntax errors) are skipped like
+    binaries and counted in the stats.
+
+    Returns (points, stats): one point per selected commit, oldest
+    first, and run statistics.
+    """
+
+    start = time.perf_counter()
+    repo = Repo(repo_path)
+    wanted = _path_filter(include, exclude)
+    max_bytes = max_bytes or settings.MAX_ANALYSIS_FILE_BYTES
+    cache = {} if cache is None else cache
+    timer = StageTimer()
+    # Consecutive versions of a path are usually small edits.
+    trees = tree_cache()
+
+    tree: Dict[str, BlobMetrics] = {}
+    totals = TreeTotals()
+    points: List[Dict[str, Any]] = []
+    analysed = reused = unparsable = 0
+    previous = EMPTY_TREE
+
+    for commit in select_commits(repo, ref, max_commits, step):
+        with timer.stage("walk"):
+            changes = [(path, sha) for path, sha in _tree_changes(repo, previous, commit.hexsha)
+                       if wanted(path)]
+
+        # Blobs not seen before are analysed and scored as one batch.
+        fresh: Dict[str, FileAnalysis] = {}
+        for path, sha in changes:
+            if sha is None:
+                continue
+            key = f"{sha}:{_language(path)}"
+            if key in cache or key in fresh:
+                reused += 1
+                continue
+
+            with timer.stage("read"):
+                code = _read_blob(repo, sha, max_bytes)
+            entry = None
+            if code is not None:
+                try:
+                    entry = analyze_source(path, code, sha, timer, trees)
+                except (SyntaxError, ValueError, RecursionError):
+                    # Python 2 or broken files: one bad blob must not end the run.
+                    unparsable += 1
+            if entry is None:
+                cache[key] = None
+            else:
+                fresh[key] = entry
+
+        with timer.stage("consistency"):
+            score_consistency(list(fresh.values()))
+        for key, entry in fresh.items():
+            cache[key] = BlobMetrics.of(entry)
+        analysed += len(fresh)
+
+        for path, sha in changes:
+            old = tree.pop(path, None)
+            if old is not None:
+                totals.remove(old)
+            metrics = cache[f"{sha}:{_language(path)}"] if sha is not None else None
+            if metrics is not None:
+                tree[path] = metrics
+                totals.add(metrics)
+
+        points.append({
+            "commit": commit.hexsha,
+            "committed_at": commit.committed_datetime.isoformat(),
+            "changed_files": len(changes),
+            "analysed_blobs": len(fresh),
+            **totals.to_dict(),
+        })
+        previous = commit.hexsha
+
+    timer.flush()
+    stats = {
+        "ref": ref,
+        "commits": len(points),
+        "analysed_blobs": analysed,
+        "reused_blobs": reused,
+        "unparsable_blobs": unparsable,
+        "elapsed": round(time.perf_counter() - start, 3),
+    }
+    return points, stats
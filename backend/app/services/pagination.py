@@ -0,0 +1,61 @@
+import base64
+from datetime import datetime
+from typing import Any, List, Optional, Tuple
+
+from sqlalchemy import literal, tuple_
+from sqlalchemy.orm import Query
+
+Cursor = Tuple[datetime, int]
+
+
+def encode_cursor(created_at: datetime, row_id: int) -> str:
+    raw = f"{created_at.isoformat()}|{row_id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Cursor:
+    """Inverse of `encode_cursor`; raises ValueError for anything else."""
+
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        created_at, row_id = raw.split("|")
+        return datetime.fromisoformat(created_at), int(row_id)
+    except (ValueError, UnicodeDecodeError) as exc:
+        raise ValueError("invalid cursor") from exc
+
+
+def keyset_page(
+    query: Query,
+    created_at_column: Any,
+    id_column: Any,
+    cursor: Optional[str],
+    limit: int,
+) -> Tuple[List[Any], Optional[str]]:
+    """
+    One page of `query`, newest first, after `cursor`. Seeks on
+    (created_at, id) instead of skipping rows with OFFSET, so every page
+    costs the same index range scan however deep it is.
+    Returns (rows, cursor for the next page or None).
+    """
+
+    if cursor is not None:
+        created_at, row_id = decode_cursor(cursor)
+        # Bound with the columns' own types, so the timestamp is compared
+        # in the database's format, not as an ISO string.
+        query = query.filter(
+            tuple_(created_at_column, id_column)
+            < tuple_(literal(created_at, created_at_column.type), literal(row_id, id_column.type))
+        )
+
+    rows = (
+        query.order_by(created_at_column.desc(), id_column.desc())
+        .limit(limit + 1)
+        .all()
+    )
+
+    if len(rows) <= limit:
+        return rows, None
+
+    rows = rows[:limit]
+    last = rows[-1]
+    return rows, encode_cursor(last.created_at, last.id)
@@ -0,0 +1,91 @@
+import math
+import os
+import shutil
+import uuid
+from typing import Optional
+
+from app.analysers.records import with_details
+from app.core.config import settings
+from app.core.tracing import span, start_trace
+from app.database.database import SessionLocal
+from app.models.analysis import AnalysisResult
+from app.models.webhook import RegisteredRepo
+from app.services.admission import Cost, enter
+from app.services.git_source import fetch_commit
+from app.services.result_cache import content_key, get_or_compute
+from app.services.walker import walk_source_files
+from app.services.webhooks import PushDebouncer
+from app.services.worker_pool import run_analysis
+
+
+def prefetch_commit(repo_id: int, commit_sha: str):
+    """
+    Stores the analysis of `commit_sha` under the same key an analyse
+    request for that commit looks up. Files unchanged since the last
+    pre-analysed commit are carried over from its result.
+    """
+
+    with SessionLocal() as db:
+        repo = db.get(RegisteredRepo, repo_id)
+        if repo is None:
+            return
+
+        previous = None
+        if repo.last_analyzed_sha:
+            stored = db.query(AnalysisResult).filter(
+                AnalysisResult.content_key == content_key(repo.repo_url, repo.last_analyzed_sha)
+            ).first()
+            if stored is not None:
+                previous = with_details(stored.stored_result, stored.stored_details)
+
+        repo_url = repo.repo_url
+
+        def compute():
+            path = os.path.join(settings.BASE_ANALYSIS_PATH, str(uuid.uuid4()))
+            try:
+                with span("clone"):
+                    fetch_commit(repo_url, commit_sha, path)
+                # Background work shares capacity with requests but never gives up.
+                with enter(None) as ticket:
+                    ticket.admit(Cost.of(walk_source_files(path)), wait=math.inf)
+                    result, summary = run_analysis(path, previous)
+                return result, summary.to_dict()
+            finally:
+                # Nobody reads a pre-analysis checkout afterwards.
+                shutil.rmtree(path, ignore_errors=True)
+
+        with start_trace("webhook.prefetch", repo_url=repo_url, incremental=previous is not None):
+            get_or_compute(db, content_key(repo_url, commit_sha), compute)
+
+        repo.last_analyzed_sha = commit_sha
+        db.commit()
+
+
+_debouncer: Optional[PushDebouncer] = None
+
+
+def start_prefetch():
+    global _debouncer
+    if settings.WEBHOOK_WORKERS > 0 and _debouncer is None:
+        _debouncer = PushDebouncer(
+            prefetch_commit,
+            settings.WEBHOOK_DEBOUNCE_SECONDS,
+            settings.WEBHOOK_MAX_DELAY_SECONDS,
+            settings.WEBHOOK_WORKERS,
+        )
+
+
+def stop_prefetch():
+    global _debouncer
+    if _debouncer is not None:
+        _debouncer.stop()
+        _debouncer = None
+
+
+def enqueue_push(repo_id: int, commit_sha: str) -> bool:
+    """Schedules pre-analysis of a pushed commit; False when disabled."""
+
+    if _debouncer is None:
+        return False
+    _debouncer.submit(repo_id, commit_sha)
+    return True
@@ -0,0 +1,115 @@
+import hashlib
+import threading
+from concurrent.futures import Future
+from typing import Callable, Dict
+from urllib.parse import urlparse
+
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.core.metrics import QUEUE_DEPTH, record_cache
+from app.database.database import SessionLocal
+from app.models.analysis import AnalysisResult
+from app.services.analysis_service import ANALYSER_VERSION
+
+
+def normalize_repo_url(repo_url: str) -> str:
+    parsed = urlparse(repo_url.strip())
+    path = parsed.path.rstrip("/")
+    if path.endswith(".git"):
+        path = path[:-4]
+    return f"{parsed.scheme.lower()}://{parsed.netloc.lower()}{path}"
+
+
+def content_key(repo_url: str, commit_sha: str) -> str:
+    raw = f"{normalize_repo_url(repo_url)}\0{commit_sha}\0{ANALYSER_VERSION}"
+    return hashlib.sha256(raw.encode()).hexdigest()
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls for the same key into one computation.
+    The first caller runs `fn`; everyone else waits for its outcome.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self._lock = threading.Lock()
+        self._calls: Dict[str, Future] = {}
+
+    def do(self, key: str, fn: Callable):
+        with self._lock:
+            future = self._calls.get(key)
+            leader = future is None
+            if leader:
+                future = Future()
+                self._calls[key] = future
+                QUEUE_DEPTH.labels(self.name).set(len(self._calls))
+
+        if not leader:
+            return future.result()
+
+        try:
+            future.set_result(fn())
+        except BaseException as exc:
+            future.set_exception(exc)
+        finally:
+            with self._lock:
+                del self._calls[key]
+                QUEUE_DEPTH.labels(self.name).set(len(self._calls))
+
+        return future.result()
+
+
+_inflight = SingleFlight("analysis_inflight")
+
+
+def _store(key: str, compute: Callable[[], tuple]) -> int:
+    with SessionLocal() as session:
+        existing = session.query(AnalysisResult.id).filter(
+            AnalysisResult.content_key == key
+        ).scalar()
+    if existing is not None:
+        return existing
+
+    # Computing may queue for capacity and run for minutes; no pooled
+    # connection is held meanwhile.
+    result, summary = compute()
+
+    with SessionLocal() as session:
+        shared = AnalysisResult(content_key=key)
+        shared.set_result(result, summary)
+        session.add(shared)
+
+        try:
+            session.commit()
+        except IntegrityError:
+            # Another process stored the same key first; keep theirs.
+            session.rollback()
+            return session.query(AnalysisResult.id).filter(
+                AnalysisResult.content_key == key
+            ).scalar()
+
+        return shared.id
+
+
+def get_or_compute(db: Session, key: str, compute: Callable[[], tuple]) -> AnalysisResult:
+    """
+    Returns the shared result for `key`, computing and storing it once
+    if missing. `compute` returns (result, summary). Concurrent requests
+    for the same key share one run.
+    """
+
+    existing = db.query(AnalysisResult).filter(
+        AnalysisResult.content_key == key
+    ).first()
+    record_cache("analysis_result", existing is not None)
+
+    if existing is not None:
+        return existing
+
+    # End the read transaction so the request's connection goes back to
+    # the pool for the duration of the computation.
+    db.commit()
+    result_id = _inflight.do(key, lambda: _store(key, compute))
+    return db.get(AnalysisResult, result_id)
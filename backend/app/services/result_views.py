@@ -0,0 +1,84 @@
+import hashlib
+import json
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+from app.analysers.records import DETAIL_KEYS
+
+PROJECTIONS = ("full", "summary")
+# Part of every ETag: bump whenever a stored result is rendered
+# differently (projections, entry layout), so cached copies revalidate.
+REPRESENTATION_VERSION = "2"
+
+
+def file_summary(entry: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Per-file entry without the (potentially large) redundant comment
+    pairs: counts and flags only.
+    """
+
+    comments = entry.get("analysis", {}).get("comments", {})
+    summary = {
+        key: value
+        for key, value in comments.items()
+        if key != "redundant_comments"
+    }
+    summary["redundant_count"] = len(comments.get("redundant_comments", []))
+
+    return {
+        "file": entry.get("file"),
+        "path": entry.get("path"),
+        "language": entry.get("language"),
+        "summary": summary,
+    }
+
+
+def project_files(
+    result: List[Dict[str, Any]],
+    fields: str = "full",
+    path: Optional[str] = None,
+) -> List[Dict[str, Any]]:
+    entries = result or []
+
+    if path is not None:
+        entries = [e for e in entries if e.get("path", e.get("file")) == path]
+
+    if fields == "summary":
+        return [file_summary(e) for e in entries]
+    # Entries stored before detail rows were kept apart still carry them.
+    return [
+        {key: value for key, value in e.items() if key not in DETAIL_KEYS}
+        if any(key in e for key in DETAIL_KEYS) else e
+        for e in entries
+    ]
+
+
+def make_etag(*parts: Any) -> str:
+    raw = "\0".join(str(p) for p in (REPRESENTATION_VERSION, *parts))
+    return '"' + hashlib.sha1(raw.encode()).hexdigest() + '"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+
+    candidates = [tag.strip() for tag in if_none_match.split(",")]
+    return "*" in candidates or etag in candidates or f"W/{etag}" in candidates
+
+
+def stream_json(head: Dict[str, Any], items_key: str, items: Iterable[Any]) -> Iterator[bytes]:
+    """
+    Encodes `{**head, items_key: [...items]}` incrementally, one item per
+    chunk, so large results are never serialised into a single string.
+    """
+
+    prefix = json.dumps(head)[:-1]
+    separator = ", " if head else ""
+    yield f'{prefix}{separator}"{items_key}": ['.encode()
+
+    first = True
+    for item in items:
+        chunk = json.dumps(item)
+        yield (chunk if first else ", " + chunk).encode()
+        first = False
+
+    yield b"]}"
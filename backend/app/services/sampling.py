@@ -0,0 +1,301 @@
+import math
+import random
+import time
+from collections import Counter
+from statistics import NormalDist
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.analysers.records import FileAnalysis
+from app.core.config import settings
+from app.core.tracing import StageTimer
+from app.services.analysis_service import analyze_files
+from app.services.walker import SourceFile, walk_source_files
+
+# Per-file metrics estimated from a sample, in this order.
+METRICS = ("comments_per_file", "comments_per_function", "redundant_per_file", "over_commented_rate")
+# A sample stops growing once these are within the target precision;
+# redundancy is often near zero, where a relative target cannot be met.
+STOPPING_METRICS = ("comments_per_file", "comments_per_function")
+
+SIZE_BANDS = ((2 * 1024, "small"), (16 * 1024, "medium"), (math.inf, "large"))
+# Top-level directories beyond the largest few share one stratum.
+MAX_DIRECTORIES = 8
+PILOT_PER_STRATUM = 2
+
+StratumKey = Tuple[str, str, str]
+
+
+def _metrics(entry: FileAnalysis) -> Tuple[float, ...]:
+    comments = entry.comments
+    return (
+        comments.total_comments,
+        comments.density,
+        len(comments.redundant_comments),
+        1.0 if comments.over_commented else 0.0,
+    )
+
+
+def _size_band(size: int) -> str:
+    return next(name for limit, name in SIZE_BANDS if size < limit)
+
+
+def _language(rel_path: str) -> str:
+    return "java" if rel_path.endswith(".java") else "python"
+
+
+def _directory(rel_path: str) -> str:
+    return rel_path.split("/", 1)[0] if "/" in rel_path else "."
+
+
+class Stratum:
+    """
+    Files sharing a language, top-level directory and size band, in a
+    seeded random order: the sample is always a prefix of `files`.
+    """
+
+    __slots__ = ("key", "files", "taken", "values")
+
+    def __init__(self, key: StratumKey, files: List[SourceFile]):
+        self.key = key
+        self.files = files
+        self.taken = 0
+        self.values: List[Tuple[float, ...]] = []
+
+    @property
+    def remaining(self) -> int:
+        return len(self.files) - self.taken
+
+    def eligible(self) -> float:
+        """Files expected to be analysable, scaled by the skip rate seen so far."""
+
+        if not self.taken:
+            return float(len(self.files))
+        return len(self.files) * len(self.values) / self.taken
+
+    def spread(self, metric: int) -> Optional[float]:
+        """Sample standard deviation of one metric; None below two values."""
+
+        n = len(self.values)
+        if n < 2:
+            return None
+        mean = sum(v[metric] for v in self.values) / n
+        return math.sqrt(sum((v[metric] - mean) ** 2 for v in self.values) / (n - 1))
+
+
+def stratify(sources: List[SourceFile], seed: int = 0) -> List[Stratum]:
+    """Groups files into strata, each shuffled with `seed`."""
+
+    directories = Counter(_directory(s.rel_path) for s in sources)
+    kept = {d for d, _ in directories.most_common(MAX_DIRECTORIES)}
+
+    groups: Dict[StratumKey, List[SourceFile]] = {}
+    for source in sorted(sources, key=lambda s: s.rel_path):
+        directory = _directory(source.rel_path)
+        key = (_language(source.rel_path), directory if directory in kept else "*", _size_band(source.size))
+        groups.setdefault(key, []).append(source)
+
+    rng = random.Random(seed)
+    strata = []
+    for key in sorted(groups):
+        files = groups[key]
+        rng.shuffle(files)
+        strata.append(Stratum(key, files))
+    return strata
+
+
+def _spreads(strata: List[Stratum], metric: int) -> List[float]:
+    # Strata with fewer than two values borrow the mean spread of the rest.
+    known = [s.spread(metric) for s in strata]
+    seen = [x for x in known if x is not None]
+    fallback = sum(seen) / len(seen) if seen else 0.0
+    return [fallback if x is None else x for x in known]
+
+
+def estimate(strata: List[Stratum], metric: int, z: float) -> Dict[str, Any]:
+    """
+    Stratified mean of one metric with its standard error (finite
+    population corrected) and a normal confidence interval.
+    """
+
+    sampled = [s for s in strata if s.values]
+    population = sum(s.eligible() for s in sampled)
+    if not population:
+        return {"estimate": None, "stderr": None, "ci": [None, None]}
+
+    spreads = _spreads(sampled, metric)
+    mean = variance = 0.0
+    for stratum, spread in zip(sampled, spreads):
+        n = len(stratum.values)
+        weight = stratum.eligible() / population
+        mean += weight * sum(v[metric] for v in stratum.values) / n
+        correction = max(0.0, 1 - stratum.taken / len(stratum.files))
+        variance += weight ** 2 * correction * spread ** 2 / n
+
+    stderr = math.sqrt(variance)
+    return {
+        "estimate": round(mean, 4),
+        "stderr": round(stderr, 4),
+        "ci": [round(mean - z * stderr, 4), round(mean + z * stderr, 4)],
+    }
+
+
+def _required_files(strata: List[Stratum], metric: int, margin: float, z: float) -> float:
+    """Total sample size meeting `margin` under Neyman allocation."""
+
+    population = sum(s.eligible() for s in strata)
+    if not population:
+        return 0.0
+
+    spreads = _spreads(strata, metric)
+    weighted = sum(s.eligible() / population * spread for s, spread in zip(strata, spreads))
+    weighted_sq = sum(s.eligible() / population * spread ** 2 for s, spread in zip(strata, spreads))
+    if margin <= 0:
+        return math.inf
+    return weighted ** 2 / ((margin / z) ** 2 + weighted_sq / population)
+
+
+def _allocate(strata: List[Stratum], total: int) -> List[int]:
+    """
+    Extra files to draw per stratum so the sample approaches `total`
+    files split in proportion to size times spread (Neyman), with at
+    least one new file overall.
+    """
+
+    spreads = _spreads(strata, 0)
+    shares = [len(s.files) * max(spread, 1e-9) for s, spread in zip(strata, spreads)]
+    scale = sum(shares)
+
+    extra = [
+        min(s.remaining, max(0, math.ceil(total * share / scale) - s.taken))
+        for s, share in zip(strata, shares)
+    ]
+    if not any(extra):
+        # Rounding left nothing to draw: take one from the largest open stratum.
+        open_strata = [i for i, s in enumerate(strata) if s.remaining]
+        extra[max(open_strata, key=lambda i: shares[i])] = 1
+    return extra
+
+
+def _draw(strata: List[Stratum], counts: List[int]) -> List[SourceFile]:
+    batch = []
+    for stratum, count in zip(strata, counts):
+        batch.extend(stratum.files[stratum.taken:stratum.taken + count])
+        stratum.taken += count
+    return batch
+
+
+def sample_codebase(
+    path: str,
+    precision: Optional[float] = None,
+    time_budget: Optional[float] = None,
+    confidence: Optional[float] = None,
+    seed: int = 0,
+    io_workers: Optional[int] = None,
+    timer: Optional[StageTimer] = None,
+) -> Tuple[List[FileAnalysis], Dict[str, Any]]:
+    """
+    Estimates per-file comment metrics from a stratified random sample
+    (language x top-level directory x size band) instead of a full scan.
+
+    Files are analysed in rounds: a pilot of a few files per stratum,
+    then Neyman-allocated top-ups sized from the spread seen so far,
+    until the confidence intervals of the mean comments per file and
+    per function are within `precision` (relative half-width), the
+    `time_budget` in seconds is spent, or every file has been analysed.
+    With neither given, precision defaults to SAMPLE_PRECISION.
+
+    Returns the analysed entries and the estimate. The entries can be
+    passed to a later full scan as `previous`, so escalating reuses them.
+    """
+
+    if precision is None and time_budget is None:
+        precision = settings.SAMPLE_PRECISION
+    confidence = confidence or settings.SAMPLE_CONFIDENCE
+    z = NormalDist().inv_cdf(0.5 + confidence / 2)
+    timer = timer or StageTimer()
+
+    with timer.stage("walk"):
+        sources = list(walk_source_files(path))
+    strata = stratify(sources, seed)
+    stratum_of = {s.rel_path: stratum for stratum in strata for s in stratum.files}
+
+    results: List[FileAnalysis] = []
+    start = time.perf_counter()
+    counts = [min(len(s.files), PILOT_PER_STRATUM) for s in strata]
+
+    while True:
+        batch = _draw(strata, counts)
+        for entry in analyze_files(batch, None, io_workers, timer):
+            stratum_of[entry.path].values.append(_metrics(entry))
+            results.append(entry)
+
+        elapsed = time.perf_counter() - start
+        estimates = {m: estimate(strata, i, z) for i, m in enumerate(METRICS)}
+        taken = sum(s.taken for s in strata)
+
+        if not any(s.remaining for s in strata):
+            stopped = "exhausted"
+            break
+        if precision is not None and all(
+            estimates[m]["estimate"] is not None
+            and z * estimates[m]["stderr"] <= precision * abs(estimates[m]["estimate"])
+            for m in STOPPING_METRICS
+        ):
+            stopped = "precision"
+            break
+        if time_budget is not None and elapsed >= time_budget:
+            stopped = "time_budget"
+            break
+
+        if precision is not None:
+            target = max(
+                _required_files(strata, METRICS.index(m), precision * abs(estimates[m]["estimate"] or 0), z)
+                for m in STOPPING_METRICS
+            )
+        else:
+            target = math.inf
+        # Grow at most geometrically, so spreads are re-estimated on the way.
+        target = min(target, 2 * taken + len(strata))
+        if time_budget is not None:
+            affordable = (time_budget - elapsed) / (elapsed / taken)
+            target = min(target, taken + max(1, int(affordable)))
+
+        counts = _allocate(strata, int(math.ceil(target)))
+
+    population = sum(s.eligible() for s in strata)
+    totals = {
+        name: {
+            "estimate": round(estimates[metric]["estimate"] * population, 1),
+            "ci": [round(bound * population, 1) for bound in estimates[metric]["ci"]],
+        }
+        for name, metric in (("total_comments", "comments_per_file"), ("redundant_comments", "redundant_per_file"))
+        if estimates[metric]["estimate"] is not None
+    }
+
+    report = {
+        "mode": "sample",
+        "confidence": confidence,
+        "precision": precision,
+        "time_budget": time_budget,
+        "seed": seed,
+        "population": {"files": len(sources), "eligible_files": round(population, 1), "strata": len(strata)},
+        "sample": {
+            "files": taken,
+            "analysed": len(results),
+            "fraction": round(taken / len(sources), 4) if sources else 0,
+            "elapsed": round(elapsed, 3),
+            "stopped": stopped,
+        },
+        "metrics": estimates,
+        "totals": totals,
+        "strata": [
+            {
+                "language": s.key[0], "directory": s.key[1], "size": s.key[2],
+                "files": len(s.files), "sampled": s.taken,
+            }
+            for s in strata
+        ],
+    }
+
+    timer.flush()
+    return results, report
@@ -0,0 +1,290 @@
+import json
+import os
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from app.services.aggregates import RepoSummary
+from app.services.analysis_service import ANALYSER_VERSION, analyze_files
+from app.services.walker import SourceFile, walk_source_files
+from app.utils.result_codec import decode_result, encode_result
+
+LEASE_SECONDS = 60
+MAX_ATTEMPTS = 3
+POLL_SECONDS = 0.5
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS shard_jobs (
+    id TEXT PRIMARY KEY,
+    root TEXT NOT NULL,
+    analyser_version TEXT NOT NULL,
+    shard_count INTEGER NOT NULL,
+    created_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS shards (
+    job_id TEXT NOT NULL REFERENCES shard_jobs(id),
+    shard_no INTEGER NOT NULL,
+    files TEXT NOT NULL,
+    status TEXT NOT NULL DEFAULT 'pending',
+    owner TEXT,
+    lease_expires REAL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    error TEXT,
+    result BLOB,
+    summary TEXT,
+    PRIMARY KEY (job_id, shard_no)
+);
+CREATE INDEX IF NOT EXISTS ix_shards_status ON shards (status, lease_expires);
+"""
+
+
+def split_shards(sources: List[SourceFile], shard_count: int) -> List[List[SourceFile]]:
+    """
+    Contiguous runs of the walk order with roughly equal bytes each, so
+    concatenating shard results in order reproduces a single-node run.
+    """
+
+    shard_count = max(1, min(shard_count, len(sources)))
+    target = sum(s.size for s in sources) / shard_count
+
+    shards: List[List[SourceFile]] = [[]]
+    size = 0
+    for source in sources:
+        if size >= target * len(shards) and len(shards) < shard_count:
+            shards.append([])
+        shards[-1].append(source)
+        size += source.size
+    return [shard for shard in shards if shard]
+
+
+class ShardQueue:
+    """
+    Work queue for sharded analyses, kept in a SQLite file that the
+    coordinator and every worker open. Single host only: SQLite's locking
+    (and the WAL's shared-memory index) is not reliable over NFS or other
+    network filesystems, so all processes must run on the machine that
+    holds the file. Spreading shards over several machines needs a queue
+    on a real database server instead.
+
+    Workers lease one shard at a time and renew the lease while working.
+    A shard whose lease expires (crashed or stalled worker) or whose
+    worker reports an error goes back to pending, up to MAX_ATTEMPTS.
+    """
+
+    def __init__(self, path: str, lease_seconds: float = LEASE_SECONDS):
+        self.path = path
+        self.lease_seconds = lease_seconds
+        with self._connect() as conn:
+            conn.executescript(SCHEMA)
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        # Autocommit; multi-statement changes use BEGIN IMMEDIATE so
+        # concurrent claimers serialise on the write lock. WAL lets
+        # readers run alongside the writer, through shared memory that
+        # only processes on the same host can see.
+        conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        try:
+            conn.execute("PRAGMA journal_mode=WAL")
+            yield conn
+        finally:
+            conn.close()
+
+    def submit(self, root: str, shards: List[List[SourceFile]]) -> str:
+        job_id = uuid.uuid4().hex
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            conn.execute(
+                "INSERT INTO shard_jobs VALUES (?, ?, ?, ?, ?)",
+                (job_id, root, ANALYSER_VERSION, len(shards), time.time()),
+            )
+            conn.executemany(
+                "INSERT INTO shards (job_id, shard_no, files) VALUES (?, ?, ?)",
+                [
+                    (job_id, n, json.dumps([[s.rel_path, s.size] for s in shard]))
+                    for n, shard in enumerate(shards)
+                ],
+            )
+            conn.execute("COMMIT")
+        return job_id
+
+    def claim(self, owner: str) -> Optional[Tuple[str, int, str, List[SourceFile]]]:
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            conn.execute(
+                "UPDATE shards SET status = 'failed' "
+                "WHERE status = 'leased' AND lease_expires < ? AND attempts >= ?",
+                (now, MAX_ATTEMPTS),
+            )
+            row = conn.execute(
+                "SELECT s.job_id, s.shard_no, j.root, s.files FROM shards s "
+                "JOIN shard_jobs j ON j.id = s.job_id "
+                "WHERE s.status = 'pending' OR (s.status = 'leased' AND s.lease_expires < ?) "
+                "ORDER BY j.created_at, s.shard_no LIMIT 1",
+                (now,),
+            ).fetchone()
+            if row is None:
+                conn.execute("COMMIT")
+                return None
+
+            job_id, shard_no, root, files = row
+            conn.execute(
+                "UPDATE shards SET status = 'leased', owner = ?, lease_expires = ?, "
+                "attempts = attempts + 1 WHERE job_id = ? AND shard_no = ?",
+                (owner, now + self.lease_seconds, job_id, shard_no),
+            )
+            conn.execute("COMMIT")
+
+        sources = [
+            SourceFile(os.path.join(root, *rel_path.split("/")), rel_path, size)
+            for rel_path, size in json.loads(files)
+        ]
+        return job_id, shard_no, root, sources
+
+    def renew(self, job_id: str, shard_no: int, owner: str) -> bool:
+        with self._connect() as conn:
+            cursor = conn.execute(
+                "UPDATE shards SET lease_expires = ? "
+                "WHERE job_id = ? AND shard_no = ? AND owner = ? AND status = 'leased'",
+                (time.time() + self.lease_seconds, job_id, shard_no, owner),
+            )
+            return cursor.rowcount == 1
+
+    def complete(self, job_id: str, shard_no: int, result: List[Dict[str, Any]], summary: RepoSummary):
+        # First finished attempt wins; a late duplicate from a worker whose
+        # lease expired is dropped.
+        with self._connect() as conn:
+            conn.execute(
+                "UPDATE shards SET status = 'done', result = ?, summary = ?, error = NULL "
+                "WHERE job_id = ? AND shard_no = ? AND status != 'done'",
+                (encode_result(result), json.dumps(summary.state()), job_id, shard_no),
+            )
+
+    def fail(self, job_id: str, shard_no: int, owner: str, error: str):
+        with self._connect() as conn:
+            conn.execute(
+                "UPDATE shards SET "
+                "status = CASE WHEN attempts >= ? THEN 'failed' ELSE 'pending' END, "
+                "owner = NULL, lease_expires = NULL, error = ? "
+                "WHERE job_id = ? AND shard_no = ? AND owner = ? AND status = 'leased'",
+                (MAX_ATTEMPTS, error, job_id, shard_no, owner),
+            )
+
+    def progress(self, job_id: str) -> Dict[str, int]:
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT status, COUNT(*) FROM shards WHERE job_id = ? GROUP BY status",
+                (job_id,),
+            ).fetchall()
+        return dict(rows)
+
+    def idle(self) -> bool:
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT 1 FROM shards WHERE status IN ('pending', 'leased') LIMIT 1"
+            ).fetchone()
+        return row is None
+
+    def errors(self, job_id: str) -> List[Tuple[int, str]]:
+        with self._connect() as conn:
+            return conn.execute(
+                "SELECT shard_no, error FROM shards WHERE job_id = ? AND status = 'failed' "
+                "ORDER BY shard_no",
+                (job_id,),
+            ).fetchall()
+
+    def collect(self, job_id: str) -> Tuple[List[Dict[str, Any]], RepoSummary]:
+        """Concatenates shard results in shard order and merges their summaries."""
+
+        results: List[Dict[str, Any]] = []
+        summary = RepoSummary()
+
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT result, summary FROM shards WHERE job_id = ? AND status = 'done' "
+                "ORDER BY shard_no",
+                (job_id,),
+            )
+            for result, state in rows:
+                results.extend(decode_result(result))
+                summary.merge(RepoSummary.from_state(json.loads(state)))
+
+        return results, summary
+
+
+def worker_id() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:6]}"
+
+
+def _keep_leased(queue: ShardQueue, job_id: str, shard_no: int, owner: str, stop: threading.Event):
+    while not stop.wait(queue.lease_seconds / 3):
+        if not queue.renew(job_id, shard_no, owner):
+            return
+
+
+def run_worker(
+    queue: ShardQueue,
+    exit_when_idle: bool = False,
+    io_workers: Optional[int] = None,
+    owner: Optional[str] = None,
+) -> int:
+    """
+    Processes shards until the queue is drained (with `exit_when_idle`)
+    or forever. Returns the number of shards completed.
+    """
+
+    owner = owner or worker_id()
+    completed = 0
+
+    while True:
+        claimed = queue.claim(owner)
+        if claimed is None:
+            # Leased shards may still come back if their worker dies, so
+            # only leave once nothing is pending or leased.
+            if exit_when_idle and queue.idle():
+                return completed
+            time.sleep(POLL_SECONDS)
+            continue
+
+        job_id, shard_no, _, sources = claimed
+        stop = threading.Event()
+        heartbeat = threading.Thread(
+            target=_keep_leased,
+            args=(queue, job_id, shard_no, owner, stop),
+            daemon=True,
+        )
+        heartbeat.start()
+
+        try:
+            summary = RepoSummary()
+            result = analyze_files(sources, summary, io_workers)
+        except Exception as e:
+            queue.fail(job_id, shard_no, owner, f"{type(e).__name__}: {e}")
+            continue
+        finally:
+            stop.set()
+            heartbeat.join()
+
+        queue.complete(job_id, shard_no, result, summary)
+        completed += 1
+
+
+def submit_codebase(queue: ShardQueue, root: str, shard_count: int) -> str:
+    root = os.path.abspath(root)
+    return queue.submit(root, split_shards(list(walk_source_files(root)), shard_count))
+
+
+def wait_for(queue: ShardQueue, job_id: str, poll: float = POLL_SECONDS) -> Iterator[Dict[str, int]]:
+    """Yields progress snapshots until no shard is pending or leased."""
+
+    while True:
+        progress = queue.progress(job_id)
+        yield progress
+        if not progress.get("pending") and not progress.get("leased"):
+            return
+        time.sleep(poll)
@@ -0,0 +1,310 @@
+import hashlib
+import os
+import re
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from fnmatch import translate
+from typing import Iterable, Iterator, List, NamedTuple, Optional, Tuple
+
+import pathspec
+
+from app.core.config import settings
+
+# Version control and tool caches, never sources. Dependency and build
+# output directories are ANALYSIS_EXCLUDE defaults instead, so a
+# repository keeping first-party code under such a name can override them.
+EXCLUDED_DIRS = {
+    ".git", ".hg", ".svn", "__pycache__", ".tox", ".nox", ".eggs",
+    ".mypy_cache", ".pytest_cache", ".ruff_cache", ".gradle",
+}
+
+GENERATED_MARKERS = (
+    b"@generated",
+    b"do not edit",
+    b"auto-generated",
+    b"autogenerated",
+    b"generated by the protocol buffer compiler",
+)
+
+GENERATED_SUFFIXES = ("_pb2.py", "_pb2_grpc.py")
+
+SNIFF_BYTES = 8192
+MINIFIED_LINE_LENGTH = 1000
+BANNER_LINES = 5
+READ_BATCH_FILES = 64
+READ_BATCH_BYTES = 4 * 1024 * 1024
+
+
+class SourceFile(NamedTuple):
+    path: str
+    rel_path: str
+    size: int
+
+
+def _split_globs(value: str) -> List[str]:
+    return [g.strip() for g in value.split(",") if g.strip()]
+
+
+def _load_ignore(ignore_file: str) -> Optional[pathspec.PathSpec]:
+    try:
+        with open(ignore_file, "r", errors="ignore") as f:
+            lines = f.read().splitlines()
+    except OSError:
+        return None
+
+    return pathspec.GitIgnoreSpec.from_lines(lines) if lines else None
+
+
+def _ignored(specs: List[Tuple[str, pathspec.PathSpec]], rel_path: str, is_dir: bool) -> bool:
+    # As in git, specs apply from the root down and the last matching
+    # pattern decides, so a deeper `!pattern` re-includes a file.
+    ignored = False
+    for base, spec in specs:
+        relative = rel_path[len(base):] if base else rel_path
+        include = spec.check_file(relative + "/" if is_dir else relative).include
+        if include is not None:
+            ignored = include
+    return ignored
+
+
+def walk_source_files(
+    root: str,
+    include: Optional[Iterable[str]] = None,
+    exclude: Optional[Iterable[str]] = None,
+    max_bytes: Optional[int] = None,
+) -> Iterator[SourceFile]:
+    """
+    Discovers source files under `root` using os.scandir.
+    Honours nested .gitignore files, .git/info/exclude, EXCLUDED_DIRS,
+    include globs (matched against the file name) and gitignore-style
+    exclude patterns (ANALYSIS_EXCLUDE unless given), and skips files larger than `max_bytes` (by
+    default the streaming limit, when that is the larger one).
+    """
+
+    include = list(include or _split_globs(settings.ANALYSIS_INCLUDE))
+    included = re.compile("|".join(translate(pattern) for pattern in include)).match
+    exclude = _split_globs(settings.ANALYSIS_EXCLUDE) if exclude is None else list(exclude)
+    max_bytes = max_bytes or max(settings.MAX_ANALYSIS_FILE_BYTES, settings.STREAMING_MAX_FILE_BYTES)
+
+    # Exclude patterns always apply; no .gitignore negation overrides them.
+    excluded = pathspec.GitIgnoreSpec.from_lines(exclude) if exclude else None
+
+    specs: List[Tuple[str, pathspec.PathSpec]] = []
+    info_exclude = _load_ignore(os.path.join(root, ".git", "info", "exclude"))
+    if info_exclude:
+        specs.append(("", info_exclude))
+
+    stack = [(root, "", specs)]
+
+    while stack:
+        directory, rel_dir, inherited = stack.pop()
+
+        try:
+            with os.scandir(directory) as it:
+                entries = list(it)
+        except OSError:
+            continue
+
+        active = inherited
+        if any(entry.name == ".gitignore" for entry in entries):
+            local = _load_ignore(os.path.join(directory, ".gitignore"))
+            if local:
+                active = inherited + [(rel_dir, local)]
+
+        subdirs = []
+
+        for entry in entries:
+            rel_path = rel_dir + entry.name
+
+            try:
+                if entry.is_dir(follow_symlinks=False):
+                    if entry.name in EXCLUDED_DIRS:
+                        continue
+                    if excluded and excluded.match_file(rel_path + "/"):
+                        continue
+                    if not active or not _ignored(active, rel_path, True):
+                        subdirs.append((entry.path, rel_path + "/", active))
+                    continue
+
+                if not entry.is_file(follow_symlinks=False):
+                    continue
+
+                if not included(entry.name) or (excluded and excluded.match_file(rel_path)):
+                    continue
+                if active and _ignored(active, rel_path, False):
+                    continue
+
+                size = entry.stat(follow_symlinks=False).st_size
+            except OSError:
+                continue
+
+            if size > max_bytes or entry.name.endswith(GENERATED_SUFFIXES):
+                continue
+
+            yield SourceFile(entry.path, rel_path, size)
+
+        stack.extend(subdirs)
+
+
+def looks_generated(head: bytes) -> bool:
+    """
+    Cheap sniffing on the first few KB of a file: NUL bytes mean
+    binary, and a generator banner in the first few lines or a very
+    long first line mean generated or minified output that is not worth
+    analysing.
+    """
+
+    if b"\0" in head:
+        return True
+
+    banner = b"\n".join(head.split(b"\n", BANNER_LINES)[:BANNER_LINES]).lower()
+    if any(marker in banner for marker in GENERATED_MARKERS):
+        return True
+
+    newline = head.find(b"\n")
+    first_line = len(head) if newline == -1 else newline
+    return first_line > MINIFIED_LINE_LENGTH
+
+
+def blob_sha(data: bytes) -> str:
+    """Git blob id of `data`, so results can be matched against git trees."""
+    digest = hashlib.sha1(b"blob %d\0" % len(data))
+    digest.update(data)
+    return digest.hexdigest()
+
+
+def decode_source(data: bytes) -> Optional[str]:
+    """Source text with normalised newlines; None for binary/generated content."""
+
+    if looks_generated(data[:SNIFF_BYTES]):
+        return None
+
+    code = data.decode("utf-8", errors="ignore")
+    if "\r" in code:
+        code = code.replace("\r\n", "\n").replace("\r", "\n")
+    return code
+
+
+def read_source(source: SourceFile) -> Optional[Tuple[str, str]]:
+    try:
+        fd = os.open(source.path, os.O_RDONLY)
+    except OSError:
+        return None
+
+    try:
+        chunks = []
+        remaining = source.size + 1
+        while True:
+            chunk = os.read(fd, max(remaining, SNIFF_BYTES))
+            if not chunk:
+                break
+            chunks.append(chunk)
+            remaining -= len(chunk)
+    except OSError:
+        return None
+    finally:
+        os.close(fd)
+
+    data = chunks[0] if len(chunks) == 1 else b"".join(chunks)
+    code = decode_source(data)
+    return None if code is None else (code, blob_sha(data))
+
+
+class HashingReader:
+    """
+    Binary file reader that computes the git blob id of what it reads,
+    so a file streamed through a parser needs no second pass.
+    """
+
+    def __init__(self, f, size: int):
+        self._file = f
+        self._digest = hashlib.sha1(b"blob %d\0" % size)
+
+    def read(self, size: int = -1) -> bytes:
+        data = self._file.read(size)
+        self._digest.update(data)
+        return data
+
+    def readline(self) -> bytes:
+        line = self._file.readline()
+        self._digest.update(line)
+        return line
+
+    def hexdigest(self) -> str:
+        """Blob id of the whole file; reads whatever the parser left."""
+        while self.read(READ_BATCH_BYTES):
+            pass
+        return self._digest.hexdigest()
+
+
+@contextmanager
+def stream_source(source: SourceFile) -> Iterator[Optional[HashingReader]]:
+    """
+    Opens a file too large to read whole. Yields None for unreadable,
+    binary and generated files, like `read_source`.
+    """
+
+    try:
+        f = open(source.path, "rb")
+    except OSError:
+        yield None
+        return
+
+    with f:
+        if looks_generated(f.read(SNIFF_BYTES)):
+            yield None
+            return
+        f.seek(0)
+        yield HashingReader(f, os.fstat(f.fileno()).st_size)
+
+
+def _read_batch(batch: List[SourceFile]) -> List[Tuple[SourceFile, Optional[Tuple[str, str]]]]:
+    limit = settings.MAX_ANALYSIS_FILE_BYTES
+    # Oversized files are left for the caller to stream.
+    return [(source, read_source(source) if source.size <= limit else (None, None)) for source in batch]
+
+
+def _batches(sources: Iterable[SourceFile]) -> Iterator[List[SourceFile]]:
+    batch, size = [], 0
+    for source in sources:
+        batch.append(source)
+        size += source.size
+        if len(batch) >= READ_BATCH_FILES or size >= READ_BATCH_BYTES:
+            yield batch
+            batch, size = [], 0
+    if batch:
+        yield batch
+
+
+def read_sources(
+    sources: Iterable[SourceFile],
+    workers: Optional[int] = None,
+) -> Iterator[Tuple[SourceFile, Optional[str], Optional[str]]]:
+    """
+    Reads files on a thread pool in batches (to amortise hand-off cost
+    for small files), keeping a bounded window of batches in flight so
+    memory stays proportional to the window, not the repo.
+    Yields (source, code, blob sha) in discovery order; unreadable,
+    binary and generated files are dropped. Files over
+    MAX_ANALYSIS_FILE_BYTES are not read: they come back as
+    (source, None, None), to be opened with `stream_source`.
+    """
+
+    workers = workers or settings.ANALYSIS_IO_WORKERS
+    window = workers * 2
+    pending = deque()
+
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="greencode-read") as pool:
+        for batch in _batches(sources):
+            pending.append(pool.submit(_read_batch, batch))
+
+            if len(pending) >= window:
+                for source, read in pending.popleft().result():
+                    if read is not None:
+                        yield (source, *read)
+
+        while pending:
+            for source, read in pending.popleft().result():
+                if read is not None:
+                    yield (source, *read)
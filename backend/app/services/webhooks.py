@@ -0,0 +1,177 @@
+import hashlib
+import hmac
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Hashable, Optional, Set, Tuple
+
+from git import Repo
+
+from app.core.metrics import QUEUE_DEPTH
+
+logger = logging.getLogger(__name__)
+
+ZERO_SHA = "0" * 40
+# GitHub lists at most this many commits in a push payload.
+PAYLOAD_MAX_COMMITS = 20
+
+
+def sign(secret: str, body: bytes) -> str:
+    """X-Hub-Signature-256 value for `body`."""
+    return "sha256=" + hmac.new(secret.encode(), body, hashlib.sha256).hexdigest()
+
+
+def verify_signature(secret: str, body: bytes, signature: Optional[str]) -> bool:
+    return bool(signature) and hmac.compare_digest(sign(secret, body), signature)
+
+
+def push_target(payload: Dict[str, Any]) -> Optional[Tuple[str, str]]:
+    """
+    (branch, pushed commit) of a push payload; None for payloads that
+    do not push a commit (branch deletions, tags).
+    """
+
+    ref = payload.get("ref") or ""
+    after = payload.get("after") or ZERO_SHA
+
+    if not ref.startswith("refs/heads/") or payload.get("deleted") or after == ZERO_SHA:
+        return None
+    return ref[len("refs/heads/"):], after
+
+
+def push_payload(repo_path: str, repo_url: str, ref: Optional[str] = None, before: Optional[str] = None) -> Dict[str, Any]:
+    """
+    GitHub-style push payload for the current HEAD of a local repository,
+    as if `repo_url` had just been pushed; stands in for GitHub when
+    testing the webhook locally.
+    """
+
+    repo = Repo(repo_path)
+    head = repo.head.commit
+    branch = ref[len("refs/heads/"):] if ref else repo.active_branch.name
+    if before is None:
+        before = head.parents[0].hexsha if head.parents else ZERO_SHA
+
+    pushed = repo.iter_commits(
+        head.hexsha if before == ZERO_SHA else f"{before}..{head.hexsha}",
+        max_count=PAYLOAD_MAX_COMMITS,
+    )
+    commits = []
+    for commit in reversed(list(pushed)):
+        changes: Dict[str, list] = {"added": [], "modified": [], "removed": []}
+        if commit.parents:
+            for diff in commit.parents[0].diff(commit):
+                if diff.new_file:
+                    changes["added"].append(diff.b_path)
+                elif diff.deleted_file:
+                    changes["removed"].append(diff.a_path)
+                else:
+                    changes["modified"].append(diff.b_path)
+        else:
+            changes["added"] = [item.path for item in commit.tree.traverse() if item.type == "blob"]
+        commits.append({
+            "id": commit.hexsha,
+            "message": commit.message,
+            "timestamp": commit.committed_datetime.isoformat(),
+            "author": {"name": commit.author.name, "email": commit.author.email},
+            **changes,
+        })
+
+    base = repo_url.rstrip("/").removesuffix(".git")
+    owner, name = base.rsplit("/", 2)[-2:]
+    return {
+        "ref": f"refs/heads/{branch}",
+        "before": before,
+        "after": head.hexsha,
+        "created": before == ZERO_SHA,
+        "deleted": False,
+        "forced": False,
+        "commits": commits,
+        "head_commit": commits[-1] if commits else None,
+        "repository": {
+            "name": name,
+            "full_name": f"{owner}/{name}",
+            "html_url": base,
+            "clone_url": base + ".git",
+            "default_branch": branch,
+        },
+    }
+
+
+class _Burst:
+    __slots__ = ("value", "due", "deadline")
+
+    def __init__(self, value: Any, due: float, deadline: float):
+        self.value = value
+        self.due = due
+        self.deadline = deadline
+
+
+class PushDebouncer:
+    """
+    Coalesces bursts of events per key: a key is handled once it has
+    been quiet for `quiet` seconds, and no later than `max_delay` after
+    the burst's first event, with the latest value only. Events arriving
+    while their key is being handled start a new burst that runs after it.
+    """
+
+    def __init__(self, handler: Callable[[Hashable, Any], None], quiet: float, max_delay: float, workers: int):
+        self._handler = handler
+        self._quiet = quiet
+        self._max_delay = max(max_delay, quiet)
+        self._cond = threading.Condition()
+        self._bursts: Dict[Hashable, _Burst] = {}
+        self._running: Set[Hashable] = set()
+        self._stopped = False
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="greencode-push")
+        self._thread = threading.Thread(target=self._schedule, name="greencode-push-debounce", daemon=True)
+        self._thread.start()
+
+    def submit(self, key: Hashable, value: Any):
+        now = time.monotonic()
+        with self._cond:
+            burst = self._bursts.get(key)
+            if burst is None:
+                self._bursts[key] = _Burst(value, now + self._quiet, now + self._max_delay)
+            else:
+                burst.value = value
+                burst.due = min(now + self._quiet, burst.deadline)
+            QUEUE_DEPTH.labels("webhook_pushes").set(len(self._bursts))
+            self._cond.notify()
+
+    def _schedule(self):
+        with self._cond:
+            while not self._stopped:
+                now = time.monotonic()
+                waiting = [key for key in self._bursts if key not in self._running]
+
+                for key in waiting:
+                    if self._bursts[key].due <= now:
+                        burst = self._bursts.pop(key)
+                        self._running.add(key)
+                        self._executor.submit(self._run, key, burst.value)
+                QUEUE_DEPTH.labels("webhook_pushes").set(len(self._bursts))
+
+                due = [b.due for key, b in self._bursts.items() if key not in self._running]
+                self._cond.wait(max(min(due) - now, 0) if due else None)
+
+    def _run(self, key: Hashable, value: Any):
+        try:
+            self._handler(key, value)
+        except Exception:
+            logger.exception("push handler failed for %s", key)
+        finally:
+            with self._cond:
+                self._running.discard(key)
+                self._cond.notify()
+
+    def stop(self):
+        """Drops bursts not yet started and waits for running handlers."""
+
+        with self._cond:
+            self._stopped = True
+            self._bursts.clear()
+            self._cond.notify()
+        self._thread.join()
+        self._executor.shutdown(wait=True, cancel_futures=True)
@@ -0,0 +1,192 @@
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor, wait
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.analysers.records import FileAnalysis
+from app.core.config import settings
+from app.core.tracing import StageTimer
+from app.services.aggregates import RepoSummary
+from app.services.analysis_service import analyze_codebase, analyze_source, score_consistency
+from app.services.sampling import sample_codebase
+
+# Imported once by the forkserver; every worker forked from it shares
+# these modules' memory copy-on-write instead of importing them again.
+PRELOAD = [
+    "numpy",
+    "scipy.sparse",
+    "javalang",
+    "pathspec",
+    "app.services.worker_pool",
+]
+
+WARM_PYTHON = '''"""Warm-up module."""
+
+
+class Cache:
+    """Keeps loaded items."""
+
+    def get_item(self, key, default=None):
+        """
+        Returns the item for `key`.
+
+        Args:
+            key: item key.
+            default: value when missing.
+        """
+        # look the key up
+        return self.items.get(key, default)  # return item
+'''
+
+WARM_JAVA = '''/** Warm-up class. */
+public class Warm {
+    /**
+     * Returns the item for a key.
+     * @param key item key
+     */
+    public String getItem(String key) {
+        // look the key up
+        return key;
+    }
+}
+'''
+
+
+def warm_up():
+    """
+    Runs one tiny Python and Java analysis end to end, so parser set-up,
+    regex compilation and the scoring path are paid before the first
+    real job rather than during it.
+    """
+
+    entries = [
+        analyze_source("warm.py", WARM_PYTHON, ""),
+        analyze_source("Warm.java", WARM_JAVA, ""),
+    ]
+    score_consistency([entry for entry in entries if entry is not None])
+
+
+class _HeldTimer(StageTimer):
+    """Keeps stage totals so the parent process can report them."""
+
+    __slots__ = ()
+
+    def flush(self):
+        pass
+
+
+def _analyze_job(
+    path: str,
+    io_workers: Optional[int],
+    previous: Optional[Dict[str, Dict[str, Any]]],
+) -> Tuple[List[FileAnalysis], RepoSummary, Dict[str, float]]:
+    timer = _HeldTimer()
+    summary = RepoSummary()
+    results = analyze_codebase(path, summary, io_workers, timer, previous)
+    return results, summary, timer.totals
+
+
+def _sample_job(path: str, options: Dict[str, Any]) -> Tuple[List[FileAnalysis], Dict[str, Any], Dict[str, float]]:
+    timer = _HeldTimer()
+    results, report = sample_codebase(path, timer=timer, **options)
+    return results, report, timer.totals
+
+
+class AnalysisPool:
+    """
+    Long-lived analysis worker processes. With the default forkserver
+    start method the analyser stack is imported once in the server and
+    each worker is forked from it already loaded; each worker then
+    warms up before taking jobs and is replaced after `max_jobs` jobs
+    to contain memory growth.
+    """
+
+    def __init__(self, workers: int, max_jobs: int, start_method: str = "forkserver"):
+        context = multiprocessing.get_context(start_method)
+        if start_method == "forkserver":
+            context.set_forkserver_preload(PRELOAD)
+
+        self.workers = workers
+        self._executor = ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=context,
+            initializer=warm_up,
+            max_tasks_per_child=max_jobs,
+        )
+
+    def start(self):
+        """Starts and warms every worker now instead of on first use."""
+
+        wait([self._executor.submit(os.getpid) for _ in range(self.workers)])
+
+    def analyze(
+        self,
+        path: str,
+        io_workers: Optional[int] = None,
+        previous: Optional[Dict[str, Dict[str, Any]]] = None,
+    ) -> Tuple[List[FileAnalysis], RepoSummary]:
+        results, summary, totals = self._executor.submit(_analyze_job, path, io_workers, previous).result()
+        _flush_totals(totals)
+        return results, summary
+
+    def sample(self, path: str, **options) -> Tuple[List[FileAnalysis], Dict[str, Any]]:
+        results, report, totals = self._executor.submit(_sample_job, path, options).result()
+        _flush_totals(totals)
+        return results, report
+
+    def shutdown(self):
+        self._executor.shutdown(wait=True, cancel_futures=True)
+
+
+def _flush_totals(totals: Dict[str, float]):
+    # Stage timings are observed in this process, where metrics are
+    # exported and the request's trace lives.
+    timer = StageTimer()
+    timer.totals = totals
+    timer.flush()
+
+
+_pool: Optional[AnalysisPool] = None
+
+
+def start_pool():
+    global _pool
+    if settings.ANALYSIS_WORKERS > 0 and _pool is None:
+        _pool = AnalysisPool(
+            settings.ANALYSIS_WORKERS,
+            settings.ANALYSIS_WORKER_MAX_JOBS,
+            settings.ANALYSIS_WORKER_START_METHOD,
+        )
+        _pool.start()
+
+
+def stop_pool():
+    global _pool
+    if _pool is not None:
+        _pool.shutdown()
+        _pool = None
+
+
+def run_analysis(
+    path: str,
+    previous: Optional[Dict[str, Dict[str, Any]]] = None,
+) -> Tuple[List[FileAnalysis], RepoSummary]:
+    """
+    Analyses a checked-out tree on the worker tier when it is running,
+    otherwise in the calling thread. `previous` is passed on to
+    `analyze_files`.
+    """
+
+    if _pool is not None:
+        return _pool.analyze(path, previous=previous)
+
+    summary = RepoSummary()
+    return analyze_codebase(path, summary, previous=previous), summary
+
+
+def run_sample(path: str, **options) -> Tuple[List[FileAnalysis], Dict[str, Any]]:
+    """`sample_codebase` on the worker tier when it is running."""
+
+    if _pool is not None:
+        return _pool.sample(path, **options)
+    return sample_codebase(path, **options)
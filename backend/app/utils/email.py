@@ -1,6 +1,17 @@
 import os
 import smtplib
 from email.message import EmailMessage
+from app.core.config import settings
+from app.core.tracing import span
+
+
+def _send(msg: EmailMessage, smtp_email: str, smtp_password: str):
+    smtp = smtplib.SMTP_SSL if settings.SMTP_SSL else smtplib.SMTP
+
+    with span("smtp"), smtp(settings.SMTP_HOST, settings.SMTP_PORT) as server:
+        if smtp_password:
+            server.login(smtp_email, smtp_password)
+        server.send_message(msg)
 
 def send_otp_email(to_email: str, otp: str):
     smtp_email = os.getenv("SMTP_EMAIL")
@@ -122,9 +133,7 @@ If you did not request this, please ignore this email.
         subtype="html",
     )
 
-    with smtplib.SMTP_SSL("smtp.gmail.com", 465) as server:
-        server.login(smtp_email, smtp_password)
-        server.send_message(msg)
+    _send(msg, smtp_email, smtp_password)
 
 
 def send_contact_email(name: str, email: str, message: str):
@@ -229,6 +238,4 @@ Message:
         subtype="html",
     )
 
-    with smtplib.SMTP_SSL("smtp.gmail.com", 465) as server:
-        server.login(smtp_email, smtp_password)
-        server.send_message(msg)
+    _send(msg, smtp_email, smtp_password)
@@ -0,0 +1,80 @@
+"""
+Compact binary encoding for stored analysis results.
+
+Layout: MAGIC + zstd(msgpack(string_table) + msgpack(tree)), where long
+string values (comment texts, mostly inside redundant-comment pairs) are
+replaced by a reference into the string table so each text is stored and
+decoded once. Short strings and keys are left inline: zstd already
+removes their repetition and ext-type lookups would only slow decoding.
+"""
+
+import msgpack
+import zstandard
+
+MAGIC = b"GCR1"
+STRING_REF = 1
+ZSTD_LEVEL = 9
+INTERN_MIN_LENGTH = 64
+
+def _intern(obj, table: list, index: dict):
+    if isinstance(obj, str):
+        if len(obj) < INTERN_MIN_LENGTH:
+            return obj
+        ref = index.get(obj)
+        if ref is None:
+            ref = index[obj] = len(table)
+            table.append(obj)
+        return msgpack.ExtType(STRING_REF, ref.to_bytes(4, "little"))
+
+    if isinstance(obj, dict):
+        return {key: _intern(value, table, index) for key, value in obj.items()}
+
+    if isinstance(obj, (list, tuple)):
+        return [_intern(item, table, index) for item in obj]
+
+    return obj
+
+
+def encode_result(result) -> bytes:
+    table: list = []
+    index: dict = {}
+    packer = msgpack.Packer(use_bin_type=True)
+
+    if isinstance(result, list):
+        # Entries (dicts or records with `to_dict`) are converted and
+        # packed one at a time, so a list of records never exists as one
+        # full tree of dicts.
+        chunks = [packer.pack_array_header(len(result))]
+        for entry in result:
+            if hasattr(entry, "to_dict"):
+                entry = entry.to_dict()
+            chunks.append(packer.pack(_intern(entry, table, index)))
+        tree = b"".join(chunks)
+    else:
+        tree = packer.pack(_intern(result, table, index))
+
+    payload = packer.pack(table) + tree
+    # zstd contexts are not thread-safe, so each call gets its own.
+    return MAGIC + zstandard.ZstdCompressor(level=ZSTD_LEVEL).compress(payload)
+
+
+def decode_result(blob: bytes):
+    if not blob.startswith(MAGIC):
+        raise ValueError("Unknown result encoding")
+
+    table: list = []
+
+    def ext_hook(code: int, data: bytes):
+        if code == STRING_REF:
+            return table[int.from_bytes(data, "little")]
+        return msgpack.ExtType(code, data)
+
+    unpacker = msgpack.Unpacker(
+        ext_hook=ext_hook,
+        raw=False,
+        max_buffer_size=0,
+    )
+    unpacker.feed(zstandard.ZstdDecompressor().decompress(bytes(blob[len(MAGIC):])))
+
+    table.extend(unpacker.unpack())
+    return unpacker.unpack()
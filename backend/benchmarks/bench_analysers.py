@@ -0,0 +1,121 @@
+"""
+Per-file cost of redundant-comment detection: the previous per-file
+TfidfVectorizer fit + dense cosine_similarity + Python pair loop versus
+`duplicate_pairs`, over a realistic (long-tailed) distribution of comment
+counts per file.
+
+Every file's pairs are checked for parity before anything is timed.
+
+Usage (from the backend directory):
+    python -m benchmarks.bench_analysers [--files 2000] [--seed 7]
+"""
+
+import argparse
+import random
+import time
+from collections import defaultdict
+
+from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.metrics.pairwise import cosine_similarity
+
+from app.analysers.similarity import SIMILARITY_THRESHOLD, duplicate_pairs, normalize
+
+BUCKETS = ((0, 1), (2, 8), (9, 24), (25, 100), (101, 10**9))
+
+WORDS = (
+    "return value index cache user request parse token buffer update check "
+    "list item config default path file error handle retry open close read "
+    "write count total result state node tree the a of to for this is"
+).split()
+
+
+def legacy_pairs(texts):
+    pairs = []
+    if len(texts) > 1:
+        tfidf = TfidfVectorizer().fit_transform(texts)
+        sim = cosine_similarity(tfidf)
+        for i in range(len(sim)):
+            for j in range(i + 1, len(sim)):
+                if sim[i][j] > SIMILARITY_THRESHOLD:
+                    pairs.append((i, j))
+    return pairs
+
+
+def _comment(rng: random.Random) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(rng.randint(2, 12)))
+
+
+def generate_files(count: int, seed: int):
+    """
+    Comment counts per file are lognormal (median ~5, long tail into the
+    hundreds); ~15% of comments repeat or lightly edit an earlier one.
+    """
+
+    rng = random.Random(seed)
+    files = []
+    for _ in range(count):
+        n = min(int(rng.lognormvariate(1.6, 1.1)), 600)
+        comments = []
+        for _ in range(n):
+            if comments and rng.random() < 0.15:
+                base = rng.choice(comments)
+                comments.append(base if rng.random() < 0.5 else base + " " + rng.choice(WORDS))
+            else:
+                comments.append(_comment(rng))
+        files.append([normalize(c) for c in comments])
+    return files
+
+
+def _bucket(n: int):
+    for low, high in BUCKETS:
+        if low <= n <= high:
+            return low, high
+
+
+def _time(fn, files, repeat: int):
+    per_bucket = defaultdict(float)
+    for texts in files:
+        best = float("inf")
+        for _ in range(repeat):
+            start = time.perf_counter()
+            fn(texts)
+            best = min(best, time.perf_counter() - start)
+        per_bucket[_bucket(len(texts))] += best
+    return per_bucket
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark redundant-comment detection")
+    parser.add_argument("--files", type=int, default=2000)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    files = generate_files(args.files, args.seed)
+
+    for texts in files:
+        assert duplicate_pairs(texts) == legacy_pairs(texts), texts
+
+    legacy = _time(legacy_pairs, files, args.repeat)
+    current = _time(duplicate_pairs, files, args.repeat)
+    counts = defaultdict(int)
+    for texts in files:
+        counts[_bucket(len(texts))] += 1
+
+    print(f"{len(files)} files, pairs identical for all of them\n")
+    print(f"{'comments':>12} {'files':>7} {'legacy us/file':>15} {'new us/file':>12} {'speedup':>8}")
+    for bucket in BUCKETS:
+        if not counts[bucket]:
+            continue
+        label = f"{bucket[0]}-{bucket[1]}" if bucket[1] < 10**9 else f"{bucket[0]}+"
+        old = legacy[bucket] / counts[bucket] * 1e6
+        new = current[bucket] / counts[bucket] * 1e6
+        print(f"{label:>12} {counts[bucket]:>7} {old:>15.1f} {new:>12.1f} {old / max(new, 1e-9):>7.1f}x")
+
+    old_total, new_total = sum(legacy.values()), sum(current.values())
+    print(f"\n{'total':>12} {len(files):>7} {old_total * 1000:>13.1f}ms {new_total * 1000:>10.1f}ms"
+          f" {old_total / new_total:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
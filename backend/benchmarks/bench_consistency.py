@@ -0,0 +1,64 @@
+"""
+Docstring consistency scoring throughput: one vectorised batch over all
+functions versus scoring each function on its own, at increasing
+repository sizes.
+
+Usage (from the backend directory):
+    python -m benchmarks.bench_consistency [--sizes 1000,10000,100000]
+"""
+
+import argparse
+import random
+import time
+
+from app.analysers.consistency import score_functions
+from app.parsers.records import FunctionRecord
+
+WORDS = (
+    "user name id total price item config load parse header value cache request "
+    "token session file path buffer index record batch query result error retry"
+).split()
+
+PER_FUNCTION_LIMIT = 10_000
+
+
+def generate_functions(count: int, seed: int = 7):
+    rng = random.Random(seed)
+    functions = []
+    for _ in range(count):
+        name = "_".join(rng.sample(WORDS, rng.randint(1, 3)))
+        params = tuple(rng.sample(WORDS, rng.randint(0, 3)))
+        doc = None
+        if rng.random() < 0.7:
+            doc = " ".join(rng.choices(WORDS + ["the", "a", "of", "returns"], k=rng.randint(2, 20))).capitalize() + "."
+            if params and rng.random() < 0.4:
+                doc += "\n\nArgs:\n" + "\n".join(f"    {p}: the {p}." for p in params)
+        functions.append(FunctionRecord(name, 1, 2, doc, params))
+    return functions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark docstring consistency scoring")
+    parser.add_argument("--sizes", default="1000,10000,100000")
+    args = parser.parse_args()
+
+    print(f"{'functions':>10} {'batch s':>9} {'us/function':>12} {'per-function s':>15} {'speedup':>8}")
+    for size in (int(s) for s in args.sizes.split(",")):
+        functions = generate_functions(size)
+
+        start = time.perf_counter()
+        batch = score_functions(functions)
+        batch_s = time.perf_counter() - start
+
+        line = f"{size:>10} {batch_s:>9.2f} {batch_s / size * 1e6:>12.1f}"
+        if size <= PER_FUNCTION_LIMIT:
+            start = time.perf_counter()
+            single = [score_functions([f])[0] for f in functions]
+            single_s = time.perf_counter() - start
+            assert single == batch
+            line += f" {single_s:>15.2f} {single_s / batch_s:>7.1f}x"
+        print(line)
+
+
+if __name__ == "__main__":
+    main()
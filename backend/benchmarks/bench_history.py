@@ -0,0 +1,81 @@
+"""
+History trend analysis: walking commits with per-blob reuse versus
+checking out and re-analysing every commit, on a synthetic repository
+where each commit touches a few files.
+
+Usage (from the backend directory):
+    python -m benchmarks.bench_history [--files 300] [--commits 50] [--changes 3]
+"""
+
+import argparse
+import os
+import random
+import subprocess
+import tempfile
+import time
+
+from app.services.aggregates import RepoSummary
+from app.services.analysis_service import analyze_codebase
+from app.services.history import analyze_history
+from benchmarks.synthetic import RepoShape, generate_repo
+
+
+def git(root: str, *args: str) -> str:
+    return subprocess.run(["git", "-C", root, *args], check=True, capture_output=True, text=True).stdout
+
+
+def build_history(root: str, files: int, commits: int, changes: int):
+    generate_repo(root, RepoShape(files=files))
+    git(root, "init", "-q")
+    git(root, "config", "user.email", "bench@example.com")
+    git(root, "config", "user.name", "bench")
+    git(root, "add", "-A")
+    git(root, "commit", "-qm", "initial")
+
+    rng = random.Random(7)
+    paths = sorted(git(root, "ls-files", "*.py", "*.java").split())
+    for n in range(1, commits):
+        for path in rng.sample(paths, changes):
+            with open(os.path.join(root, path), "a") as f:
+                f.write(f"\n// revision {n}\n" if path.endswith(".java") else f"\n# revision {n}\n")
+        git(root, "commit", "-qam", f"change {n}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark history trend analysis")
+    parser.add_argument("--files", type=int, default=300)
+    parser.add_argument("--commits", type=int, default=50)
+    parser.add_argument("--changes", type=int, default=3, help="files touched per commit")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        root = os.path.join(tmp, "repo")
+        build_history(root, args.files, args.commits, args.changes)
+
+        start = time.perf_counter()
+        points, stats = analyze_history(root)
+        history_s = time.perf_counter() - start
+
+        start = time.perf_counter()
+        checkout = os.path.join(tmp, "checkout")
+        git(root, "worktree", "add", "-q", "--detach", checkout, points[0]["commit"])
+        naive = []
+        for point in points:
+            git(checkout, "checkout", "-q", "--detach", point["commit"])
+            summary = RepoSummary()
+            analyze_codebase(checkout, summary)
+            naive.append(summary.to_dict())
+        naive_s = time.perf_counter() - start
+
+    for point, expected in zip(points, naive):
+        assert point["total_comments"] == expected["total_comments"]
+        assert point["redundant_comments"] == expected["redundant_comments"]
+
+    print(f"{len(points)} commits, {args.files} files, {args.changes} changed per commit")
+    print(f"  blobs analysed:        {stats['analysed_blobs']}")
+    print(f"  history walk:          {history_s:8.2f}s")
+    print(f"  checkout + re-analyse: {naive_s:8.2f}s  ({naive_s / history_s:.1f}x slower)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""
+Streaming versus whole-file parsing of one very large source file.
+
+A Python and a Java file of the requested size are generated from
+synthetic modules. Each is parsed in a fresh process, either read whole
+and given to `parse_python`/`parse_java` or streamed from disk through
+the parsers in `app.parsers.streaming`, and the process's peak RSS
+above its post-import baseline is reported with the wall time. A full
+`analyze_streamed` run is timed too.
+
+Usage (from the backend directory):
+    python -m benchmarks.bench_large_files [--mb 50]
+"""
+
+import argparse
+import multiprocessing
+import os
+import resource
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from benchmarks.synthetic import RepoShape, iter_sources
+
+
+def generate(path: str, language: str, size: int) -> int:
+    """Concatenates synthetic modules of one language into `path`."""
+
+    shape = RepoShape(java_ratio=1.0 if language == "java" else 0.0, seed=99)
+    written = 0
+    with open(path, "w") as f:
+        if language == "java":
+            written += f.write("package bench;\n\n")
+        for _, source in iter_sources(shape):
+            if language == "java":
+                # One compilation unit: a single package line, many classes.
+                source = source.split("\n", 2)[2].replace("public class", "class", 1)
+            written += f.write(source)
+            if written >= size:
+                break
+    return written
+
+
+def _measure(mode: str, language: str, path: str):
+    from app.parsers.java import parse_java
+    from app.parsers.python import parse_python
+    from app.parsers.streaming import parse_java_stream, parse_python_stream
+    from app.services.analysis_service import analyze_streamed
+    from app.services.walker import SourceFile, read_source, stream_source
+
+    source = SourceFile(path, os.path.basename(path), os.path.getsize(path))
+    baseline = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+    start = time.perf_counter()
+
+    if mode == "whole":
+        code, _ = read_source(source)
+        parsed = parse_python(code) if language == "python" else parse_java(code)
+    elif mode == "stream":
+        with stream_source(source) as reader:
+            if language == "python":
+                parsed = parse_python_stream(reader.readline)
+            else:
+                parsed = parse_java_stream(reader.read)
+    else:
+        parsed = analyze_streamed(source)
+
+    elapsed = time.perf_counter() - start
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024 - baseline
+    functions = len(parsed.functions)
+    return elapsed, peak, functions
+
+
+def run(mode: str, language: str, path: str):
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=1, mp_context=context) as pool:
+        return pool.submit(_measure, mode, language, path).result()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare streaming and whole-file parsing of a large file")
+    parser.add_argument("--mb", type=int, default=50, help="size of each generated file")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="greencode-bench-large-") as root:
+        print(f"{'':>8} {'mode':>8} {'time':>9} {'peak RSS':>10} {'functions':>10}")
+        for language, suffix in (("python", "py"), ("java", "java")):
+            path = os.path.join(root, f"large.{suffix}")
+            generate(path, language, args.mb * 2**20)
+
+            for mode in ("whole", "stream", "analyse"):
+                elapsed, peak, functions = run(mode, language, path)
+                print(f"{language:>8} {mode:>8} {elapsed:>8.2f}s {peak / 2**20:>8.0f}MB {functions:>10}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,155 @@
+"""
+Memory benchmark for parse and analysis results: the compact slotted
+records the pipeline now keeps versus the nested dicts it used to keep
+(reconstructed here with the old shapes).
+
+Each measurement runs in a fresh process and reports the bytes retained
+by one representation for every file in the repository (tracemalloc,
+after garbage collection), plus peak RSS of a full `analyze_codebase`.
+
+Usage (from the backend directory):
+    python -m benchmarks.bench_memory [--files 5000] [/path/to/repo]
+"""
+
+import argparse
+import gc
+import multiprocessing
+import resource
+import tempfile
+import tracemalloc
+from concurrent.futures import ProcessPoolExecutor
+
+from benchmarks.synthetic import RepoShape, generate_repo
+
+
+def _legacy_parsed(parsed, language: str):
+    """
+    Dict shapes returned by the parsers before records were introduced,
+    with the fields records have gained since (parameters, comment lines)
+    so both forms hold the same data.
+    """
+
+    def definition(d):
+        return {
+            "name": d.name,
+            "start_line": d.start_line,
+            "end_line": d.end_line,
+            "docstring": d.docstring,
+            "params": list(d.params),
+        }
+
+    comments = [{"text": text, "line": line} for text, line in zip(parsed.comments, parsed.comment_lines)]
+
+    if language == "java":
+        return {
+            "classes": [definition(c) for c in parsed.classes],
+            "methods": [definition(f) for f in parsed.functions],
+            "comments": comments,
+        }
+
+    return {
+        "functions": [definition(f) for f in parsed.functions],
+        "classes": [definition(c) for c in parsed.classes],
+        "docstrings": [{"scope": "file", "text": parsed.file_docstring}] if parsed.file_docstring else [],
+        "inline_comments": comments,
+    }
+
+
+def _legacy_results(results):
+    """
+    Entries as the pipeline used to keep them: one dict per file with its
+    metrics and its function and comment rows, the same data the records
+    hold (the rows packed).
+    """
+
+    from app.analysers.records import DETAIL_KEYS
+
+    entries = []
+    for record in results:
+        entry, details = record.to_dict(), record.details()
+        entries.append({**entry, **{key: details[key] for key in DETAIL_KEYS}})
+    return entries
+
+
+def _parse_all(root: str):
+    from app.parsers.java import parse_java
+    from app.parsers.python import parse_python
+    from app.services.walker import read_sources, walk_source_files
+
+    parsed = []
+    for source, code, _ in read_sources(walk_source_files(root)):
+        if source.rel_path.endswith(".py"):
+            parsed.append((parse_python(code), "python"))
+        else:
+            parsed.append((parse_java(code), "java"))
+    return parsed
+
+
+def _retained(build):
+    """Returns (entries, bytes still allocated once `build()` has returned)."""
+
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    kept = build()
+    gc.collect()
+    size = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    return len(kept), size
+
+
+def _measure(kind: str, root: str):
+    from app.services.analysis_service import analyze_codebase
+
+    if kind == "pipeline":
+        files = len(analyze_codebase(root))
+        return files, resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+    builders = {
+        "parse-records": lambda: _parse_all(root),
+        "parse-dicts": lambda: [_legacy_parsed(p, lang) for p, lang in _parse_all(root)],
+        "results-records": lambda: analyze_codebase(root),
+        "results-dicts": lambda: _legacy_results(analyze_codebase(root)),
+    }
+    # Warm imports and caches so they are not counted.
+    builders[kind]()
+    return _retained(builders[kind])
+
+
+def run(kind: str, root: str):
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=1, mp_context=context) as pool:
+        return pool.submit(_measure, kind, root).result()
+
+
+def report(root: str):
+    print(f"{'':>10} {'dicts':>12} {'records':>12} {'per file':>18} {'reduction':>10}")
+    for label in ("parse", "results"):
+        files, legacy = run(f"{label}-dicts", root)
+        _, records = run(f"{label}-records", root)
+        print(
+            f"{label:>10} {legacy / 1e6:>10.1f}MB {records / 1e6:>10.1f}MB"
+            f" {legacy / files:>8.0f}B -> {records / files:>5.0f}B {legacy / records:>9.1f}x"
+        )
+
+    files, rss = run("pipeline", root)
+    print(f"\nanalyze_codebase over {files} files: peak RSS {rss / 1e6:.0f}MB")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure memory held by parse/analysis results")
+    parser.add_argument("path", nargs="?")
+    parser.add_argument("--files", type=int, default=5000)
+    args = parser.parse_args()
+
+    if args.path:
+        report(args.path)
+        return
+
+    with tempfile.TemporaryDirectory(prefix="greencode-bench-memory-") as root:
+        generate_repo(root, RepoShape(files=args.files, duplicate_rate=0.2))
+        report(root)
+
+
+if __name__ == "__main__":
+    main()
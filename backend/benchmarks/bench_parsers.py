@@ -0,0 +1,144 @@
+"""
+Builtin (ast/javalang) versus tree-sitter parser backends.
+
+For every file the two backends' ParsedSource outputs are compared and
+each parser is timed. Files the builtin parsers reject are counted
+separately: there only the tree-sitter backend recovers definitions.
+Then every file is edited slightly (one line inserted mid-file) and
+reparsed, from scratch and incrementally through a TreeCache, and the
+incremental output is checked against the fresh one.
+
+Sources are synthetic modules unless `--path` names a directory to walk.
+Needs tree-sitter, tree-sitter-python and tree-sitter-java installed.
+
+Usage (from the backend directory):
+    python -m benchmarks.bench_parsers [--files 2000] [--path DIR] [--show 5]
+"""
+
+import argparse
+import itertools
+import time
+from typing import Dict, List, Optional, Tuple
+
+from app.parsers import java, python, treesitter
+from app.parsers.records import ParsedSource
+from app.services.walker import read_source, walk_source_files
+from benchmarks.synthetic import RepoShape, iter_sources
+
+BUILTIN = {"python": python.parse_python, "java": java.parse_java}
+TREE_SITTER = {"python": treesitter.parse_python, "java": treesitter.parse_java}
+
+
+def load(path: Optional[str], files: int) -> List[Tuple[str, str, str]]:
+    """(language, path, code) for up to `files` sources."""
+
+    if path:
+        sources = (
+            (s.rel_path, read_source(s)) for s in walk_source_files(path)
+        )
+        loaded = ((rel_path, read[0]) for rel_path, read in sources if read)
+    else:
+        loaded = iter_sources(RepoShape(files=files, seed=11))
+
+    return [
+        ("java" if name.endswith(".java") else "python", name, code)
+        for name, code in itertools.islice(loaded, files)
+    ]
+
+
+def snapshot(parsed: ParsedSource) -> Dict[str, object]:
+    """Comparable form of a parse; definitions in source order."""
+
+    def definitions(records):
+        return sorted((r.name, r.start_line, r.end_line, r.docstring, r.params) for r in records)
+
+    return {
+        "file_docstring": parsed.file_docstring,
+        "functions": definitions(parsed.functions),
+        "classes": definitions(parsed.classes),
+        "comments": list(zip(parsed.comment_lines, parsed.comments)),
+    }
+
+
+def edited(language: str, code: str) -> str:
+    """`code` with a comment line inserted half way down."""
+
+    lines = code.split("\n")
+    middle = len(lines) // 2
+    comment = "# edited" if language == "python" else "// edited"
+    return "\n".join(lines[:middle] + [comment] + lines[middle:])
+
+
+def timed(parse, code: str):
+    start = time.perf_counter()
+    try:
+        parsed = parse(code)
+    except (SyntaxError, ValueError, RecursionError):
+        parsed = None
+    return parsed, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare the builtin and tree-sitter parser backends")
+    parser.add_argument("--files", type=int, default=2000, help="number of files to parse")
+    parser.add_argument("--path", help="walk this directory instead of generating sources")
+    parser.add_argument("--show", type=int, default=5, help="mismatching files to list")
+    args = parser.parse_args()
+
+    sources = load(args.path, args.files)
+    stats = {
+        language: {"files": 0, "bytes": 0, "builtin": 0.0, "tree_sitter": 0.0,
+                   "rejected": 0, "recovered_functions": 0, "mismatches": []}
+        for language in BUILTIN
+    }
+
+    for language, name, code in sources:
+        row = stats[language]
+        row["files"] += 1
+        row["bytes"] += len(code.encode())
+
+        expected, builtin_time = timed(BUILTIN[language], code)
+        actual, tree_sitter_time = timed(TREE_SITTER[language], code)
+        row["builtin"] += builtin_time
+        row["tree_sitter"] += tree_sitter_time
+
+        if expected is None:
+            row["rejected"] += 1
+            row["recovered_functions"] += len(actual.functions)
+        elif snapshot(expected) != snapshot(actual):
+            row["mismatches"].append(name)
+
+    print(f"{'':>8} {'files':>7} {'MB':>6} {'builtin':>10} {'tree-sitter':>12} {'speed-up':>9} "
+          f"{'mismatches':>11} {'rejected':>9} {'recovered':>10}")
+    for language, row in stats.items():
+        if not row["files"]:
+            continue
+        print(f"{language:>8} {row['files']:>7} {row['bytes'] / 2**20:>6.1f} {row['builtin']:>9.2f}s "
+              f"{row['tree_sitter']:>11.2f}s {row['builtin'] / row['tree_sitter']:>8.1f}x "
+              f"{len(row['mismatches']):>11} {row['rejected']:>9} {row['recovered_functions']:>10}")
+        for name in row["mismatches"][:args.show]:
+            print(f"{'':>10}mismatch: {name}")
+
+    # Incremental reparsing of a one-line edit to every file.
+    cache = treesitter.TreeCache(size=len(sources))
+    for language, name, code in sources:
+        cache.parse(language, name, code)
+
+    fresh_time = incremental_time = 0.0
+    differing = 0
+    for language, name, code in sources:
+        changed = edited(language, code)
+        fresh, elapsed = timed(TREE_SITTER[language], changed)
+        fresh_time += elapsed
+
+        start = time.perf_counter()
+        incremental = cache.parse(language, name, changed)
+        incremental_time += time.perf_counter() - start
+        differing += snapshot(fresh) != snapshot(incremental)
+
+    print(f"\none-line edits: fresh {fresh_time:.2f}s, incremental {incremental_time:.2f}s "
+          f"({fresh_time / incremental_time:.1f}x), {cache.reparsed} reparsed, {differing} differing")
+
+
+if __name__ == "__main__":
+    main()
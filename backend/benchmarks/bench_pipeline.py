@@ -0,0 +1,201 @@
+"""
+End-to-end benchmark for the analysis pipeline.
+
+Generates synthetic repositories, times each stage (walk, read, parse,
+analyse) and the full `analyze_codebase` run in a fresh process, and
+compares throughput and peak RSS against a stored baseline.
+
+Usage (from the backend directory):
+    python -m benchmarks.bench_pipeline
+    python -m benchmarks.bench_pipeline --scenario medium --check
+    python -m benchmarks.bench_pipeline --save-baseline
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import resource
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from benchmarks.synthetic import RepoShape, generate_repo
+
+BASELINE_PATH = os.path.join(os.path.dirname(__file__), "baseline.json")
+
+SCENARIOS = {
+    "small": RepoShape(files=100),
+    "medium": RepoShape(files=1000, duplicate_rate=0.2),
+    "pathological": RepoShape(files=50, pathological=3, noise_files=50),
+}
+
+STAGES = ("walk", "read", "parse", "analyse", "pipeline")
+
+
+def _read_all(root: str):
+    from app.services.walker import walk_source_files, read_sources
+
+    return [(source.path, code) for source, code, _ in read_sources(walk_source_files(root))]
+
+
+def _parse(file_path: str, code: str):
+    from app.parsers.python import parse_python
+    from app.parsers.java import parse_java
+
+    return parse_python(code) if file_path.endswith(".py") else parse_java(code)
+
+
+def _analyse(file_path: str, parsed):
+    from app.analysers.python_comments import analyze_python_comments
+    from app.analysers.java_comments import analyze_java_comments
+
+    if file_path.endswith(".py"):
+        return analyze_python_comments(parsed)
+    return analyze_java_comments(parsed)
+
+
+def _run_stage(stage: str, root: str):
+    """
+    Runs one stage in the current (fresh) process and returns
+    (elapsed seconds, files, bytes, peak RSS in MB).
+    """
+
+    from app.services.analysis_service import analyze_codebase
+    from app.services.walker import walk_source_files
+
+    files = list(walk_source_files(root))
+    size = sum(source.size for source in files)
+
+    if stage == "walk":
+        start = time.perf_counter()
+        files = list(walk_source_files(root))
+        elapsed = time.perf_counter() - start
+
+    elif stage == "read":
+        start = time.perf_counter()
+        _read_all(root)
+        elapsed = time.perf_counter() - start
+
+    elif stage == "parse":
+        sources = _read_all(root)
+        start = time.perf_counter()
+        for file_path, code in sources:
+            _parse(file_path, code)
+        elapsed = time.perf_counter() - start
+
+    elif stage == "analyse":
+        parsed = [(p, _parse(p, code)) for p, code in _read_all(root)]
+        start = time.perf_counter()
+        for file_path, tree in parsed:
+            _analyse(file_path, tree)
+        elapsed = time.perf_counter() - start
+
+    else:
+        start = time.perf_counter()
+        analyze_codebase(root)
+        elapsed = time.perf_counter() - start
+
+    peak_rss_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    return elapsed, len(files), size, peak_rss_mb
+
+
+def measure(stage: str, root: str, repeat: int) -> dict:
+    runs = []
+    context = multiprocessing.get_context("spawn")
+
+    for _ in range(repeat):
+        with ProcessPoolExecutor(max_workers=1, mp_context=context) as pool:
+            runs.append(pool.submit(_run_stage, stage, root).result())
+
+    elapsed, files, size, _ = min(runs, key=lambda r: r[0])
+    elapsed = max(elapsed, 1e-9)
+
+    return {
+        "seconds": round(elapsed, 4),
+        "files_per_s": round(files / elapsed, 1),
+        "mb_per_s": round(size / elapsed / 1e6, 2),
+        "peak_rss_mb": round(max(r[3] for r in runs), 1),
+    }
+
+
+def compare(current: dict, baseline: dict, tolerance: float) -> list:
+    regressions = []
+
+    for stage, metrics in current.items():
+        base = baseline.get(stage)
+        if not base:
+            continue
+
+        if metrics["files_per_s"] < base["files_per_s"] * (1 - tolerance):
+            regressions.append(
+                f"{stage}: {metrics['files_per_s']} files/s "
+                f"vs baseline {base['files_per_s']}"
+            )
+        if metrics["peak_rss_mb"] > base["peak_rss_mb"] * (1 + tolerance):
+            regressions.append(
+                f"{stage}: {metrics['peak_rss_mb']} MB peak RSS "
+                f"vs baseline {base['peak_rss_mb']}"
+            )
+
+    return regressions
+
+
+def _print_table(name: str, manifest: dict, results: dict, baseline: dict):
+    print(f"\n[{name}] {manifest['files']} files, {manifest['bytes'] / 1e6:.2f} MB")
+    print(f"{'stage':<10}{'seconds':>10}{'files/s':>12}{'MB/s':>10}{'RSS MB':>10}{'vs base':>10}")
+
+    for stage, m in results.items():
+        base = baseline.get(stage)
+        delta = f"{m['files_per_s'] / base['files_per_s']:.2f}x" if base else "-"
+        print(
+            f"{stage:<10}{m['seconds']:>10}{m['files_per_s']:>12}"
+            f"{m['mb_per_s']:>10}{m['peak_rss_mb']:>10}{delta:>10}"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the analysis pipeline")
+    parser.add_argument("--scenario", action="append", choices=sorted(SCENARIOS))
+    parser.add_argument("--stage", action="append", choices=STAGES)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--baseline", default=BASELINE_PATH)
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument("--tolerance", type=float, default=0.25)
+    parser.add_argument("--check", action="store_true", help="exit non-zero on regression")
+    args = parser.parse_args()
+
+    baseline = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+
+    report = {}
+    regressions = []
+
+    for name in args.scenario or list(SCENARIOS):
+        with tempfile.TemporaryDirectory(prefix=f"greencode-bench-{name}-") as root:
+            manifest = generate_repo(root, SCENARIOS[name])
+            results = {stage: measure(stage, root, args.repeat) for stage in args.stage or STAGES}
+
+        report[name] = results
+        _print_table(name, manifest, results, baseline.get(name, {}))
+        regressions += [f"{name}/{r}" for r in compare(results, baseline.get(name, {}), args.tolerance)]
+
+    if args.save_baseline:
+        baseline.update(report)
+        with open(args.baseline, "w") as f:
+            json.dump(baseline, f, indent=2, sort_keys=True)
+        print(f"\nBaseline written to {args.baseline}")
+
+    if regressions:
+        print("\nRegressions:")
+        for r in regressions:
+            print(f"  {r}")
+        if args.check:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
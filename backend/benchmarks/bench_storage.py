@@ -0,0 +1,70 @@
+"""
+Storage benchmark for analysis results: JSON (as stored in JSONB) versus
+the packed msgpack+zstd encoding, on real repositories.
+
+zlib-compressed JSON is shown as an optimistic stand-in for TOAST, whose
+pglz compression is weaker and only kicks in for values above ~2 KB.
+
+Usage (from the backend directory):
+    python -m benchmarks.bench_storage /path/to/repo [/path/to/other/repo ...]
+    python -m benchmarks.bench_storage            # synthetic medium repo
+"""
+
+import argparse
+import json
+import tempfile
+import time
+import zlib
+
+from app.analysers.records import as_dicts
+from app.services.analysis_service import analyze_codebase
+from app.utils.result_codec import encode_result, decode_result
+from benchmarks.synthetic import RepoShape, generate_repo
+
+
+def _best_ms(fn, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def measure(name: str, result: list, repeat: int):
+    as_json = json.dumps(result)
+    packed = encode_result(result)
+
+    assert decode_result(packed) == json.loads(as_json)
+
+    json_bytes = len(as_json.encode())
+    zlib_bytes = len(zlib.compress(as_json.encode()))
+
+    print(f"\n[{name}] {len(result)} files")
+    print(f"  json        {json_bytes:>12,} bytes")
+    print(f"  json+zlib   {zlib_bytes:>12,} bytes")
+    print(f"  packed      {len(packed):>12,} bytes  ({json_bytes / len(packed):.1f}x smaller than json)")
+    print(f"  encode      json {_best_ms(lambda: json.dumps(result), repeat):8.2f} ms"
+          f"   packed {_best_ms(lambda: encode_result(result), repeat):8.2f} ms")
+    print(f"  decode      json {_best_ms(lambda: json.loads(as_json), repeat):8.2f} ms"
+          f"   packed {_best_ms(lambda: decode_result(packed), repeat):8.2f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare result storage encodings")
+    parser.add_argument("paths", nargs="*")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    if args.paths:
+        for path in args.paths:
+            measure(path, as_dicts(analyze_codebase(path)), args.repeat)
+        return
+
+    with tempfile.TemporaryDirectory(prefix="greencode-bench-storage-") as root:
+        generate_repo(root, RepoShape(files=1000, duplicate_rate=0.2))
+        measure("synthetic", as_dicts(analyze_codebase(root)), args.repeat)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""
+First-analysis latency: a cold process (interpreter start, imports and
+first use of the analyser stack) versus the warm worker tier, including
+the job that follows a worker being recycled.
+
+Usage (from the backend directory):
+    python -m benchmarks.bench_workers [--files 20] [--rounds 5]
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+
+from app.services.worker_pool import AnalysisPool, _analyze_job
+from benchmarks.synthetic import RepoShape, generate_repo
+
+COLD_SCRIPT = """
+import sys, time
+start = time.perf_counter()
+from app.services.analysis_service import analyze_codebase
+imported = time.perf_counter()
+analyze_codebase(sys.argv[1])
+print(imported - start, time.perf_counter() - imported)
+"""
+
+
+def cold_process(root: str):
+    start = time.perf_counter()
+    output = subprocess.run(
+        [sys.executable, "-c", COLD_SCRIPT, root],
+        check=True, capture_output=True, text=True, cwd=os.getcwd(),
+    ).stdout
+    imports, analysis = (float(v) for v in output.split())
+    return time.perf_counter() - start, imports, analysis
+
+
+def timed(fn) -> float:
+    start = time.perf_counter()
+    fn()
+    return time.perf_counter() - start
+
+
+def spawn_pool_first_job(root: str) -> float:
+    with ProcessPoolExecutor(1, mp_context=get_context("spawn")) as pool:
+        return timed(lambda: pool.submit(_analyze_job, root, None, None).result())
+
+
+def warm_pool_jobs(root: str):
+    # One job per worker: the second job always runs in a freshly
+    # forked replacement.
+    pool = AnalysisPool(1, max_jobs=1)
+    try:
+        pool.start()
+        first = timed(lambda: pool.analyze(root))
+        recycled = timed(lambda: pool.analyze(root))
+        steady_pool = AnalysisPool(1, max_jobs=100)
+        steady_pool.start()
+        steady_pool.analyze(root)
+        steady = timed(lambda: steady_pool.analyze(root))
+        steady_pool.shutdown()
+    finally:
+        pool.shutdown()
+    return first, recycled, steady
+
+
+def ms(values) -> str:
+    return f"{statistics.median(values) * 1000:8.1f} ms"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark cold vs warm first analysis")
+    parser.add_argument("--files", type=int, default=20)
+    parser.add_argument("--rounds", type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as root:
+        generate_repo(root, RepoShape(files=args.files))
+
+        cold = [cold_process(root) for _ in range(args.rounds)]
+        spawned = [spawn_pool_first_job(root) for _ in range(args.rounds)]
+        warm = [warm_pool_jobs(root) for _ in range(args.rounds)]
+
+    print(f"first analysis of a {args.files}-file repo, median of {args.rounds}:")
+    print(f"  cold process, end to end:        {ms([c[0] for c in cold])}")
+    print(f"    of which imports:              {ms([c[1] for c in cold])}")
+    print(f"    of which first analysis:       {ms([c[2] for c in cold])}")
+    print(f"  spawned worker, first job:       {ms(spawned)}")
+    print(f"  warm worker, first job:          {ms([w[0] for w in warm])}")
+    print(f"  job after recycling (forkserver):{ms([w[1] for w in warm])}")
+    print(f"  warm worker, steady state:       {ms([w[2] for w in warm])}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,211 @@
+"""
+Synthetic Python/Java repository generator for benchmarks.
+
+Usage:
+    python -m benchmarks.synthetic /tmp/synthetic-repo --files 500
+"""
+
+import argparse
+import os
+import random
+from dataclasses import dataclass
+from typing import Iterator, Tuple
+
+WORDS = (
+    "value index buffer request response user session token cache result "
+    "parser node tree comment config path file stream record table query "
+    "batch worker queue handler payload count total limit offset error state "
+    "returns computes updates validates loads stores checks builds resolves "
+    "the a of for with from into when if each all current given new"
+).split()
+
+PATHOLOGICAL_KINDS = ("comment_storm", "wide", "long_lines")
+
+
+@dataclass
+class RepoShape:
+    files: int = 200
+    java_ratio: float = 0.3
+    functions_per_file: int = 8
+    comment_density: float = 1.5
+    duplicate_rate: float = 0.1
+    pathological: int = 0
+    noise_files: int = 0
+    max_depth: int = 3
+    seed: int = 1234
+
+
+class _TextPool:
+    def __init__(self, rng: random.Random, duplicate_rate: float):
+        self.rng = rng
+        self.duplicate_rate = duplicate_rate
+        self.used = []
+
+    def sentence(self) -> str:
+        if self.used and self.rng.random() < self.duplicate_rate:
+            return self.rng.choice(self.used)
+
+        words = self.rng.choices(WORDS, k=self.rng.randint(4, 14))
+        text = " ".join(words).capitalize()
+        self.used.append(text)
+        return text
+
+
+def _comment_count(rng: random.Random, density: float) -> int:
+    whole = int(density)
+    return whole + (1 if rng.random() < density - whole else 0)
+
+
+def _python_source(rng: random.Random, pool: _TextPool, shape: RepoShape) -> str:
+    lines = [f'"""{pool.sentence()}."""', "", "import os", ""]
+
+    for c in range(max(1, shape.functions_per_file // 4)):
+        lines.append(f"class Service{c}:")
+        lines.append(f'    """{pool.sentence()}."""')
+        lines.append("")
+
+        for m in range(4):
+            lines.append(f"    def method_{c}_{m}(self, value, limit=10):")
+            for _ in range(_comment_count(rng, shape.comment_density)):
+                if rng.random() < 0.5:
+                    lines.append(f'        """{pool.sentence()}."""')
+                else:
+                    lines.append(f"        # {pool.sentence()}")
+            lines.append("        total = 0")
+            lines.append("        for i in range(limit):")
+            lines.append("            total += i * value  # accumulate")
+            lines.append("        return total")
+            lines.append("")
+
+    return "\n".join(lines) + "\n"
+
+
+def _java_source(rng: random.Random, pool: _TextPool, shape: RepoShape, name: str) -> str:
+    lines = ["package bench;", "", f"/** {pool.sentence()}. */", f"public class {name} {{"]
+
+    for m in range(shape.functions_per_file):
+        for _ in range(_comment_count(rng, shape.comment_density)):
+            if rng.random() < 0.5:
+                lines.append(f"    /** {pool.sentence()}. */")
+            else:
+                lines.append(f"    // {pool.sentence()}")
+        lines.append(f"    public int method{m}(int value, int limit) {{")
+        lines.append("        int total = 0;")
+        lines.append("        for (int i = 0; i < limit; i++) {")
+        lines.append("            total += i * value; // accumulate")
+        lines.append("        }")
+        lines.append("        return total;")
+        lines.append("    }")
+        lines.append("")
+
+    lines.append("}")
+    return "\n".join(lines) + "\n"
+
+
+def _pathological_source(rng: random.Random, pool: _TextPool, kind: str) -> str:
+    if kind == "comment_storm":
+        body = [f"# {pool.sentence()}" for _ in range(2000)]
+        return "\n".join(body) + "\nVALUE = 1\n"
+
+    if kind == "wide":
+        body = []
+        for i in range(5000):
+            body.append(f"def f{i}(x):")
+            body.append(f'    """{pool.sentence()}."""')
+            body.append("    return x")
+        return "\n".join(body) + "\n"
+
+    values = ", ".join(str(rng.randint(0, 10**6)) for _ in range(40000))
+    return f"# {pool.sentence()}\nDATA = [{values}]\n"
+
+
+def _directory(rng: random.Random, root: str, max_depth: int) -> str:
+    parts = [f"pkg{rng.randint(0, 9)}" for _ in range(rng.randint(0, max_depth))]
+    return os.path.join(root, *parts)
+
+
+def generate_repo(root: str, shape: RepoShape) -> dict:
+    """
+    Writes a deterministic synthetic repository under `root` and
+    returns a manifest with file counts and total bytes.
+    """
+
+    rng = random.Random(shape.seed)
+    pool = _TextPool(rng, shape.duplicate_rate)
+    manifest = {"files": 0, "bytes": 0, "python": 0, "java": 0, "noise": 0}
+
+    def write(path: str, source: str):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w") as f:
+            f.write(source)
+        manifest["bytes"] += len(source.encode())
+
+    for i in range(shape.files):
+        directory = _directory(rng, root, shape.max_depth)
+
+        if rng.random() < shape.java_ratio:
+            name = f"Module{i}"
+            write(os.path.join(directory, f"{name}.java"), _java_source(rng, pool, shape, name))
+            manifest["java"] += 1
+        else:
+            write(os.path.join(directory, f"module_{i}.py"), _python_source(rng, pool, shape))
+            manifest["python"] += 1
+
+    for i in range(shape.pathological):
+        kind = PATHOLOGICAL_KINDS[i % len(PATHOLOGICAL_KINDS)]
+        write(os.path.join(root, "pathological", f"{kind}_{i}.py"), _pathological_source(rng, pool, kind))
+        manifest["python"] += 1
+
+    for i in range(shape.noise_files):
+        vendored = rng.choice(("node_modules", ".tox", "target", "site-packages"))
+        write(os.path.join(root, vendored, f"vendored_{i}.py"), _python_source(rng, pool, shape))
+        manifest["noise"] += 1
+
+    manifest["files"] = manifest["python"] + manifest["java"]
+    return manifest
+
+
+def iter_sources(shape: RepoShape) -> Iterator[Tuple[str, str]]:
+    """Endless (file name, source) stream in the same language mix, e.g. for uploads."""
+
+    rng = random.Random(shape.seed)
+    pool = _TextPool(rng, shape.duplicate_rate)
+    i = 0
+
+    while True:
+        if rng.random() < shape.java_ratio:
+            name = f"Module{i}"
+            yield f"{name}.java", _java_source(rng, pool, shape, name)
+        else:
+            yield f"module_{i}.py", _python_source(rng, pool, shape)
+        i += 1
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a synthetic repository")
+    parser.add_argument("root")
+    parser.add_argument("--files", type=int, default=RepoShape.files)
+    parser.add_argument("--java-ratio", type=float, default=RepoShape.java_ratio)
+    parser.add_argument("--functions-per-file", type=int, default=RepoShape.functions_per_file)
+    parser.add_argument("--comment-density", type=float, default=RepoShape.comment_density)
+    parser.add_argument("--duplicate-rate", type=float, default=RepoShape.duplicate_rate)
+    parser.add_argument("--pathological", type=int, default=RepoShape.pathological)
+    parser.add_argument("--noise-files", type=int, default=RepoShape.noise_files)
+    parser.add_argument("--seed", type=int, default=RepoShape.seed)
+    args = parser.parse_args()
+
+    shape = RepoShape(
+        files=args.files,
+        java_ratio=args.java_ratio,
+        functions_per_file=args.functions_per_file,
+        comment_density=args.comment_density,
+        duplicate_rate=args.duplicate_rate,
+        pathological=args.pathological,
+        noise_files=args.noise_files,
+        seed=args.seed,
+    )
+    print(generate_repo(args.root, shape))
+
+
+if __name__ == "__main__":
+    main()
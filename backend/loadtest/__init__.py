@@ -0,0 +1,12 @@
+"""
+Local load-test harness: boots the real app under uvicorn against a
+SQLite (or local Postgres) database, a local SMTP sink and GitHub
+URLs rewritten to local bare repositories, then drives a mixed workload
+and reports per-endpoint latency percentiles, error rates and server
+CPU/memory.
+
+Usage (from the backend directory):
+    python -m loadtest --concurrency 16 --duration 30
+    python -m loadtest --mix login=1,upload=3,github=3 --phases mixed --json run.json
+    python -m loadtest --database-url postgresql://localhost/greencode_load
+"""
@@ -0,0 +1,116 @@
+import argparse
+import asyncio
+import json
+import os
+import sys
+import tempfile
+
+from loadtest.driver import parse_mix, register_users, run_phase
+from loadtest.fixtures import build_fixtures, git_env
+from loadtest.server import AppServer
+from loadtest.smtp_sink import SmtpSink
+
+PHASES = ("isolated", "mixed")
+
+
+def print_phase(name: str, phase: dict):
+    resources = phase["resources"]
+    print(
+        f"\n== {name}: {phase['concurrency']} users, {phase['elapsed']}s"
+        + (f", server cpu {resources['cpu_utilisation']} cores, peak rss {resources['peak_rss_mb']} MB"
+           if resources else "")
+    )
+    print(f"{'endpoint':<10} {'requests':>8} {'rps':>8} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'errors':>8}")
+    for endpoint, row in phase["endpoints"].items():
+        print(
+            f"{endpoint:<10} {row['requests']:>8} {row['rps']:>8} {row['p50_ms']:>9} "
+            f"{row['p95_ms']:>9} {row['p99_ms']:>9} {row['error_rate']:>8.1%}"
+        )
+
+
+async def run(args, server: AppServer, repo_urls, sink: SmtpSink) -> dict:
+    mix = parse_mix(args.mix)
+    await register_users(server.base_url, args.users, args.concurrency)
+
+    phases = {}
+    if "isolated" in args.phases:
+        # One endpoint at a time, so resource usage is attributable.
+        for endpoint in mix:
+            phases[endpoint] = await run_phase(
+                server.base_url, {endpoint: 1}, args.concurrency, args.duration,
+                args.users, repo_urls, server.process_metrics, args.seed,
+            )
+            print_phase(endpoint, phases[endpoint])
+
+    if "mixed" in args.phases:
+        phases["mixed"] = await run_phase(
+            server.base_url, mix, args.concurrency, args.duration,
+            args.users, repo_urls, server.process_metrics, args.seed,
+        )
+        print_phase("mixed", phases["mixed"])
+
+    return {"phases": phases, "emails_delivered": sink.messages}
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m loadtest")
+    parser.add_argument("--concurrency", "-c", type=int, default=8, help="virtual users")
+    parser.add_argument("--duration", "-d", type=float, default=20, help="seconds per phase")
+    parser.add_argument("--mix", default="login=3,upload=2,github=2,forgot=1",
+                        help="endpoint weights for the mixed phase")
+    parser.add_argument("--phases", default="isolated,mixed",
+                        help=f"comma-separated, from: {', '.join(PHASES)}")
+    parser.add_argument("--users", type=int, default=16, help="accounts the virtual users share")
+    parser.add_argument("--repos", type=int, default=4, help="local git fixtures behind /github/analyze")
+    parser.add_argument("--repo-files", type=int, default=100)
+    parser.add_argument("--database-url", default=None,
+                        help="defaults to a fresh SQLite file; pass a local Postgres URL to use that")
+    parser.add_argument("--server-workers", type=int, default=1, help="uvicorn worker processes")
+    parser.add_argument("--analysis-workers", type=int, default=0, help="ANALYSIS_WORKERS for the app")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", help="also write the full report here")
+    args = parser.parse_args(argv)
+    args.phases = [p.strip() for p in args.phases.split(",") if p.strip() in PHASES]
+
+    with tempfile.TemporaryDirectory(prefix="greencode-loadtest-") as tmp:
+        print("building git fixtures...", file=sys.stderr)
+        git_root = os.path.join(tmp, "git")
+        repo_urls = build_fixtures(git_root, args.repos, args.repo_files)
+
+        sink = SmtpSink()
+        smtp_port = sink.start()
+
+        env = {
+            **os.environ,
+            "DATABASE_URL": args.database_url or f"sqlite:///{os.path.join(tmp, 'app.db')}",
+            "JWT_SECRET_KEY": os.environ.get("JWT_SECRET_KEY", "loadtest-secret"),
+            "SMTP_HOST": "127.0.0.1",
+            "SMTP_PORT": str(smtp_port),
+            "SMTP_SSL": "false",
+            "SMTP_EMAIL": "loadtest@example.com",
+            "SMTP_PASSWORD": "",
+            "BASE_ANALYSIS_PATH": os.path.join(tmp, "work"),
+            "ANALYSIS_WORKERS": str(args.analysis_workers),
+            **git_env(git_root),
+        }
+
+        server = AppServer(env, workers=args.server_workers)
+        print(f"starting app on {server.base_url}...", file=sys.stderr)
+        server.start()
+        try:
+            report = asyncio.run(run(args, server, repo_urls, sink))
+        finally:
+            server.stop()
+            sink.stop()
+
+    print(f"\nemails delivered to the SMTP sink: {report['emails_delivered']}")
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+
+    failed = any(row["error_rate"] > 0 for phase in report["phases"].values() for row in phase["endpoints"].values())
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,216 @@
+import asyncio
+import random
+import time
+from collections import Counter
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+import httpx
+
+from benchmarks.synthetic import RepoShape, iter_sources
+
+ENDPOINTS = ("login", "upload", "github", "forgot")
+PASSWORD = "LoadTest123"
+REQUEST_TIMEOUT = 120
+SAMPLE_SECONDS = 0.5
+
+
+def user_email(n: int) -> str:
+    return f"loadtest-{n}@example.com"
+
+
+def parse_mix(value: str) -> Dict[str, float]:
+    """'login=3,upload=1' -> weights; unknown endpoints are rejected."""
+
+    mix = {}
+    for part in value.split(","):
+        name, _, weight = part.partition("=")
+        name = name.strip()
+        if name not in ENDPOINTS:
+            raise ValueError(f"unknown endpoint {name!r}; expected one of {', '.join(ENDPOINTS)}")
+        mix[name] = float(weight or 1)
+    return {name: weight for name, weight in mix.items() if weight > 0}
+
+
+def percentile(sorted_values: Sequence[float], q: float) -> Optional[float]:
+    """Nearest-rank percentile of an already sorted sequence."""
+
+    if not sorted_values:
+        return None
+    rank = max(1, int(round(q * len(sorted_values) + 0.5)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+class Recorder:
+    def __init__(self):
+        self.latencies: Dict[str, List[float]] = {}
+        self.statuses: Dict[str, Counter] = {}
+        self.errors: Counter = Counter()
+
+    def record(self, endpoint: str, seconds: float, status: Optional[int]):
+        self.latencies.setdefault(endpoint, []).append(seconds)
+        self.statuses.setdefault(endpoint, Counter())[status or "error"] += 1
+        if status is None or status >= 400:
+            self.errors[endpoint] += 1
+
+    def report(self, elapsed: float) -> Dict[str, Dict[str, Any]]:
+        rows = {}
+        for endpoint, values in sorted(self.latencies.items()):
+            ordered = sorted(values)
+            rows[endpoint] = {
+                "requests": len(values),
+                "rps": round(len(values) / elapsed, 2) if elapsed else None,
+                **{
+                    f"p{round(q * 100)}_ms": round(percentile(ordered, q) * 1000, 1)
+                    for q in (0.5, 0.95, 0.99)
+                },
+                "max_ms": round(ordered[-1] * 1000, 1),
+                "error_rate": round(self.errors[endpoint] / len(values), 4),
+                "statuses": {str(k): v for k, v in sorted(self.statuses[endpoint].items(), key=str)},
+            }
+        return rows
+
+
+class Sources:
+    """Fresh synthetic files for uploads, so each upload is real work."""
+
+    def __init__(self, seed: int):
+        self._sources = iter_sources(RepoShape(seed=seed))
+
+    def upload(self) -> Tuple[str, bytes]:
+        name, source = next(self._sources)
+        return name, source.encode()
+
+
+class VirtualUser:
+    def __init__(self, base_url: str, n: int, repo_urls: List[str], sources: Sources, recorder: Recorder):
+        self.email = user_email(n)
+        self.repo_urls = repo_urls
+        self.sources = sources
+        self.recorder = recorder
+        self.client = httpx.AsyncClient(base_url=base_url, timeout=REQUEST_TIMEOUT)
+        self.rng = random.Random(n)
+
+    async def _timed(self, endpoint: str, request: Callable):
+        start = time.perf_counter()
+        status = None
+        try:
+            response = await request()
+            status = response.status_code
+        except httpx.HTTPError:
+            pass
+        self.recorder.record(endpoint, time.perf_counter() - start, status)
+
+    def login(self):
+        return self._timed("login", lambda: self.client.post(
+            "/auth/login", json={"email": self.email, "password": PASSWORD},
+        ))
+
+    def upload(self):
+        name, content = self.sources.upload()
+        return self._timed("upload", lambda: self.client.post(
+            "/analysis/upload", files=[("files", (name, content))],
+        ))
+
+    def github(self):
+        repo_url = self.rng.choice(self.repo_urls)
+        return self._timed("github", lambda: self.client.post(
+            "/github/analyze", params={"repo_url": repo_url},
+        ))
+
+    def forgot(self):
+        return self._timed("forgot", lambda: self.client.post(
+            "/auth/forgot-password", json={"email": self.email},
+        ))
+
+    async def run(self, mix: Dict[str, float], deadline: float):
+        names, weights = list(mix), list(mix.values())
+        # Every session starts logged in; that login is measured too.
+        await self.login()
+        while time.monotonic() < deadline:
+            await getattr(self, self.rng.choices(names, weights)[0])()
+
+    async def close(self):
+        await self.client.aclose()
+
+
+async def register_users(base_url: str, users: int, concurrency: int):
+    """Creates the load-test accounts; ones left from earlier runs are kept."""
+
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async with httpx.AsyncClient(base_url=base_url, timeout=REQUEST_TIMEOUT) as client:
+        async def register(n: int):
+            async with semaphore:
+                response = await client.post("/auth/register", json={
+                    "first_name": "Load", "last_name": f"Test{n}", "email": user_email(n),
+                    "password": PASSWORD, "confirm_password": PASSWORD,
+                })
+                if response.status_code not in (201, 409):
+                    raise RuntimeError(f"registering {user_email(n)}: {response.status_code} {response.text}")
+
+        await asyncio.gather(*(register(n) for n in range(users)))
+
+
+async def _sample_resources(sample: Callable[[], Dict[str, float]], samples: List[Dict[str, float]], stop: asyncio.Event):
+    while not stop.is_set():
+        try:
+            samples.append(await asyncio.to_thread(sample))
+        except httpx.HTTPError:
+            pass
+        try:
+            await asyncio.wait_for(stop.wait(), SAMPLE_SECONDS)
+        except asyncio.TimeoutError:
+            pass
+
+
+async def run_phase(
+    base_url: str,
+    mix: Dict[str, float],
+    concurrency: int,
+    duration: float,
+    users: int,
+    repo_urls: List[str],
+    sample: Callable[[], Dict[str, float]],
+    seed: int = 0,
+) -> Dict[str, Any]:
+    """
+    Runs `concurrency` virtual users against the app for `duration`
+    seconds, each picking endpoints by `mix` weight, while sampling the
+    server's CPU and memory. Returns per-endpoint latency/error figures
+    and the phase's resource usage.
+    """
+
+    recorder = Recorder()
+    sources = Sources(seed)
+    vus = [VirtualUser(base_url, (seed + i) % users, repo_urls, sources, recorder) for i in range(concurrency)]
+
+    samples: List[Dict[str, float]] = []
+    stop = asyncio.Event()
+    sampler = asyncio.create_task(_sample_resources(sample, samples, stop))
+
+    start = time.perf_counter()
+    deadline = time.monotonic() + duration
+    try:
+        await asyncio.gather(*(vu.run(mix, deadline) for vu in vus))
+    finally:
+        elapsed = time.perf_counter() - start
+        stop.set()
+        await sampler
+        await asyncio.gather(*(vu.close() for vu in vus))
+
+    resources = {}
+    if len(samples) >= 2:
+        cpu = samples[-1]["cpu_seconds"] - samples[0]["cpu_seconds"]
+        resources = {
+            "cpu_seconds": round(cpu, 2),
+            "cpu_utilisation": round(cpu / elapsed, 2),
+            "peak_rss_mb": round(max(s["rss_bytes"] for s in samples) / 2**20, 1),
+        }
+
+    return {
+        "mix": mix,
+        "concurrency": concurrency,
+        "elapsed": round(elapsed, 2),
+        "endpoints": recorder.report(elapsed),
+        "resources": resources,
+    }
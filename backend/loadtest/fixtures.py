@@ -0,0 +1,48 @@
+import os
+import subprocess
+from typing import Dict, List
+
+from benchmarks.synthetic import RepoShape, generate_repo
+
+GITHUB_PREFIX = "https://github.com/"
+OWNER = "loadtest"
+
+
+def _git(*args: str):
+    subprocess.run(["git", *args], check=True, capture_output=True)
+
+
+def build_fixtures(root: str, repos: int, files: int) -> List[str]:
+    """
+    Creates `repos` bare repositories of synthetic sources under
+    `root`/loadtest/ and returns the GitHub URLs they stand in for.
+    """
+
+    urls = []
+    for i in range(repos):
+        work = os.path.join(root, "work", f"repo{i}")
+        bare = os.path.join(root, OWNER, f"repo{i}.git")
+
+        generate_repo(work, RepoShape(files=files, seed=1000 + i))
+        _git("-C", work, "init", "-q")
+        _git("-C", work, "add", "-A")
+        _git("-C", work, "-c", "user.name=loadtest", "-c", "user.email=loadtest@example.com",
+             "commit", "-qm", "fixture")
+        _git("clone", "-q", "--bare", work, bare)
+
+        urls.append(f"{GITHUB_PREFIX}{OWNER}/repo{i}.git")
+    return urls
+
+
+def git_env(root: str) -> Dict[str, str]:
+    """
+    Environment that makes every git process rewrite GitHub URLs to the
+    local fixtures, so the app's unchanged clone path hits local disk.
+    """
+
+    return {
+        "GIT_CONFIG_COUNT": "1",
+        "GIT_CONFIG_KEY_0": f"url.file://{os.path.abspath(root)}/.insteadOf",
+        "GIT_CONFIG_VALUE_0": GITHUB_PREFIX,
+        "GIT_TERMINAL_PROMPT": "0",
+    }
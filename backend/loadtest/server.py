@@ -0,0 +1,81 @@
+import os
+import socket
+import subprocess
+import sys
+import time
+from typing import Dict, Optional
+
+import httpx
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+START_TIMEOUT = 60
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def parse_process_metrics(text: str) -> Dict[str, float]:
+    """CPU seconds and resident memory from the app's Prometheus output."""
+
+    wanted = {
+        "process_cpu_seconds_total": "cpu_seconds",
+        "process_resident_memory_bytes": "rss_bytes",
+    }
+    values = {}
+    for line in text.splitlines():
+        name, _, value = line.partition(" ")
+        if name in wanted:
+            values[wanted[name]] = float(value)
+    return values
+
+
+class AppServer:
+    """The real app under uvicorn, in a subprocess with its own environment."""
+
+    def __init__(self, env: Dict[str, str], port: Optional[int] = None, workers: int = 1):
+        self.env = env
+        self.port = port or free_port()
+        self.workers = workers
+        self.base_url = f"http://127.0.0.1:{self.port}"
+        self._process: Optional[subprocess.Popen] = None
+
+    def start(self):
+        self._process = subprocess.Popen(
+            [
+                sys.executable, "-m", "uvicorn", "app.main:app",
+                "--host", "127.0.0.1", "--port", str(self.port),
+                "--workers", str(self.workers), "--log-level", "warning",
+            ],
+            cwd=BACKEND_DIR,
+            env=self.env,
+        )
+
+        deadline = time.monotonic() + START_TIMEOUT
+        while time.monotonic() < deadline:
+            if self._process.poll() is not None:
+                raise RuntimeError(f"server exited with code {self._process.returncode}")
+            try:
+                if httpx.get(f"{self.base_url}/metrics", timeout=1).status_code == 200:
+                    return
+            except httpx.TransportError:
+                pass
+            time.sleep(0.2)
+
+        self.stop()
+        raise RuntimeError("server did not start in time")
+
+    def process_metrics(self) -> Dict[str, float]:
+        # With several uvicorn workers this is whichever one answered.
+        return parse_process_metrics(httpx.get(f"{self.base_url}/metrics", timeout=5).text)
+
+    def stop(self):
+        if self._process is not None and self._process.poll() is None:
+            self._process.terminate()
+            try:
+                self._process.wait(timeout=15)
+            except subprocess.TimeoutExpired:
+                self._process.kill()
+        self._process = None
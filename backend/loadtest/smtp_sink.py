@@ -0,0 +1,75 @@
+import asyncio
+import threading
+from typing import Optional
+
+
+class SmtpSink:
+    """
+    Minimal SMTP server that accepts every message and throws it away,
+    counting deliveries. Runs on its own event loop thread so the app's
+    blocking smtplib calls get a real socket to talk to.
+    """
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0):
+        self.host = host
+        self.port = port
+        self.messages = 0
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+
+    async def _session(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        writer.write(b"220 loadtest ESMTP sink\r\n")
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                command = line[:4].upper()
+
+                if command in (b"HELO", b"EHLO"):
+                    writer.write(b"250 loadtest\r\n")
+                elif command == b"DATA":
+                    writer.write(b"354 End data with <CR><LF>.<CR><LF>\r\n")
+                    await writer.drain()
+                    while (await reader.readline()) not in (b".\r\n", b""):
+                        pass
+                    self.messages += 1
+                    writer.write(b"250 OK queued\r\n")
+                elif command == b"QUIT":
+                    writer.write(b"221 Bye\r\n")
+                    break
+                else:
+                    writer.write(b"250 OK\r\n")
+                await writer.drain()
+        finally:
+            writer.close()
+
+    def start(self) -> int:
+        """Starts listening and returns the bound port."""
+
+        ready = threading.Event()
+
+        def serve():
+            self._loop = asyncio.new_event_loop()
+            server = self._loop.run_until_complete(
+                asyncio.start_server(self._session, self.host, self.port)
+            )
+            self.port = server.sockets[0].getsockname()[1]
+            ready.set()
+            try:
+                self._loop.run_forever()
+            finally:
+                server.close()
+                self._loop.run_until_complete(server.wait_closed())
+                self._loop.close()
+
+        self._thread = threading.Thread(target=serve, name="smtp-sink", daemon=True)
+        self._thread.start()
+        ready.wait()
+        return self.port
+
+    def stop(self):
+        if self._loop is not None:
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._thread.join()
+            self._loop = None
@@ -0,0 +1,49 @@
+import os
+import tempfile
+
+# Settings and the engine are read at import: point them at a throwaway
+# database before anything under app/ is imported.
+_scratch = tempfile.mkdtemp(prefix="greencode-tests-")
+os.environ["DATABASE_URL"] = f"sqlite:///{_scratch}/test.db"
+os.environ["JWT_SECRET_KEY"] = "test"
+os.environ["JWT_ALGORITHM"] = "HS256"
+os.environ["BASE_ANALYSIS_PATH"] = f"{_scratch}/analyses"
+os.environ["ANALYSIS_WORKERS"] = "0"
+
+import pytest  # noqa: E402
+
+
+@pytest.fixture
+def db():
+    import app.main  # noqa: F401  (creates the tables)
+    from app.database.database import Base, SessionLocal, engine
+
+    session = SessionLocal()
+    yield session
+    session.close()
+    with engine.begin() as conn:
+        for table in reversed(Base.metadata.sorted_tables):
+            conn.execute(table.delete())
+
+
+@pytest.fixture
+def make_user(db):
+    """Creates a user; returns it with a client logged in as them."""
+
+    from fastapi.testclient import TestClient
+
+    from app.auth.jwt import create_access_token
+    from app.main import app
+    from app.models.user import User
+
+    def make(email="user@example.com"):
+        user = User(first_name="Test", last_name="User", email=email, hashed_password="x")
+        db.add(user)
+        db.commit()
+        # Not entered as a context manager: startup hooks (worker pool,
+        # push pre-analysis) stay off.
+        client = TestClient(app)
+        client.cookies.set("access_token", create_access_token(str(user.id)))
+        return user, client
+
+    return make
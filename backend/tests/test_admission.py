@@ -0,0 +1,104 @@
+import threading
+
+import pytest
+
+from app.services import admission
+from app.services.admission import SECONDS_PER_SOURCE_BYTE, AdmissionController, Cost, Rejected
+
+# 20 seconds of estimated work.
+BIG = Cost(1, int(20 / SECONDS_PER_SOURCE_BYTE), 1000)
+SMALL = Cost(1, 1000, 1000)
+
+
+def controller(**limits):
+    options = {"cpu_slots": 1, "memory": 2**40, "max_pending": 4, "user_max_pending": 2, **limits}
+    return AdmissionController(**options)
+
+
+def test_user_quota_is_enforced_on_entry():
+    gate = controller(user_max_pending=1)
+    running = gate.enter("alice")
+    running.admit(BIG)
+
+    with pytest.raises(Rejected) as rejected:
+        gate.enter("alice")
+
+    assert rejected.value.detail == "quota_exceeded"
+    # Retry once the user's own job should be done.
+    assert rejected.value.retry_after == 20
+    gate.enter("bob").close()
+
+    running.close()
+    gate.enter("alice").close()
+
+
+def test_server_wide_cap_is_enforced_on_entry():
+    gate = controller(max_pending=2)
+    tickets = [gate.enter("alice"), gate.enter("bob")]
+
+    with pytest.raises(Rejected) as rejected:
+        gate.enter("carol")
+
+    assert rejected.value.detail == "overloaded"
+    # Internal work is never capped.
+    gate.enter(None).close()
+    for ticket in tickets:
+        ticket.close()
+
+
+def test_queued_job_gives_up_when_the_queue_will_not_drain_in_time():
+    gate = controller()
+    running = gate.enter("alice")
+    running.admit(BIG)
+
+    with gate.enter("bob") as waiting, pytest.raises(Rejected) as rejected:
+        waiting.admit(SMALL, wait=1)
+
+    assert rejected.value.detail == "overloaded"
+    assert rejected.value.retry_after == 20
+    running.close()
+
+
+def test_queued_job_starts_when_capacity_frees_up():
+    gate = controller()
+    running = gate.enter("alice")
+    running.admit(SMALL)
+    admitted = threading.Event()
+
+    def wait_for_slot():
+        with gate.enter("bob") as ticket:
+            ticket.admit(SMALL, wait=5)
+            admitted.set()
+
+    waiter = threading.Thread(target=wait_for_slot)
+    waiter.start()
+    assert not admitted.wait(0.2)
+
+    running.close()
+    waiter.join(5)
+
+    assert admitted.is_set()
+
+
+def test_job_over_the_memory_budget_runs_alone():
+    gate = controller(cpu_slots=4, memory=1)
+
+    with gate.enter("alice") as ticket:
+        ticket.admit(SMALL, wait=0)
+        with gate.enter("bob") as other, pytest.raises(Rejected):
+            other.admit(SMALL, wait=0)
+
+
+def test_rejected_upload_gets_429_with_retry_after(db, make_user, monkeypatch):
+    user, client = make_user()
+    gate = controller(user_max_pending=1)
+    monkeypatch.setattr(admission, "_controller", gate)
+    running = gate.enter(user.id)
+    running.admit(BIG)
+
+    response = client.post("/analysis/upload", files=[("files", ("a.py", b"x = 1\n"))])
+
+    assert response.status_code == 429
+    assert response.json() == {"detail": "quota_exceeded"}
+    assert response.headers["retry-after"] == "20"
+    running.close()
@@ -0,0 +1,130 @@
+import pyarrow as pa
+
+from app.models.analysis import CodeAnalysis
+from app.services import result_views
+from app.services.analysis_service import analyze_source, score_consistency
+
+ENTRY = {
+    "file": "a.py",
+    "path": "src/a.py",
+    "language": "python",
+    "analysis": {"comments": {"total_comments": 2, "redundant_comments": [["x", "y"]]}},
+}
+
+
+def add_analysis(db, user, entries=(ENTRY,), source_ref="manual", **kwargs):
+    record = CodeAnalysis(
+        user_id=user.id,
+        source_type="upload",
+        source_ref=source_ref,
+        language="mixed",
+        **kwargs,
+    )
+    record.set_result(list(entries), {"files": len(entries)})
+    db.add(record)
+    db.commit()
+    return record
+
+
+def test_result_is_revalidated_with_etag(db, make_user):
+    user, client = make_user()
+    record = add_analysis(db, user)
+
+    first = client.get(f"/analysis/{record.id}")
+    etag = first.headers["etag"]
+
+    assert first.status_code == 200
+    assert first.json()["files"] == [ENTRY]
+    assert first.headers["cache-control"] == "private, no-cache"
+
+    again = client.get(f"/analysis/{record.id}", headers={"If-None-Match": etag})
+
+    assert again.status_code == 304
+    assert again.content == b""
+    assert again.headers["etag"] == etag
+
+
+def test_etag_depends_on_projection(db, make_user):
+    user, client = make_user()
+    record = add_analysis(db, user)
+
+    full = client.get(f"/analysis/{record.id}").headers["etag"]
+    summary = client.get(f"/analysis/{record.id}", params={"fields": "summary"})
+
+    assert summary.headers["etag"] != full
+    assert client.get(
+        f"/analysis/{record.id}", params={"fields": "summary"}, headers={"If-None-Match": full}
+    ).status_code == 200
+
+
+def test_representation_version_invalidates_etags(db, make_user, monkeypatch):
+    user, client = make_user()
+    record = add_analysis(db, user)
+    etag = client.get(f"/analysis/{record.id}/summary").headers["etag"]
+
+    monkeypatch.setattr(result_views, "REPRESENTATION_VERSION", "next")
+    response = client.get(f"/analysis/{record.id}/summary", headers={"If-None-Match": etag})
+
+    assert response.status_code == 200
+    assert response.headers["etag"] != etag
+    assert response.json()["summary"] == {"files": 1}
+
+
+def test_etag_list_and_weak_etags_match(db, make_user):
+    user, client = make_user()
+    record = add_analysis(db, user)
+    etag = client.get(f"/analysis/{record.id}/summary").headers["etag"]
+
+    for header in (f'"other", {etag}', f"W/{etag}", "*"):
+        response = client.get(f"/analysis/{record.id}/summary", headers={"If-None-Match": header})
+        assert response.status_code == 304
+
+
+def exported(client, granularity):
+    response = client.get("/analysis/export", params={"granularity": granularity})
+    assert response.status_code == 200
+    return pa.ipc.open_stream(response.content).read_all().to_pylist()
+
+
+def test_export_holds_only_the_callers_analyses(db, make_user):
+    alice, alice_client = make_user("alice@example.com")
+    bob, bob_client = make_user("bob@example.com")
+    entry = analyze_source("src/a.py", 'def inc(x):\n    """Adds one."""\n    return x + 1\n', "sha")
+    score_consistency([entry])
+    own = add_analysis(db, alice, [entry], source_ref="alice/repo")
+    add_analysis(db, bob, [entry], source_ref="bob/repo")
+
+    files = exported(alice_client, "files")
+    functions = exported(alice_client, "functions")
+
+    assert [(row["analysis_id"], row["path"]) for row in files] == [(own.id, "src/a.py")]
+    assert [(row["source_ref"], row["name"]) for row in functions] == [("alice/repo", "inc")]
+    assert {row["source_ref"] for row in exported(bob_client, "files")} == {"bob/repo"}
+
+
+def test_analyses_are_listed_and_fetched_by_their_owner_only(db, make_user):
+    alice, alice_client = make_user("alice@example.com")
+    bob, bob_client = make_user("bob@example.com")
+    own = [add_analysis(db, alice, source_ref=f"alice/{i}").id for i in range(3)]
+    other = add_analysis(db, bob, source_ref="bob/0").id
+
+    listed = alice_client.get("/analysis", params={"limit": 2}).json()
+    rest = alice_client.get("/analysis", params={"limit": 2, "cursor": listed["next_cursor"]}).json()
+
+    assert [item["analysis_id"] for item in listed["items"] + rest["items"]] == own[::-1]
+    assert rest["next_cursor"] is None
+    assert [item["analysis_id"] for item in bob_client.get("/analysis").json()["items"]] == [other]
+
+    assert alice_client.get(f"/analysis/{own[0]}").status_code == 200
+    for path in (f"/analysis/{other}", f"/analysis/{other}/summary", f"/analysis/{own[0]}/diff/{other}"):
+        assert alice_client.get(path).status_code == 404
+    assert alice_client.get("/analysis/latest", params={"source_ref": "bob/0"}).status_code == 404
+
+
+def test_listing_rejects_a_malformed_cursor(db, make_user):
+    _, client = make_user()
+
+    response = client.get("/analysis", params={"cursor": "garbage"})
+
+    assert response.status_code == 400
+    assert response.json()["detail"] == "invalid_cursor"
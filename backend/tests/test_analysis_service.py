@@ -0,0 +1,42 @@
+from app.services import analysis_service
+from app.services.analysis_service import analyze_codebase, analyze_source, score_consistency
+
+CODE = '''"""Module."""
+
+# Adds one.
+def inc(x):
+    """Returns x plus one."""
+    return x + 1
+
+
+def dec(value):
+    """Subtracts one from :param value: the value."""
+    return value - 1
+'''
+
+
+def test_packed_details_match_the_records_they_replace():
+    entry = analyze_source("pkg/a.py", CODE, "sha")
+    score_consistency([entry])
+    unpacked, metrics = entry.details(), entry.to_dict()
+
+    entry.pack_details()
+
+    assert entry.details() == unpacked
+    assert entry.to_dict() == metrics
+    assert not entry.functions and not entry.comments.items
+    assert [row["name"] for row in unpacked["functions"]] == ["inc", "dec"]
+    assert {row["text"] for row in unpacked["comments"]} >= {"Module.", "Adds one."}
+
+
+def test_batched_scoring_matches_a_single_batch(tmp_path, monkeypatch):
+    for i in range(5):
+        (tmp_path / f"m{i}.py").write_text(CODE)
+
+    whole = analyze_codebase(str(tmp_path))
+    monkeypatch.setattr(analysis_service, "CONSISTENCY_BATCH", 3)
+    batched = analyze_codebase(str(tmp_path))
+
+    assert [r.to_dict() for r in batched] == [r.to_dict() for r in whole]
+    assert [r.details() for r in batched] == [r.details() for r in whole]
+    assert all(r.packed_details is not None for r in batched)
@@ -0,0 +1,141 @@
+from collections import Counter
+
+import pytest
+from git import Actor, Repo
+
+from app.services import history
+from app.services.history import analyze_history
+
+AUTHOR = Actor("Test", "test@example.com")
+
+FIRST = '''"""Module."""
+
+# Adds one.
+def inc(x):
+    """Returns x plus one."""
+    return x + 1
+'''
+
+SECOND = FIRST + '''
+
+# Adds two.
+# Really adds two.
+def inc2(x):
+    return x + 2
+'''
+
+JAVA = '''public class Util {
+    // Adds one.
+    public int inc(int x) {
+        return x + 1;
+    }
+}
+'''
+
+
+def commit(repo: Repo, message: str, files=None, removed=()):
+    for path, code in (files or {}).items():
+        full = f"{repo.working_tree_dir}/{path}"
+        with open(full, "w") as f:
+            f.write(code)
+        repo.index.add([path])
+    if removed:
+        repo.index.remove(list(removed), working_tree=True)
+    return repo.index.commit(message, author=AUTHOR, committer=AUTHOR).hexsha
+
+
+def series(points):
+    """Points without their per-run analysis counts."""
+    return [{k: v for k, v in p.items() if k != "analysed_blobs"} for p in points]
+
+
+@pytest.fixture
+def repo(tmp_path):
+    return Repo.init(tmp_path)
+
+
+@pytest.fixture
+def analysed(monkeypatch):
+    """Counts analyze_source calls per blob sha."""
+
+    calls = Counter()
+    analyze_source = history.analyze_source
+
+    def counting(rel_path, code, sha, *args, **kwargs):
+        calls[sha] += 1
+        return analyze_source(rel_path, code, sha, *args, **kwargs)
+
+    monkeypatch.setattr(history, "analyze_source", counting)
+    return calls
+
+
+def test_each_unique_blob_is_analysed_once(repo, analysed):
+    commit(repo, "add", {"a.py": FIRST})
+    commit(repo, "edit", {"a.py": SECOND})
+    commit(repo, "revert", {"a.py": FIRST})
+    commit(repo, "copy", {"b.py": FIRST})
+    commit(repo, "java", {"Util.java": JAVA})
+
+    points, stats = analyze_history(repo.working_tree_dir)
+
+    assert len(analysed) == 3
+    assert set(analysed.values()) == {1}
+    assert stats["analysed_blobs"] == 3
+    # The revert and the copy are both served from the cache.
+    assert stats["reused_blobs"] == 2
+    assert [p["analysed_blobs"] for p in points] == [1, 1, 0, 0, 1]
+
+
+def test_cache_is_reused_across_runs(repo, analysed):
+    commit(repo, "add", {"a.py": FIRST})
+    commit(repo, "edit", {"a.py": SECOND})
+
+    cache = {}
+    first, _ = analyze_history(repo.working_tree_dir, cache=cache)
+    calls = sum(analysed.values())
+    second, stats = analyze_history(repo.working_tree_dir, cache=cache)
+
+    assert sum(analysed.values()) == calls
+    assert stats["analysed_blobs"] == 0
+    assert series(second) == series(first)
+
+
+def test_series_follows_the_tree_per_commit(repo):
+    shas = [
+        commit(repo, "add", {"a.py": FIRST}),
+        commit(repo, "edit", {"a.py": SECOND}),
+        commit(repo, "add java", {"Util.java": JAVA}),
+        commit(repo, "remove python", removed=["a.py"]),
+    ]
+
+    points, stats = analyze_history(repo.working_tree_dir)
+
+    assert [p["commit"] for p in points] == shas
+    assert [p["files"] for p in points] == [1, 1, 2, 1]
+    assert [p["total_comments"] for p in points] == [3, 5, 6, 1]
+    assert [p["changed_files"] for p in points] == [1, 1, 1, 1]
+    assert points[0]["consistency"]["documented_functions"] == 1
+    assert stats["commits"] == 4
+
+
+def test_max_commits_and_step_select_from_the_newest(repo):
+    shas = [commit(repo, f"c{i}", {"a.py": FIRST + f"\n# {i}\n"}) for i in range(5)]
+
+    points, _ = analyze_history(repo.working_tree_dir, max_commits=4, step=2)
+
+    assert [p["commit"] for p in points] == [shas[2], shas[4]]
+    # The first selected commit starts from an empty tree.
+    assert points[0]["files"] == 1
+
+
+def test_unparsable_blob_is_skipped(repo, analysed):
+    commit(repo, "add", {"a.py": FIRST})
+    commit(repo, "python 2", {"b.py": 'print "py2"\n'})
+    commit(repo, "python 2 again", {"c.py": 'print "py2"\n'})
+
+    points, stats = analyze_history(repo.working_tree_dir)
+
+    assert [p["files"] for p in points] == [1, 1, 1]
+    assert stats["unparsable_blobs"] == 1
+    # The broken blob is cached as unanalysable, not retried for c.py.
+    assert len(analysed) == 2
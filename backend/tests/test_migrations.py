@@ -0,0 +1,113 @@
+import pytest
+from sqlalchemy import create_engine, inspect, text
+from sqlalchemy.orm import Session
+
+from app.database.database import Base
+from app.database.migrations import upgrade
+from app.models.analysis import CodeAnalysis
+from app.models.user import User  # noqa: F401
+from app.models.webhook import RegisteredRepo  # noqa: F401
+
+# Tables as the first releases created them, before any column was added.
+OLD_SCHEMA = [
+    """CREATE TABLE users (
+        id INTEGER PRIMARY KEY,
+        first_name VARCHAR NOT NULL,
+        last_name VARCHAR NOT NULL,
+        email VARCHAR NOT NULL UNIQUE,
+        hashed_password VARCHAR NOT NULL
+    )""",
+    """CREATE TABLE code_analysis (
+        id INTEGER PRIMARY KEY,
+        source_type VARCHAR NOT NULL,
+        source_ref VARCHAR NOT NULL,
+        language VARCHAR NOT NULL,
+        result JSON NOT NULL,
+        created_at DATETIME DEFAULT (CURRENT_TIMESTAMP)
+    )""",
+    """CREATE TABLE analysis_results (
+        id INTEGER PRIMARY KEY,
+        content_key VARCHAR NOT NULL UNIQUE,
+        result JSON NOT NULL,
+        created_at DATETIME DEFAULT (CURRENT_TIMESTAMP)
+    )""",
+    """CREATE TABLE registered_repos (
+        id INTEGER PRIMARY KEY,
+        user_id INTEGER NOT NULL REFERENCES users(id),
+        repo_url VARCHAR NOT NULL,
+        webhook_secret VARCHAR NOT NULL,
+        branch VARCHAR,
+        last_pushed_sha VARCHAR,
+        last_analyzed_sha VARCHAR,
+        created_at DATETIME DEFAULT (CURRENT_TIMESTAMP) NOT NULL
+    )""",
+    "CREATE UNIQUE INDEX ix_registered_repos_repo_url ON registered_repos (repo_url)",
+    """INSERT INTO code_analysis (source_type, source_ref, language, result)
+       VALUES ('upload', 'manual', 'mixed', '[{"file": "a.py"}]')""",
+]
+
+
+@pytest.fixture
+def engine(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path}/old.db")
+    with engine.begin() as conn:
+        for statement in OLD_SCHEMA:
+            conn.execute(text(statement))
+    yield engine
+    engine.dispose()
+
+
+def start(engine):
+    """What the app does at startup."""
+
+    Base.metadata.create_all(bind=engine)
+    upgrade(engine)
+
+
+def test_old_schema_is_brought_up_to_date(engine):
+    start(engine)
+
+    inspector = inspect(engine)
+    for table in ("code_analysis", "analysis_results"):
+        model = {c.name for c in Base.metadata.tables[table].columns}
+        assert {c["name"] for c in inspector.get_columns(table)} == model
+
+    indexes = {i["name"]: i for i in inspector.get_indexes("code_analysis")}
+    assert {"ix_code_analysis_user_created", "ix_code_analysis_source_created",
+            "ix_code_analysis_result_id"} <= set(indexes)
+    assert indexes["ix_code_analysis_user_created"]["column_names"] == ["user_id", "created_at", "id"]
+
+    repos = {i["name"]: i for i in inspector.get_indexes("registered_repos")}
+    assert not repos["ix_registered_repos_repo_url"]["unique"]
+    assert repos["ix_registered_repos_user_repo"]["unique"]
+
+    status = next(c for c in inspector.get_columns("code_analysis") if c["name"] == "status")
+    assert not status["nullable"]
+
+
+def test_existing_rows_stay_readable(engine):
+    start(engine)
+
+    with Session(engine) as db:
+        old = db.query(CodeAnalysis).one()
+        assert old.status == "success"
+        assert old.user_id is None
+        assert old.payload == [{"file": "a.py"}]
+
+        new = CodeAnalysis(user_id=1, source_type="upload", source_ref="manual", language="python")
+        new.set_result([{"file": "b.py"}], {"files": 1})
+        db.add(new)
+        db.commit()
+        assert db.get(CodeAnalysis, new.id).payload_summary == {"files": 1}
+
+
+def test_upgrade_is_idempotent(engine):
+    def schema():
+        with engine.connect() as conn:
+            return conn.execute(text("SELECT name, sql FROM sqlite_master ORDER BY name")).all()
+
+    start(engine)
+    upgraded = schema()
+    start(engine)
+
+    assert schema() == upgraded
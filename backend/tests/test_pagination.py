@@ -0,0 +1,69 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import text
+
+from app.database.database import engine
+from app.database.migrations import upgrade
+from app.models.analysis import CodeAnalysis
+from app.services.pagination import decode_cursor, encode_cursor, keyset_page
+
+NOW = datetime(2026, 1, 2, 3, 4, 5, tzinfo=timezone.utc)
+
+
+def add(db, created_at=None, user_id=1):
+    record = CodeAnalysis(user_id=user_id, source_type="upload", source_ref="manual",
+                          language="python", created_at=created_at)
+    db.add(record)
+    db.commit()
+    return record.id
+
+
+def all_pages(db, limit, user_id=1):
+    query = db.query(CodeAnalysis.id, CodeAnalysis.created_at).filter(CodeAnalysis.user_id == user_id)
+    cursor, pages = None, []
+    while True:
+        rows, cursor = keyset_page(query, CodeAnalysis.created_at, CodeAnalysis.id, cursor, limit)
+        pages.append([row.id for row in rows])
+        if cursor is None:
+            return pages
+        assert len(pages) < 10, "pagination does not terminate"
+
+
+@pytest.mark.parametrize("created_at", [NOW, NOW.replace(microsecond=0)])
+def test_rows_with_equal_timestamps_are_paged_once_each(db, created_at):
+    ids = [add(db, created_at) for _ in range(5)]
+
+    assert all_pages(db, 2) == [ids[4:2:-1], ids[2:0:-1], ids[:1]]
+
+
+def test_rows_stamped_by_the_database_are_paged_once_each(db):
+    # CURRENT_TIMESTAMP, as in databases written before the application
+    # set created_at itself: whole seconds, brought in line at startup.
+    for _ in range(5):
+        db.execute(text(
+            "INSERT INTO code_analysis (user_id, source_type, source_ref, language, created_at) "
+            "VALUES (1, 'upload', 'manual', 'python', '2026-01-02 03:04:05')"
+        ))
+    db.commit()
+    upgrade(engine)
+    ids = db.execute(text("SELECT id FROM code_analysis ORDER BY id DESC")).scalars().all()
+
+    assert sum(all_pages(db, 2), []) == ids
+
+
+def test_pages_are_newest_first_across_timestamps(db):
+    older = [add(db, NOW - timedelta(seconds=1)) for _ in range(2)]
+    newer = [add(db, NOW) for _ in range(2)]
+    add(db, NOW, user_id=2)
+
+    pages = all_pages(db, 3)
+
+    assert pages == [newer[::-1] + older[1:], older[:1]]
+
+
+def test_cursor_round_trips_and_rejects_garbage():
+    assert decode_cursor(encode_cursor(NOW, 7)) == (NOW, 7)
+
+    with pytest.raises(ValueError):
+        decode_cursor("not a cursor")
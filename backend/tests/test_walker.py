@@ -0,0 +1,124 @@
+import os
+
+import pytest
+
+from app.services.walker import walk_source_files
+
+
+def tree(root, files):
+    for path, content in files.items():
+        full = os.path.join(root, path)
+        os.makedirs(os.path.dirname(full), exist_ok=True)
+        with open(full, "w") as f:
+            f.write(content)
+
+
+def walked(root, **kwargs):
+    return sorted(source.rel_path for source in walk_source_files(str(root), **kwargs))
+
+
+def test_root_gitignore_excludes_files_and_directories(tmp_path):
+    tree(tmp_path, {
+        ".gitignore": "generated/\nsecret_*.py\n",
+        "a.py": "",
+        "secret_key.py": "",
+        "generated/b.py": "",
+        "pkg/secret_c.py": "",
+    })
+
+    assert walked(tmp_path) == ["a.py"]
+
+
+def test_nested_negation_reincludes_a_file_ignored_by_a_parent(tmp_path):
+    tree(tmp_path, {
+        ".gitignore": "pkg/gen_*.py\n",
+        "pkg/.gitignore": "!gen_keep.py\n",
+        "pkg/gen_keep.py": "",
+        "pkg/gen_drop.py": "",
+        "pkg/a.py": "",
+    })
+
+    assert walked(tmp_path) == ["pkg/a.py", "pkg/gen_keep.py"]
+
+
+def test_nested_gitignore_applies_relative_to_its_directory(tmp_path):
+    tree(tmp_path, {
+        "pkg/.gitignore": "/local.py\n",
+        "pkg/local.py": "",
+        "pkg/sub/local.py": "",
+        "local.py": "",
+    })
+
+    assert walked(tmp_path) == ["local.py", "pkg/sub/local.py"]
+
+
+def test_later_pattern_in_the_same_file_wins(tmp_path):
+    tree(tmp_path, {
+        ".gitignore": "*.py\n!keep.py\n",
+        "keep.py": "",
+        "drop.py": "",
+    })
+
+    assert walked(tmp_path) == ["keep.py"]
+
+
+def test_files_in_an_ignored_directory_cannot_be_reincluded(tmp_path):
+    # As in git: the directory itself is never entered.
+    tree(tmp_path, {
+        ".gitignore": "out/\n",
+        "out/.gitignore": "!kept.py\n",
+        "out/kept.py": "",
+    })
+
+    assert walked(tmp_path) == []
+
+
+def test_info_exclude_is_honoured(tmp_path):
+    tree(tmp_path, {
+        ".git/info/exclude": "scratch.py\n",
+        "scratch.py": "",
+        "a.py": "",
+    })
+
+    assert walked(tmp_path) == ["a.py"]
+
+
+def test_exclude_patterns_are_not_overridden_by_negations(tmp_path):
+    tree(tmp_path, {
+        ".gitignore": "!tests/\n",
+        "tests/test_a.py": "",
+        "a.py": "",
+    })
+
+    assert walked(tmp_path, exclude=["tests/"]) == ["a.py"]
+
+
+def test_default_excludes_can_be_overridden(tmp_path):
+    tree(tmp_path, {
+        "build/tool.py": "",
+        "vendor/lib.py": "",
+        ".git/hooks/hook.py": "",
+        "__pycache__/cached.py": "",
+        "src/a.py": "",
+    })
+
+    assert walked(tmp_path) == ["src/a.py"]
+    # VCS and cache directories stay excluded whatever the patterns.
+    assert walked(tmp_path, exclude=[]) == ["build/tool.py", "src/a.py", "vendor/lib.py"]
+
+
+@pytest.mark.parametrize("include, expected", [
+    (["*.py"], ["a.py"]),
+    (["*.java"], ["B.java"]),
+    (["*.py", "*.java"], ["B.java", "a.py"]),
+])
+def test_include_globs_match_file_names(tmp_path, include, expected):
+    tree(tmp_path, {"a.py": "", "B.java": "", "notes.txt": ""})
+
+    assert walked(tmp_path, include=include) == expected
+
+
+def test_generated_suffixes_and_oversized_files_are_skipped(tmp_path):
+    tree(tmp_path, {"a.py": "x = 1\n", "msg_pb2.py": "", "big.py": "x" * 100})
+
+    assert walked(tmp_path, max_bytes=50) == ["a.py"]
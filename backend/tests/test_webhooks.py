@@ -0,0 +1,155 @@
+import json
+import threading
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.routes import webhooks as webhook_routes
+from app.services.webhooks import PushDebouncer, sign
+
+REPO_URL = "https://github.com/org/repo"
+SHA = "a" * 40
+
+
+@pytest.fixture
+def queued(monkeypatch):
+    """(registration id, commit) of every push handed to pre-analysis."""
+
+    pushes = []
+
+    def enqueue_push(repo_id, sha):
+        pushes.append((repo_id, sha))
+        return True
+
+    monkeypatch.setattr(webhook_routes, "enqueue_push", enqueue_push)
+    return pushes
+
+
+def register(client, repo_url=REPO_URL, **params):
+    response = client.post("/webhooks/repos", params={"repo_url": repo_url, **params})
+    assert response.status_code == 201
+    return response.json()
+
+
+def push(secret, ref="refs/heads/main", after=SHA, event="push", repo_url=REPO_URL + ".git"):
+    body = json.dumps({
+        "ref": ref,
+        "after": after,
+        "repository": {"html_url": repo_url, "default_branch": "main"},
+    }).encode()
+    headers = {"X-GitHub-Event": event}
+    if secret is not None:
+        headers["X-Hub-Signature-256"] = sign(secret, body)
+    return TestClient(app).post("/webhooks/github", content=body, headers=headers)
+
+
+def test_signed_push_is_queued_for_its_registration(db, make_user, queued):
+    _, client = make_user()
+    repo = register(client)
+
+    response = push(repo["webhook_secret"])
+
+    assert response.status_code == 202
+    assert response.json() == {"status": "queued", "commit": SHA}
+    assert queued == [(repo["id"], SHA)]
+    assert client.get("/webhooks/repos").json()[0]["last_pushed_sha"] == SHA
+
+
+def test_push_goes_to_the_registration_whose_secret_signed_it(db, make_user, queued):
+    _, alice = make_user("alice@example.com")
+    _, bob = make_user("bob@example.com")
+    first, second = register(alice), register(bob)
+
+    push(second["webhook_secret"])
+    push(first["webhook_secret"])
+
+    assert queued == [(second["id"], SHA), (first["id"], SHA)]
+    assert alice.post("/webhooks/repos", params={"repo_url": REPO_URL}).status_code == 409
+
+
+@pytest.mark.parametrize("secret", [None, "not-the-secret"])
+def test_unsigned_or_wrongly_signed_push_is_rejected(db, make_user, queued, secret):
+    _, client = make_user()
+    register(client)
+
+    response = push(secret)
+
+    assert response.status_code == 401
+    assert response.json()["detail"] == "invalid_signature"
+    assert queued == []
+
+
+def test_push_to_an_unregistered_repository_is_not_found(db, make_user, queued):
+    _, client = make_user()
+    repo = register(client)
+
+    response = push(repo["webhook_secret"], repo_url="https://github.com/org/other")
+
+    assert response.status_code == 404
+    assert queued == []
+
+
+@pytest.mark.parametrize("branch, ref, status", [
+    (None, "refs/heads/main", "queued"),
+    (None, "refs/heads/feature", "ignored"),
+    ("release", "refs/heads/release", "queued"),
+    ("release", "refs/heads/main", "ignored"),
+    (None, "refs/tags/v1", "ignored"),
+])
+def test_only_pushes_to_the_tracked_branch_are_queued(db, make_user, queued, branch, ref, status):
+    _, client = make_user()
+    repo = register(client, **({"branch": branch} if branch else {}))
+
+    response = push(repo["webhook_secret"], ref=ref)
+
+    assert response.json()["status"] == status
+    assert len(queued) == (status == "queued")
+
+
+def test_ping_and_other_events_are_not_queued(db, make_user, queued):
+    _, client = make_user()
+    secret = register(client)["webhook_secret"]
+
+    assert push(secret, event="ping").json() == {"status": "pong"}
+    assert push(secret, event="issues").json() == {"status": "ignored"}
+    assert queued == []
+
+
+def test_debouncer_coalesces_a_burst_into_one_call():
+    handled = []
+    done = threading.Event()
+
+    def handler(key, value):
+        handled.append((key, value))
+        done.set()
+
+    debouncer = PushDebouncer(handler, quiet=0.2, max_delay=5, workers=1)
+    try:
+        for sha in ("1", "2", "3"):
+            debouncer.submit("repo", sha)
+            time.sleep(0.02)
+        debouncer.submit("other", "x")
+
+        assert done.wait(2)
+        time.sleep(0.4)
+    finally:
+        debouncer.stop()
+
+    assert sorted(handled) == [("other", "x"), ("repo", "3")]
+
+
+def test_debouncer_runs_a_continuous_burst_by_its_deadline():
+    handled = []
+    debouncer = PushDebouncer(lambda key, value: handled.append(value), quiet=0.2, max_delay=0.3, workers=1)
+    try:
+        # Never quiet for 0.2s, so only the deadline triggers a run.
+        for i in range(8):
+            debouncer.submit("repo", i)
+            time.sleep(0.1)
+    finally:
+        debouncer.stop()
+
+    assert 1 <= len(handled) < 8
+    assert handled == sorted(handled)